@@ -0,0 +1,91 @@
+"""End-of-day interest and fee run: per-account loop vs the vectorised pass.
+
+Builds a seeded book, then applies one day of tiered interest plus the fee
+twice: once the way a caller would without :meth:`AccountManager.end_of_day`
+(compute each account's amounts with Python integers and post them with ``deposit`` /
+``withdraw``), and once with ``end_of_day``. Both books must end up equal.
+
+Usage:
+    python benchmarks/bench_accrual.py --accounts 1000000 --chunk-size 250000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.accrual import RATE_SCALE, Schedule, Tier, validate  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+
+SCHEDULE = Schedule(
+    tiers=(Tier(0, "0.005"), Tier(1_000_000, "0.0225"), Tier(10_000_000, "0.041")),
+    fee_minor=250,
+    fee_waiver_minor=500_000,
+)
+
+
+def build(balances: list[int]) -> AccountManager:
+    mgr = AccountManager()
+    for i, minor in enumerate(balances):
+        mgr._add(f"ACC{i:08d}", "", minor)
+    return mgr
+
+
+def per_account(mgr: AccountManager) -> None:
+    bands = validate(SCHEDULE)
+    denominator = RATE_SCALE * SCHEDULE.day_count
+    deposit, withdraw = mgr.deposit, mgr.withdraw
+    for acct in mgr.list_accounts():
+        balance = acct.balance_minor
+        total = 0
+        for floor, width, rate in bands:
+            portion = max(balance - floor, 0)
+            total += rate * (portion if width is None else min(portion, width))
+        q, r = divmod(total, denominator)
+        interest = q + (2 * r > denominator or (2 * r == denominator and q & 1))
+        after = balance + interest
+        fee = 0 if after >= SCHEDULE.fee_waiver_minor else min(SCHEDULE.fee_minor, max(after, 0))
+        net = interest - fee
+        if net > 0:
+            deposit(acct.name, net / 100)
+        elif net < 0:
+            withdraw(acct.name, -net / 100)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--loop-accounts", type=int, default=50_000,
+                        help="accounts timed in the per-account loop (extrapolated to --accounts)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    balances = [int(rng.lognormvariate(12, 2)) for _ in range(args.accounts)]
+
+    sample = balances[: args.loop_accounts]
+    loop_mgr, check_mgr = build(sample), build(sample)
+    start = time.perf_counter()
+    per_account(loop_mgr)
+    loop = (time.perf_counter() - start) / len(sample)
+    check_mgr.end_of_day(SCHEDULE, charge_fees=True)
+    assert [a.balance_minor for a in loop_mgr.list_accounts()] == [
+        a.balance_minor for a in check_mgr.list_accounts()
+    ], "per-account and vectorised runs disagree"
+
+    mgr = build(balances)
+    start = time.perf_counter()
+    result = mgr.end_of_day(SCHEDULE, charge_fees=True, chunk_size=args.chunk_size)
+    vector = (time.perf_counter() - start) / args.accounts
+    print(f"{args.accounts:,} accounts, {result.credited:,} credited, {result.charged:,} charged")
+    print(f"per-account loop: {loop * 1e6:7.2f} µs/account  (~{loop * args.accounts:.1f} s for the book)")
+    print(f"end_of_day      : {vector * 1e6:7.2f} µs/account  ({vector * args.accounts:.2f} s)")
+    print(f"speed-up        : {loop / vector:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
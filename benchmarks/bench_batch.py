@@ -0,0 +1,62 @@
+"""Compare per-call ``AccountManager.transfer`` with ``apply_batch``.
+
+Usage:
+    python benchmarks/bench_batch.py --accounts 10000 --postings 500000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.manager import AccountManager  # noqa: E402
+
+
+def _book(accounts: int) -> AccountManager:
+    mgr = AccountManager()
+    for i in range(accounts):
+        mgr.create(f"ACC{i:08d}", "", 1_000_000.0)
+    return mgr
+
+
+def run(accounts: int, postings: int, seed: int) -> None:
+    rng = random.Random(seed)
+    ids = [f"ACC{i:08d}" for i in range(accounts)]
+    batch = [(rng.choice(ids), rng.choice(ids), float(rng.randint(1, 100))) for _ in range(postings)]
+
+    mgr = _book(accounts)
+    start = time.perf_counter()
+    for src, dst, amount in batch:
+        mgr.transfer(src, dst, amount)
+    loop = time.perf_counter() - start
+    print(f"{'transfer loop:':30s} {postings / loop:>12,.0f} postings/s")
+
+    batch_minor = [(src, dst, int(amount * 100)) for src, dst, amount in batch]
+    for label, rows, options in [
+        ("apply_batch:", batch, {}),
+        ("apply_batch (atomic):", batch, {"atomic": True}),
+        ("apply_batch (minor units):", batch_minor, {"minor_units": True}),
+        ("apply_batch (minor, atomic):", batch_minor, {"minor_units": True, "atomic": True}),
+    ]:
+        mgr = _book(accounts)
+        start = time.perf_counter()
+        mgr.apply_batch(rows, **options)
+        elapsed = time.perf_counter() - start
+        print(f"{label:30s} {postings / elapsed:>12,.0f} postings/s  ({loop / elapsed:.1f}x)")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--postings", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    run(args.accounts, args.postings, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare memory and aggregate-query cost of the object and columnar stores.
+
+Usage:
+    python benchmarks/bench_columnar.py --accounts 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.columnar import ColumnarAccountManager  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+
+
+def _build(factory, ids):
+    gc.collect()
+    tracemalloc.start()
+    mgr = factory()
+    for i, account_id in enumerate(ids):
+        mgr.create(account_id, "Alice" if i % 2 else "Bob", float(i % 1000))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mgr, used
+
+
+def run(accounts: int) -> None:
+    # ids are shared by both stores so only per-account overhead is measured
+    ids = [f"ACC{i:08d}" for i in range(accounts)]
+    objects, obj_bytes = _build(AccountManager, ids)
+    columns, col_bytes = _build(ColumnarAccountManager, ids)
+    print(f"objects:  {obj_bytes / accounts:8.1f} bytes/account")
+    print(f"columnar: {col_bytes / accounts:8.1f} bytes/account  ({obj_bytes / col_bytes:.1f}x less)")
+
+    start = time.perf_counter()
+    total = sum(a.balance for a in objects.list_accounts())
+    negatives = [a.name for a in objects.list_accounts() if a.balance < 0]
+    loop = time.perf_counter() - start
+    columns.total_balance()  # warm up (imports numpy)
+    start = time.perf_counter()
+    assert columns.total_balance() == total
+    assert columns.negative_balance_ids() == negatives
+    vec = time.perf_counter() - start
+    print(f"total + negative scan: objects {loop * 1e3:8.1f} ms, columnar {vec * 1e3:8.1f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    run(args.accounts)
+
+
+if __name__ == "__main__":
+    main()
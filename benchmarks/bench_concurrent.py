@@ -0,0 +1,68 @@
+"""Transfer throughput of ConcurrentAccountManager across thread counts.
+
+On a GIL build the numbers show locking overhead rather than scaling; run on a
+free-threaded CPython (3.13t+) to see transfers spread across cores.
+
+Usage:
+    python benchmarks/bench_concurrent.py --threads 1 2 4 8 --ops 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.concurrent import ConcurrentAccountManager  # noqa: E402
+
+
+def run(threads: int, ops: int, accounts: int, stripes: int, seed: int) -> float:
+    mgr = ConcurrentAccountManager(stripes=stripes)
+    ids = [f"ACC{i:08d}" for i in range(accounts)]
+    for account_id in ids:
+        mgr.create(account_id, "", 1_000_000.0)
+    total = sum(a.balance_minor for a in mgr.list_accounts())
+    per_thread = ops // threads
+
+    def worker(worker_seed: int) -> None:
+        rng = random.Random(worker_seed)
+        pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(per_thread)]
+        barrier.wait()
+        for src, dst in pairs:
+            mgr.transfer(src, dst, 1)
+
+    barrier = threading.Barrier(threads + 1)
+    workers = [threading.Thread(target=worker, args=(seed + i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert sum(a.balance_minor for a in mgr.list_accounts()) == total, "money not conserved"
+    return per_thread * threads / elapsed
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--stripes", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"free-threaded build: {free_threaded}")
+    for n in args.threads:
+        rate = run(n, args.ops, args.accounts, args.stripes, args.seed)
+        print(f"{n:3d} threads: {rate:>12,.0f} transfers/s")
+
+
+if __name__ == "__main__":
+    main()
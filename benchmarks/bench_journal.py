@@ -0,0 +1,74 @@
+"""Benchmark journaled mutation throughput and cold-start recovery.
+
+Usage:
+    python benchmarks/bench_journal.py --accounts 1000000 --mutations 200000
+
+Measures:
+    * mutations/sec for a create + transfer mix with group commit (fsync on)
+    * time to write a compacted snapshot of the whole book
+    * cold-start recovery time (snapshot load + tail replay)
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.manager import AccountManager  # noqa: E402
+
+
+def run(accounts: int, mutations: int, tail: int, fsync: bool, seed: int) -> None:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        mgr = AccountManager.open(tmp, fsync=fsync, snapshot_every=10**12)
+        start = time.perf_counter()
+        for i in range(accounts):
+            mgr.create(f"ACC{i:08d}", "owner", 1_000.0)
+        mgr.sync()
+        elapsed = time.perf_counter() - start
+        print(f"create:     {accounts:>10,} ops in {elapsed:7.3f}s  {accounts / elapsed:>12,.0f} ops/s")
+
+        ids = [f"ACC{i:08d}" for i in range(accounts)]
+        start = time.perf_counter()
+        for _ in range(mutations):
+            mgr.transfer(rng.choice(ids), rng.choice(ids), 1.0)
+        mgr.sync()
+        elapsed = time.perf_counter() - start
+        print(f"transfer:   {mutations:>10,} ops in {elapsed:7.3f}s  {mutations / elapsed:>12,.0f} ops/s")
+
+        start = time.perf_counter()
+        mgr.checkpoint()
+        print(f"snapshot:   {accounts:>10,} accounts in {time.perf_counter() - start:7.3f}s")
+
+        for _ in range(tail):
+            mgr.deposit(rng.choice(ids), 1.0)
+        mgr.close()
+
+        start = time.perf_counter()
+        recovered = AccountManager.open(tmp, fsync=fsync)
+        elapsed = time.perf_counter() - start
+        print(
+            f"recovery:   {len(recovered.list_accounts()):>10,} accounts + {tail:,} tail records "
+            f"in {elapsed:7.3f}s"
+        )
+        recovered.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--mutations", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=10_000)
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync (measures CPU cost only)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    run(args.accounts, args.mutations, args.tail, not args.no_fsync, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-operation cost of velocity limits on transfers.
+
+Runs the same seeded transfer stream against managers with no limits, one
+per-account limit, and a typical rule set (per-account 60 s count, 24 h
+outflow and per-owner 24 h outflow), and prints the time each adds per
+transfer. Limits are set high enough that nothing is rejected, so the numbers
+are pure checking overhead.
+
+Usage:
+    python benchmarks/bench_limits.py --ops 200000 --accounts 10000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.limits import Limit, VelocityLimits  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+
+HIGH = 1 << 40
+
+RULE_SETS = {
+    "none": [],
+    "1 account rule": [Limit(60, max_count=HIGH, max_outflow_minor=HIGH)],
+    "3 rules": [
+        Limit(60, max_count=HIGH),
+        Limit(86_400, max_outflow_minor=HIGH, buckets=24),
+        Limit(86_400, max_outflow_minor=HIGH, scope="owner", buckets=24),
+    ],
+}
+
+
+def run(rules: list[Limit], pairs: list[tuple[str, str]], accounts: int) -> float:
+    """Return seconds per transfer."""
+    mgr = AccountManager(limits=VelocityLimits(rules) if rules else None)
+    for i in range(accounts):
+        mgr.create(f"ACC{i:08d}", f"owner{i % 1000}", 1_000_000)
+    transfer = mgr.transfer
+    start = time.perf_counter()
+    for src, dst in pairs:
+        transfer(src, dst, 1)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs per rule set")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    ids = [f"ACC{i:08d}" for i in range(args.accounts)]
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.ops)]
+    base = None
+    for name, rules in RULE_SETS.items():
+        per_op = min(run(rules, pairs, args.accounts) for _ in range(args.repeat))
+        base = per_op if base is None else base
+        print(f"{name:>15}: {per_op * 1e6:6.2f} µs/transfer  (+{(per_op - base) * 1e6:.2f} µs for limits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare cold-open cost of a journal snapshot and a memory-mapped snapshot.
+
+The journal path rebuilds one BankAccount per account (``AccountManager.open``);
+the mapped path opens the file with ``MappedBook`` and serves queries from
+the mapping. Both are timed to the first answered ``get`` and a first page;
+``--memory`` adds Python heap growth measured by tracemalloc.
+
+Usage:
+    python benchmarks/bench_mapped.py --accounts 10000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.journal import Journal  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+from bank.mapped import MappedBook, write_mapped  # noqa: E402
+
+
+def _open(opener, probe: str, trace: bool) -> tuple[float, int]:
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    book = opener()
+    assert book.get(probe) is not None
+    book.page_accounts(0, 50, probe[:5])
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] if trace else 0
+    tracemalloc.stop()
+    book.close()
+    return elapsed, used
+
+
+def run(accounts: int, seed: int, memory: bool) -> None:
+    rows = [(f"ACC{i:08d}", "Alice" if i % 2 else "", i % 100_000) for i in range(accounts)]
+    probe = random.Random(seed).choice(rows)[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Journal(tmp, fsync=False)
+        journal.recover()
+        journal.write_snapshot(rows)
+        journal.close()
+        start = time.perf_counter()
+        write_mapped(Path(tmp) / "book.map", rows, fsync=False)
+        print(f"{accounts:,} accounts; mapped snapshot written in {time.perf_counter() - start:.1f}s")
+        del rows
+        openers = {
+            "journal": lambda: AccountManager.open(tmp, fsync=False),
+            "mapped": lambda: MappedBook(Path(tmp) / "book.map"),
+        }
+        seconds = {}
+        for label, opener in openers.items():
+            seconds[label], _ = _open(opener, probe, trace=False)
+            line = f"{label:8s} open + first queries {seconds[label] * 1e3:10.1f} ms"
+            if memory:  # traced separately: tracemalloc slows the journal path several times
+                line += f", heap {_open(opener, probe, trace=True)[1] / 2**20:8.1f} MiB"
+            print(line)
+        print(f"mapped open is {seconds['journal'] / seconds['mapped']:,.0f}x faster")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--memory", action="store_true", help="also trace Python heap growth")
+    args = parser.parse_args(argv)
+    run(args.accounts, args.seed, args.memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Microbenchmark: float vs Decimal vs fixed-point minor units.
+
+Runs ``--ops`` alternating deposit/withdraw operations with each
+representation and reports ops/sec plus the final rounding drift.
+
+Usage:
+    python benchmarks/bench_money.py --ops 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.account import BankAccount  # noqa: E402
+
+
+def _float(ops: int) -> str:
+    balance = 0.0
+    amount = 0.1
+    for i in range(ops):
+        if i & 1:
+            balance -= amount
+        else:
+            balance += amount
+            balance += amount
+    return repr(balance)
+
+
+def _decimal(ops: int) -> str:
+    balance = Decimal(0)
+    amount = Decimal("0.1")
+    for i in range(ops):
+        if i & 1:
+            balance -= amount
+        else:
+            balance += amount
+            balance += amount
+    return str(balance)
+
+
+def _fixed(ops: int) -> str:
+    balance = 0
+    amount = 10
+    for i in range(ops):
+        if i & 1:
+            balance -= amount
+        else:
+            balance += amount
+            balance += amount
+    return f"{balance / 100:.2f}"
+
+
+def _account_float_api(ops: int) -> str:
+    acct = BankAccount("bench")
+    for i in range(ops):
+        if i & 1:
+            acct.withdraw(0.1)
+        else:
+            acct.deposit(0.1)
+            acct.deposit(0.1)
+    return f"{acct.balance:.2f}"
+
+
+def _account_minor_api(ops: int) -> str:
+    acct = BankAccount("bench")
+    for i in range(ops):
+        if i & 1:
+            acct.withdraw_minor(10)
+        else:
+            acct.deposit_minor(10)
+            acct.deposit_minor(10)
+    return f"{acct.balance:.2f}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    expected = f"{(args.ops // 2 + args.ops % 2) * 0.2 - (args.ops // 2) * 0.1:.2f}"
+    print(f"expected final balance: {expected}")
+    for label, fn in [
+        ("raw float", _float),
+        ("raw Decimal", _decimal),
+        ("raw int minor units", _fixed),
+        ("BankAccount.deposit(float)", _account_float_api),
+        ("BankAccount.deposit_minor(int)", _account_minor_api),
+    ]:
+        start = time.perf_counter()
+        result = fn(args.ops)
+        elapsed = time.perf_counter() - start
+        print(f"{label:32s} {args.ops / elapsed:>14,.0f} ops/s  final={result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput of ShardedAccountManager per shard count on a mixed create/transfer workload.
+
+Each round creates ``--accounts / --rounds`` new accounts and runs a batch of
+random transfers among all accounts created so far (about ``--cross``
+of them cross shards by construction of the hash). After every run the total
+across shards is checked against the money created.
+
+Usage:
+    python benchmarks/bench_sharded.py --shards 1 2 4 8 --accounts 100000 --transfers 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.manager import AccountManager  # noqa: E402
+from bank.sharded import ShardedAccountManager  # noqa: E402
+
+INITIAL = 1_000  # minor units per new account
+
+
+def _workload(accounts: int, transfers: int, rounds: int, seed: int) -> List[List[Tuple[Any, ...]]]:
+    rng = random.Random(seed)
+    batches = []
+    per_round = accounts // rounds
+    for r in range(rounds):
+        batch: List[Tuple[Any, ...]] = [
+            ("create", f"ACC{i:08d}", "", INITIAL // 100) for i in range(r * per_round, (r + 1) * per_round)
+        ]
+        live = (r + 1) * per_round
+        for _ in range(transfers // rounds):
+            src, dst = rng.randrange(live), rng.randrange(live)
+            batch.append(("transfer_minor", f"ACC{src:08d}", f"ACC{dst:08d}", rng.randint(1, 500)))
+        batches.append(batch)
+    return batches
+
+
+def _single(batches: List[List[Tuple[Any, ...]]]) -> float:
+    mgr = AccountManager()
+    start = time.perf_counter()
+    for batch in batches:
+        for op, *args in batch:
+            try:
+                if op == "create":
+                    mgr.create(*args)
+                else:
+                    mgr.apply_batch([tuple(args)], minor_units=True)
+            except Exception:
+                pass
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--transfers", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    batches = _workload(args.accounts, args.transfers, args.rounds, args.seed)
+    ops = sum(len(b) for b in batches)
+    print(f"{os.cpu_count()} CPUs, {ops:,} commands in {args.rounds} batches")
+    elapsed = _single(batches)
+    print(f"{'single process:':18s} {ops / elapsed:>12,.0f} commands/s")
+    base = None
+    for shards in args.shards:
+        with ShardedAccountManager(shards) as mgr:
+            start = time.perf_counter()
+            for batch in batches:
+                mgr.execute(batch)
+            elapsed = time.perf_counter() - start
+            total = mgr.total_balance_minor()
+        expected = args.accounts // args.rounds * args.rounds * INITIAL
+        assert total == expected, f"money not conserved: {total} != {expected}"
+        rate = ops / elapsed
+        base = base or rate
+        print(f"{f'{shards} shard(s):':18s} {rate:>12,.0f} commands/s  ({rate / base:.2f}x)  total ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Writer throughput and stalls while a reader reads the whole book.
+
+Writer threads run random transfers on a ConcurrentAccountManager for
+``--seconds`` while one reader reads every account each ``--interval``
+seconds (a periodic report or audit), in one of three ways:
+
+    none       no reader (the baseline)
+    snapshot   ``mgr.snapshot()``: copy-on-write, no manager lock while reading
+    locked     all stripes held while reading (the consistent read without MVCC)
+
+``--read total`` sums the balances; ``--read rows`` copies out every
+``(account_id, owner, balance_minor)`` row, as :func:`bank.reporting.accounts_frame`
+does. Every read checks that the total is exact.
+
+It prints transfers per second, the 99th and 99.9th percentile and slowest
+single transfer, and the reads completed. Under the GIL a snapshot reader
+still shares the interpreter with the writers; what it removes is the time
+they spend waiting on stripes, which grows with the book and the report.
+
+Usage:
+    python benchmarks/bench_snapshot.py --accounts 500000 --read rows --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.concurrent import ConcurrentAccountManager  # noqa: E402
+
+
+def locked_read(mgr: ConcurrentAccountManager, rows: bool) -> int:
+    locks = mgr._acquire_all()
+    try:
+        if rows:
+            copied = [(a.name, getattr(a, "owner", ""), a.balance_minor) for a in mgr.storage.accounts()]
+            return sum(balance for _, _, balance in copied)
+        return sum(a.balance_minor for a in mgr.storage.accounts())
+    finally:
+        mgr._release(locks)
+
+
+def snapshot_read(mgr: ConcurrentAccountManager, rows: bool) -> int:
+    with mgr.snapshot() as snap:
+        if rows:
+            return sum(balance for _, _, balance in list(snap.rows()))
+        return snap.total_minor()
+
+
+def run(mode: str, args: argparse.Namespace) -> Dict[str, float]:
+    ids = [f"ACC{i:08d}" for i in range(args.accounts)]
+    mgr = ConcurrentAccountManager(stripes=args.stripes)
+    mgr.create_many([(i, "", 100) for i in ids])
+    expected = 10_000 * len(ids)
+    stop = threading.Event()
+    counts: List[int] = []
+    latencies: List[float] = []
+    reads = 0
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(10_000)]
+        took: List[float] = []
+        clock = time.perf_counter
+        while not stop.is_set():
+            src, dst = pairs[len(took) % len(pairs)]
+            start = clock()
+            mgr.transfer(src, dst, 0.01)
+            took.append(clock() - start)
+        counts.append(len(took))
+        latencies.extend(took)
+
+    threads = [threading.Thread(target=writer, args=(args.seed + i,)) for i in range(args.writers)]
+    for t in threads:
+        t.start()
+    readers: Dict[str, Callable[[ConcurrentAccountManager, bool], int]] = {
+        "snapshot": snapshot_read,
+        "locked": locked_read,
+    }
+    read = readers.get(mode)
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        time.sleep(args.interval)
+        if read is None:
+            continue
+        total = read(mgr, args.read == "rows")
+        if total != expected:
+            raise AssertionError(f"{mode} read {total}, expected {expected}")
+        reads += 1
+    stop.set()
+    for t in threads:
+        t.join()
+    latencies.sort()
+    return {
+        "transfers/s": sum(counts) / args.seconds,
+        "p99 ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+        "p99.9 ms": latencies[int(len(latencies) * 0.999)] * 1e3,
+        "max ms": latencies[-1] * 1e3,
+        "reads": reads,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=200_000)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--stripes", type=int, default=64)
+    parser.add_argument("--read", choices=("total", "rows"), default="rows")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=0.1, help="pause between reads")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    print(f"{'reader':>10} {'transfers/s':>12} {'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8} {'reads':>6}")
+    for mode in ("none", "snapshot", "locked"):
+        r = run(mode, args)
+        print(
+            f"{mode:>10} {r['transfers/s']:12,.0f} {r['p99 ms']:8.3f} {r['p99.9 ms']:9.3f}"
+            f" {r['max ms']:8.1f} {r['reads']:6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
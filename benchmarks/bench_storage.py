@@ -0,0 +1,69 @@
+"""Throughput of AccountManager on each storage backend.
+
+Runs the same seeded workload against the in-memory store and a SQLite file
+(WAL, ``synchronous=NORMAL``) and prints operations per second for bulk and
+single creates, reads of hot accounts, deposits, transfers and a batch.
+
+Usage:
+    python benchmarks/bench_storage.py --accounts 100000 --ops 50000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank.manager import AccountManager  # noqa: E402
+from bank.sqlite_storage import SQLiteStorage  # noqa: E402
+from bank.storage import Storage  # noqa: E402
+
+
+def rate(n: int, fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(storage: Optional[Storage], args: argparse.Namespace) -> Dict[str, float]:
+    rng = random.Random(args.seed)
+    ids = [f"ACC{i:08d}" for i in range(args.accounts)]
+    hot = ids[: args.hot]
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.ops)]
+    reads = [rng.choice(hot) for _ in range(args.ops)]
+    singles = [f"NEW{i:08d}" for i in range(min(args.ops, 10_000))]
+    mgr = AccountManager(storage=storage)
+    results = {
+        "create_many": rate(len(ids), lambda: mgr.create_many([(i, "", 1000) for i in ids])),
+        "create": rate(len(singles), lambda: [mgr.create(i, "", 10) for i in singles] and None),
+        "get (hot)": rate(len(reads), lambda: [mgr.get(i) for i in reads] and None),
+        "deposit": rate(len(reads), lambda: [mgr.deposit(i, 1) for i in reads] and None),
+        "transfer": rate(len(pairs), lambda: [mgr.transfer(s, d, 0.01) for s, d in pairs] and None),
+        "apply_batch": rate(len(pairs), lambda: mgr.apply_batch([(s, d, 1) for s, d in pairs], minor_units=True)
+                            and None),
+    }
+    mgr.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--hot", type=int, default=1000, help="accounts the reads and deposits go to")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {"memory": run(None, args), "sqlite": run(SQLiteStorage(Path(tmp) / "bench.db"), args)}
+    print(f"{'ops/s':>12} " + " ".join(f"{name:>12}" for name in backends))
+    for op in backends["memory"]:
+        print(f"{op:>12} " + " ".join(f"{r[op]:12,.0f}" for r in backends.values()))
+
+
+if __name__ == "__main__":
+    main()
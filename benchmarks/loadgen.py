@@ -0,0 +1,114 @@
+"""Load generator for :mod:`bank.server`.
+
+Opens ``--clients`` connections, each keeping ``--depth`` requests in flight,
+and drives a transfer/deposit mix for ``--seconds``. Reports ops/sec and
+p50/p99 latency. Without ``--port``/``--unix`` an in-process server is
+started on an ephemeral port.
+
+Usage:
+    python benchmarks/loadgen.py --clients 1000 --depth 8 --seconds 10
+    python benchmarks/loadgen.py --port 8765 --clients 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bank import exceptions as exc  # noqa: E402
+from bank.client import BankClient  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+from bank.server import BankServer  # noqa: E402
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def _drive(client: BankClient, ids: list[str], deadline: float, depth: int, seed: int,
+                 latencies: list[float]) -> None:
+    rng = random.Random(seed)
+
+    async def lane() -> None:
+        while time.perf_counter() < deadline:
+            src, dst = rng.sample(ids, 2)
+            start = time.perf_counter()
+            try:
+                if rng.random() < 0.8:
+                    await client.transfer(src, dst, 1)
+                else:
+                    await client.deposit(src, 1)
+            except exc.BankingError:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(lane() for _ in range(depth)))
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = None
+    host, port, path = args.host, args.port, args.unix
+    if port is None and path is None:
+        server = BankServer(AccountManager())
+        await server.start()
+        host, port = server.address[:2]
+
+    setup = await BankClient.connect(host, port or 0, path)
+    ids = [f"LG{i:06d}" for i in range(args.accounts)]
+    for account_id in ids:
+        try:
+            await setup.create(account_id, "", 1_000_000)
+        except exc.DuplicateAccountError:
+            pass
+    await setup.close()
+
+    clients = [await BankClient.connect(host, port or 0, path) for _ in range(args.clients)]
+    latencies: list[float] = []
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    await asyncio.gather(
+        *(_drive(c, ids, deadline, args.depth, args.seed + i, latencies) for i, c in enumerate(clients))
+    )
+    elapsed = time.perf_counter() - start
+    for c in clients:
+        await c.close()
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    print(f"clients={args.clients} depth={args.depth} requests={len(latencies):,}")
+    print(f"throughput: {len(latencies) / elapsed:>12,.0f} ops/s")
+    print(f"latency p50: {_percentile(latencies, 50) * 1e3:8.3f} ms")
+    print(f"latency p99: {_percentile(latencies, 99) * 1e3:8.3f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--unix")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=4, help="requests in flight per client")
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    # thousands of clients need thousands of file descriptors (two per in-process connection)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, 4 * args.clients + 64))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
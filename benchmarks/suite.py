@@ -0,0 +1,256 @@
+"""Seeded benchmark suite with JSON results and a baseline regression gate.
+
+Scenarios:
+    single_op      ns per call of BankAccount / AccountManager operations
+    throughput     transfers per second, per-call and through apply_batch
+    create_scaling create cost at 10^3 .. 10^N accounts
+    memory         traced bytes per account held by AccountManager
+    cli_startup    wall time of ``python src/cli.py --help``
+
+Every metric records its unit and whether lower or higher is better. With
+``--baseline`` each metric is compared to the stored value and the run exits
+non-zero if any is worse by more than ``--tolerance`` (a fraction).
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.25
+    python benchmarks/suite.py --only single_op throughput --quick
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bank.account import BankAccount  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict[str, Any]:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _ns_per_op(fn: Callable[[int], None], ops: int, repeat: int) -> float:
+    # best of ``repeat`` runs: the least disturbed by the rest of the machine
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        fn(ops)
+        best = min(best, (time.perf_counter_ns() - start) / ops)
+    return best
+
+
+def _ids(n: int) -> List[str]:
+    return [f"ACC{i:08d}" for i in range(n)]
+
+
+def _book(n: int) -> AccountManager:
+    mgr = AccountManager()
+    for account_id in _ids(n):
+        mgr.create(account_id, "", 1_000_000)
+    return mgr
+
+
+# -- scenarios -----------------------------------------------------------------
+def single_op(scale: int, seed: int, repeat: int) -> Metrics:
+    ops = 100_000 * scale
+    acct = BankAccount("bench")
+    mgr = _book(1_000)
+    rng = random.Random(seed)
+    ids = _ids(1_000)
+    pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(ops)]
+
+    def account_deposit(n: int) -> None:
+        for _ in range(n):
+            acct.deposit(1.25)
+
+    def account_deposit_minor(n: int) -> None:
+        for _ in range(n):
+            acct.deposit_minor(125)
+
+    def manager_get(n: int) -> None:
+        get = mgr.get
+        for src, _ in pairs[:n]:
+            get(src)
+
+    def manager_deposit(n: int) -> None:
+        for src, _ in pairs[:n]:
+            mgr.deposit(src, 1.25)
+
+    def manager_transfer(n: int) -> None:
+        for src, dst in pairs[:n]:
+            mgr.transfer(src, dst, 0.01)
+
+    return {
+        f"single_op.{fn.__name__}": _metric(_ns_per_op(fn, ops, repeat), "ns/op")
+        for fn in (account_deposit, account_deposit_minor, manager_get, manager_deposit, manager_transfer)
+    }
+
+
+def throughput(scale: int, seed: int, repeat: int) -> Metrics:
+    postings = 200_000 * scale
+    rng = random.Random(seed)
+    ids = _ids(10_000)
+    batch = [(rng.choice(ids), rng.choice(ids), rng.randint(1, 10_000)) for _ in range(postings)]
+    results: Metrics = {}
+    for label, run in [
+        ("transfer_loop", lambda mgr: [mgr.transfer(s, d, a / 100) for s, d, a in batch]),
+        ("apply_batch", lambda mgr: mgr.apply_batch([(s, d, a / 100) for s, d, a in batch])),
+        ("apply_batch_minor", lambda mgr: mgr.apply_batch(batch, minor_units=True)),
+    ]:
+        best = float("inf")
+        for _ in range(repeat):
+            mgr = _book(10_000)
+            start = time.perf_counter()
+            run(mgr)
+            best = min(best, time.perf_counter() - start)
+        results[f"throughput.{label}"] = _metric(postings / best, "transfers/s", "higher")
+    return results
+
+
+def create_scaling(max_exponent: int, seed: int, repeat: int) -> Metrics:
+    results: Metrics = {}
+    for exponent in range(3, max_exponent + 1):
+        n = 10**exponent
+        ids = _ids(n)
+        random.Random(seed).shuffle(ids)
+        best = float("inf")
+        for _ in range(repeat if exponent < 6 else 1):
+            mgr = AccountManager()
+            gc.collect()
+            start = time.perf_counter_ns()
+            for account_id in ids:
+                mgr.create(account_id, "", 100)
+            best = min(best, (time.perf_counter_ns() - start) / n)
+            del mgr
+        results[f"create_scaling.1e{exponent}"] = _metric(best, "ns/create")
+    return results
+
+
+def memory(scale: int, seed: int, repeat: int) -> Metrics:
+    n = 100_000 * scale
+    ids = _ids(n)  # allocated before tracing: only per-account overhead counts
+    gc.collect()
+    tracemalloc.start()
+    mgr = AccountManager()
+    for i, account_id in enumerate(ids):
+        mgr.create(account_id, "Alice" if i % 2 else "", i % 1000)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"memory.manager": _metric(used / n, "bytes/account")}
+
+
+def cli_startup(scale: int, seed: int, repeat: int) -> Metrics:
+    samples = []
+    for _ in range(max(repeat, 5)):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(ROOT / "src" / "cli.py"), "--help"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        samples.append((time.perf_counter() - start) * 1e3)
+    return {"cli_startup.help": _metric(statistics.median(samples), "ms")}
+
+
+SCENARIOS = {
+    "single_op": single_op,
+    "throughput": throughput,
+    "create_scaling": create_scaling,
+    "memory": memory,
+    "cli_startup": cli_startup,
+}
+
+
+# -- baseline gate ---------------------------------------------------------------
+def compare(results: Metrics, baseline: Metrics, tolerance: float) -> List[str]:
+    """Return one message per metric that is worse than ``baseline`` by more than ``tolerance``.
+
+    Metrics missing from either side are skipped, so scenarios can be added
+    or run selectively without invalidating the baseline.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None or not reference["value"]:
+            continue
+        change = current["value"] / reference["value"] - 1
+        if current["better"] == "higher":
+            change = -change
+        if change > tolerance:
+            regressions.append(
+                f"{name}: {current['value']:,} {current['unit']} vs baseline "
+                f"{reference['value']:,} ({change:+.0%} worse, tolerance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scale = 1 if args.quick else 5
+    metrics: Metrics = {}
+    for name in args.only or SCENARIOS:
+        print(f"running {name} ...", file=sys.stderr)
+        size = args.max_exponent if name == "create_scaling" else scale
+        metrics.update(SCENARIOS[name](size, args.seed, args.repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "quick": args.quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "metrics": metrics,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="scenarios to run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is kept)")
+    parser.add_argument("--max-exponent", type=int, default=6, help="create_scaling up to 10^N accounts")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, e.g. for CI")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="fail if results regress against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression (fraction)")
+    parser.add_argument("--save-baseline", type=Path, help="write results as the new baseline")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(text + "\n", encoding="utf-8")
+    for name, m in report["metrics"].items():
+        print(f"{name:40s} {m['value']:>16,.1f} {m['unit']}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["metrics"]
+        regressions = compare(report["metrics"], baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
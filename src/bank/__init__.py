@@ -1,15 +1,43 @@
-# Contents of the file: /cli-banking-app/cli-banking-app/src/bank/__init__.py
 """Bank domain package.
 
 Exports:
 	BankAccount -- core account model
 	AccountManager -- in-memory manager
 	exceptions -- module containing domain-specific exception types
-"""
 
-from .account import BankAccount  # noqa: F401
-from .manager import AccountManager  # noqa: F401
-from . import exceptions  # noqa: F401
+The exports are loaded on first access (PEP 562), so ``import bank`` and
+imports of a single submodule do not pull in the rest of the package.
 """
-This is the bank package for the command-line banking application.
-"""
\ No newline at end of file
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from bank import exceptions  # noqa: F401
+    from bank.account import BankAccount  # noqa: F401
+    from bank.manager import AccountManager  # noqa: F401
+
+# exported name -> (module, attribute); attribute None exports the module itself
+_LAZY: Dict[str, Tuple[str, Optional[str]]] = {
+    "BankAccount": ("bank.account", "BankAccount"),
+    "AccountManager": ("bank.manager", "AccountManager"),
+    "exceptions": ("bank.exceptions", None),
+}
+
+__all__ = ["BankAccount", "AccountManager", "exceptions"]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value  # later lookups bypass __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
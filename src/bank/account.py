@@ -1,42 +1,63 @@
 from __future__ import annotations
 from typing import Union
+from decimal import Decimal
 from bank.exceptions import (
     NegativeAmountError,
     InsufficientFundsError,
 )
+from bank.money import SCALE, to_minor
 
-Number = Union[int, float]
+Number = Union[int, float, Decimal]
 
 
 class BankAccount:
     """Simple in‑memory bank account.
 
-    NOTE: Uses ``float`` for simplicity. For real financial applications use
-    :class:`decimal.Decimal` with an agreed context to avoid floating point
-    rounding issues.
+    The balance is held exactly as integer minor units in ``balance_minor``;
+    ``balance`` exposes it as a float for display and existing callers.
+    Amounts given to :meth:`deposit`, :meth:`withdraw` and :meth:`transfer` are
+    converted once with :func:`bank.money.to_minor`. The ``*_minor`` variants
+    take integer minor units directly and skip that conversion (hot path).
     """
 
     def __init__(self, name: str, balance: Number = 0.0) -> None:
         self.name = str(name)
-        self.balance = float(balance)
+        self.balance_minor = to_minor(balance, "Balance")
+
+    @classmethod
+    def from_minor(cls, name: str, balance_minor: int) -> "BankAccount":
+        acct = cls.__new__(cls)
+        acct.name = str(name)
+        acct.balance_minor = balance_minor
+        return acct
+
+    @property
+    def balance(self) -> float:
+        return self.balance_minor / SCALE
+
+    @balance.setter
+    def balance(self, value: Number) -> None:
+        self.balance_minor = to_minor(value, "Balance")
 
     def deposit(self, amount: Number) -> float:
-        if not isinstance(amount, (int, float)):
-            raise TypeError("Deposit amount must be a number.")
+        return self.deposit_minor(to_minor(amount, "Deposit amount")) / SCALE
+
+    def withdraw(self, amount: Number) -> float:
+        return self.withdraw_minor(to_minor(amount, "Withdrawal amount")) / SCALE
+
+    def deposit_minor(self, amount: int) -> int:
         if amount <= 0:
             raise NegativeAmountError("Deposit amount must be positive.")
-        self.balance += float(amount)
-        return self.balance
+        self.balance_minor += amount
+        return self.balance_minor
 
-    def withdraw(self, amount: Number) -> float:
-        if not isinstance(amount, (int, float)):
-            raise TypeError("Withdrawal amount must be a number.")
+    def withdraw_minor(self, amount: int) -> int:
         if amount <= 0:
             raise NegativeAmountError("Withdrawal amount must be positive.")
-        if amount > self.balance:
+        if amount > self.balance_minor:
             raise InsufficientFundsError("Insufficient funds.")
-        self.balance -= float(amount)
-        return self.balance
+        self.balance_minor -= amount
+        return self.balance_minor
 
     def transfer(self, target_account: "BankAccount", amount: Number) -> None:
         """Transfer ``amount`` from this account to ``target_account``.
@@ -46,10 +67,15 @@ class BankAccount:
         """
         if not isinstance(target_account, BankAccount):
             raise TypeError("target_account must be a BankAccount instance.")
-        if not isinstance(amount, (int, float)):
-            raise TypeError("Transfer amount must be a number.")
+        self.transfer_minor(target_account, to_minor(amount, "Transfer amount"))
+
+    def transfer_minor(self, target_account: "BankAccount", amount: int) -> None:
         if amount <= 0:
             raise NegativeAmountError("Transfer amount must be positive.")
         # reuse withdraw/deposit to keep validation consistent
-        self.withdraw(amount)
-        target_account.deposit(amount)
\ No newline at end of file
+        self.withdraw_minor(amount)
+        try:
+            target_account.deposit_minor(amount)
+        except BaseException:
+            self.balance_minor += amount  # e.g. a view of a deleted account refused it
+            raise
@@ -0,0 +1,144 @@
+"""End-of-day interest accrual and fee run, vectorised with NumPy.
+
+A :class:`Schedule` describes tiered (banded) annual interest rates and a
+periodic account fee. :func:`postings` computes every account's interest and
+fee for one run from a column of balances; :meth:`AccountManager.end_of_day
+<bank.manager.AccountManager.end_of_day>` feeds it the book in chunks of
+``chunk_size`` accounts, so working memory stays bounded however large the
+book is, writes the new balances back and logs one deposit (or withdrawal)
+per changed account with the *net* amount.
+
+Interest is exact: rates are fixed-point integers (scale :data:`RATE_SCALE`)
+and each account's accrual is computed as an integer fraction in ``int64``
+and rounded once, half to even, to whole minor units. There is no float
+arithmetic and no drift between runs.
+
+Tiers are marginal: with tiers ``(0, 1%)`` and ``(1_000_000, 2%)`` the first
+10,000.00 of a balance earns 1% and only the part above it earns 2%. Balances
+at or below zero earn nothing. The fee is waived at or above
+``fee_waiver_minor`` and never takes a balance below zero.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from bank.money import parse
+
+RATE_SCALE = 1_000_000  # rates are exact to 0.0001 %
+CHUNK_ACCOUNTS = 1_000_000
+DAY_COUNTS = (360, 365, 366)
+
+Rate = Union[str, Decimal, float, int]
+
+
+class Tier(NamedTuple):
+    """Annual ``rate`` (e.g. ``"0.0125"``) on the part of a balance above ``floor_minor``."""
+
+    floor_minor: int
+    rate: Rate
+
+
+class Schedule(NamedTuple):
+    """Interest tiers, fee and day-count basis for :meth:`~bank.manager.AccountManager.end_of_day`."""
+
+    tiers: Sequence[Tier] = ()
+    fee_minor: int = 0
+    fee_waiver_minor: Optional[int] = None
+    day_count: int = 365
+
+
+class AccrualResult(NamedTuple):
+    accounts: int
+    interest_minor: int
+    credited: int  # accounts that earned interest
+    fees_minor: int
+    charged: int  # accounts that paid a fee
+
+
+def scaled_rate(rate: Rate) -> int:
+    """Annual rate as an integer number of ``1 / RATE_SCALE`` units; must lie in [0, 1]."""
+    try:
+        value = Decimal(str(rate)) * RATE_SCALE
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid interest rate {rate!r}.") from e
+    if not value.is_finite() or value != value.to_integral_value():
+        raise ValueError(f"Interest rate {rate!r} has more precision than 1/{RATE_SCALE}.")
+    if not 0 <= value <= RATE_SCALE:
+        raise ValueError(f"Interest rate {rate!r} must be between 0 and 1.")
+    return int(value)
+
+
+def validate(schedule: Schedule, days: int = 1) -> Tuple[Tuple[int, Optional[int], int], ...]:
+    """Check a schedule and run length; return ``(floor, width or None, scaled rate)`` per tier.
+
+    Raises:
+        ValueError: for unknown day counts, bad rates, floors or fees, or ``days`` outside 1..366.
+    """
+    if not 1 <= days <= 366:
+        raise ValueError("days must be between 1 and 366.")
+    if schedule.day_count not in DAY_COUNTS:
+        raise ValueError(f"day_count must be one of {DAY_COUNTS}.")
+    if schedule.fee_minor < 0:
+        raise ValueError("fee_minor must not be negative.")
+    tiers = sorted(schedule.tiers, key=lambda t: t.floor_minor)
+    floors = [t.floor_minor for t in tiers]
+    if len(set(floors)) != len(floors) or any(f < 0 for f in floors):
+        raise ValueError("Tier floors must be distinct and non-negative.")
+    return tuple(
+        (t.floor_minor, floors[i + 1] - t.floor_minor if i + 1 < len(tiers) else None, scaled_rate(t.rate))
+        for i, t in enumerate(tiers)
+    )
+
+
+def postings(
+    balances: np.ndarray, schedule: Schedule, days: int = 1, charge_fees: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(interest, fees)`` in minor units for an ``int64`` column of balances.
+
+    Interest covers ``days`` days on the ``schedule.day_count`` basis; fees
+    are charged after interest and only with ``charge_fees``.
+    """
+    bands = validate(schedule, days)
+    balances = np.asarray(balances, dtype=np.int64)
+    denominator = RATE_SCALE * schedule.day_count
+    positive = np.maximum(balances, 0)
+    # interest = sum(portion * rate * days) / denominator, split as
+    # portion = q * denominator + r so every product fits in int64
+    whole = np.zeros_like(balances)
+    rest = np.zeros_like(balances)
+    for floor, width, rate in bands:
+        numerator = rate * days
+        if not numerator:
+            continue
+        portion = positive - floor
+        np.maximum(portion, 0, out=portion)
+        if width is not None:
+            np.minimum(portion, width, out=portion)
+        q, r = np.divmod(portion, denominator)
+        whole += q * numerator
+        rest += r * numerator
+    q, r = np.divmod(rest, denominator)
+    interest = whole + q
+    twice = 2 * r
+    interest += (twice > denominator) | ((twice == denominator) & (interest & 1).astype(bool))
+
+    if not charge_fees or not schedule.fee_minor:
+        return interest, np.zeros_like(balances)
+    after = balances + interest
+    fees = np.full_like(balances, schedule.fee_minor)
+    if schedule.fee_waiver_minor is not None:
+        fees[after >= schedule.fee_waiver_minor] = 0
+    np.minimum(fees, np.maximum(after, 0), out=fees)
+    return interest, fees
+
+
+def parse_tiers(spec: str) -> Tuple[Tier, ...]:
+    """Parse ``"RATE"`` or ``"FLOOR:RATE,FLOOR:RATE,..."`` (floors in currency units) into tiers."""
+    tiers = []
+    for part in spec.split(","):
+        floor, _, rate = part.strip().rpartition(":")
+        tiers.append(Tier(parse(floor) if floor else 0, rate.strip()))
+    return tuple(tiers)
@@ -0,0 +1,174 @@
+"""Async client for :mod:`bank.server`.
+
+Calls made concurrently on one :class:`BankClient` are pipelined over a single
+connection: each request is written immediately and matched to its response
+by id, so callers can keep many requests in flight::
+
+    async with await BankClient.connect(port=8765) as client:
+        await client.create("A1", "Alice", "100.00")
+        await asyncio.gather(*(client.deposit("A1", "1.00") for _ in range(1000)))
+
+Server errors are re-raised as the matching :mod:`bank.exceptions` type (or
+``TypeError`` / ``ValueError``); anything else becomes
+:class:`~bank.exceptions.RemoteError`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bank import exceptions as exc
+
+_HIGH_WATER = 1 << 16  # bytes buffered before a call waits for the socket to drain
+_BUILTIN_ERRORS = {"TypeError": TypeError, "ValueError": ValueError}
+
+
+def _wire_amount(amount: Any) -> Any:
+    return str(amount) if isinstance(amount, Decimal) else amount
+
+
+def _key(idempotency_key: Optional[str]) -> Dict[str, str]:
+    # sent only when set, so requests stay valid for servers without the argument
+    return {} if idempotency_key is None else {"idempotency_key": idempotency_key}
+
+
+def _to_exception(response: Dict[str, Any]) -> Exception:
+    name = response.get("error", "")
+    message = response.get("message", "")
+    cls = _BUILTIN_ERRORS.get(name) or getattr(exc, name, None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        try:
+            return cls(message)
+        except TypeError:  # e.g. BatchError needs structured arguments
+            pass
+    return exc.RemoteError(f"{name}: {message}")
+
+
+class BankClient:
+    """Pipelining client for the line-delimited JSON bank protocol."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, asyncio.Future[Any]] = {}
+        self._next_id = 0
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None
+    ) -> "BankClient":
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=1 << 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def call(self, op: str, **args: Any) -> Any:
+        """Send one request and wait for its result."""
+        if self._read_task.done():
+            raise ConnectionError("Connection to bank server is closed.")
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(
+            json.dumps({"id": request_id, "op": op, "args": args}, separators=(",", ":")).encode() + b"\n"
+        )
+        if self._writer.transport.get_write_buffer_size() > _HIGH_WATER:
+            await self._writer.drain()
+        return await future
+
+    async def _read_loop(self) -> None:
+        pending = self._pending
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if response.get("ok"):
+                    future.set_result(response.get("result"))
+                else:
+                    future.set_exception(_to_exception(response))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            error = ConnectionError("Connection to bank server closed.")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            pending.clear()
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._read_task.cancel()
+        try:
+            await self._read_task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> "BankClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    # -- convenience wrappers --------------------------------------------------
+    async def create(
+        self, account_id: str, owner: str = "", initial: Any = 0, idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return await self.call(
+            "create",
+            account_id=account_id,
+            owner=owner,
+            initial=_wire_amount(initial),
+            **_key(idempotency_key),
+        )
+
+    async def get(self, account_id: str) -> Optional[Dict[str, Any]]:
+        return await self.call("get", account_id=account_id)
+
+    async def deposit(self, account_id: str, amount: Any, idempotency_key: Optional[str] = None) -> int:
+        """Deposit and return the new balance in minor units."""
+        return await self.call(
+            "deposit", account_id=account_id, amount=_wire_amount(amount), **_key(idempotency_key)
+        )
+
+    async def withdraw(self, account_id: str, amount: Any, idempotency_key: Optional[str] = None) -> int:
+        """Withdraw and return the new balance in minor units."""
+        return await self.call(
+            "withdraw", account_id=account_id, amount=_wire_amount(amount), **_key(idempotency_key)
+        )
+
+    async def transfer(
+        self, src_id: str, dst_id: str, amount: Any, idempotency_key: Optional[str] = None
+    ) -> None:
+        await self.call(
+            "transfer", src_id=src_id, dst_id=dst_id, amount=_wire_amount(amount), **_key(idempotency_key)
+        )
+
+    async def delete(self, account_id: str, idempotency_key: Optional[str] = None) -> None:
+        await self.call("delete", account_id=account_id, **_key(idempotency_key))
+
+    async def apply_batch(
+        self,
+        postings: Iterable[Tuple[str, str, Any]],
+        atomic: bool = False,
+        idempotency_key: Optional[str] = None,
+    ) -> List[Optional[str]]:
+        """Apply postings server-side; returns ``None`` or an error name per posting."""
+        rows = [[src, dst, _wire_amount(amount)] for src, dst, amount in postings]
+        return await self.call("batch", postings=rows, atomic=atomic, **_key(idempotency_key))
+
+    async def list_accounts(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.call("list", offset=offset, limit=limit)
@@ -0,0 +1,235 @@
+"""Columnar, array-backed account store.
+
+:class:`ColumnarAccountManager` is an alternative to
+:class:`~bank.manager.AccountManager` for very large books. Instead of one
+:class:`~bank.account.BankAccount` object per account it keeps:
+
+* balances in one contiguous ``array('q')`` of fixed-point minor units (cents),
+* account ids interned into a dense slot index (``id -> slot``),
+* owners interned into a side table, referenced by a 32-bit code per slot.
+
+:class:`AccountView` objects are created on demand by :meth:`get` and
+:meth:`list_accounts`; they behave like a ``BankAccount`` but read and write
+the columns directly. Aggregate queries run over the balance column with NumPy
+when it is installed and fall back to plain iteration otherwise.
+
+Deleted accounts leave a zero-balance hole in the columns; slots are never
+reused, so a view held across a delete can never alias another account.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bank.account import BankAccount, Number
+from bank.exceptions import (
+    AccountNotFoundError,
+    BatchError,
+    DuplicateAccountError,
+    InsufficientFundsError,
+    NegativeAmountError,
+)
+from bank.money import SCALE, to_minor
+
+_BALANCE_MIN, _BALANCE_MAX = -(1 << 63), (1 << 63) - 1  # array('q')
+
+
+def _to_minor(amount: Number, what: str) -> int:
+    minor = to_minor(amount, f"{what} amount")
+    if minor <= 0:
+        raise NegativeAmountError(f"{what} amount must be positive.")
+    return minor
+
+
+def _check_credit(balance: int, minor: int) -> None:
+    # before any column is written: array('q') would raise OverflowError midway
+    if balance > _BALANCE_MAX - minor:
+        raise ValueError(f"Balance {balance + minor} would not fit a signed 64-bit column.")
+
+
+class AccountView(BankAccount):
+    """Lightweight ``BankAccount`` facade over one slot of a columnar book.
+
+    ``balance_minor`` reads and writes the book's balance column, so the
+    inherited ``deposit`` / ``withdraw`` / ``transfer`` operate in place.
+    """
+
+    def __init__(self, book: "ColumnarAccountManager", slot: int) -> None:
+        # BankAccount.__init__ is deliberately not called: state lives in the book.
+        self._book = book
+        self._slot = slot
+
+    @property
+    def name(self) -> str:
+        account_id = self._book._ids[self._slot]
+        if account_id is None:
+            raise AccountNotFoundError("Account has been deleted.")
+        return account_id
+
+    @name.setter
+    def name(self, value: str) -> None:
+        raise AttributeError("Account ids cannot be changed.")
+
+    @property
+    def owner(self) -> str:
+        return self._book._owners[self._book._owner_codes[self._slot]]
+
+    @property
+    def balance_minor(self) -> int:
+        return self._book._balances[self._slot]
+
+    @balance_minor.setter
+    def balance_minor(self, value: int) -> None:
+        if self._book._ids[self._slot] is None:  # a view held across delete() must not revive the slot
+            raise AccountNotFoundError("Account has been deleted.")
+        if not _BALANCE_MIN <= value <= _BALANCE_MAX:
+            raise ValueError(f"Balance {value} would not fit a signed 64-bit column.")
+        self._book._balances[self._slot] = value
+
+    def __repr__(self) -> str:
+        return f"AccountView({self.name!r}, balance={self.balance:.2f})"
+
+
+class ColumnarAccountManager:
+    """Manage accounts as columns of fixed-point balances.
+
+    Exposes the same operations as :class:`~bank.manager.AccountManager`
+    (``create``, ``get``, ``list_accounts``, ``deposit``, ``withdraw``,
+    ``transfer``, ``delete``, ``apply_batch``) plus vectorised aggregates.
+    """
+
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._balances = array("q")
+        self._owner_codes = array("I")
+        self._owners: List[str] = [""]
+        self._owner_index: Dict[str, int] = {"": 0}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # -- slot primitives -------------------------------------------------------
+    def _slot(self, account_id: str, role: str = "Account") -> int:
+        slot = self._index.get(account_id)
+        if slot is None:
+            raise AccountNotFoundError(f"{role} '{account_id}' not found.")
+        return slot
+
+    def _deposit_slot(self, slot: int, minor: int) -> float:
+        _check_credit(self._balances[slot], minor)
+        self._balances[slot] += minor
+        return self._balances[slot] / SCALE
+
+    def _withdraw_slot(self, slot: int, minor: int) -> float:
+        if minor > self._balances[slot]:
+            raise InsufficientFundsError("Insufficient funds.")
+        self._balances[slot] -= minor
+        return self._balances[slot] / SCALE
+
+    def _transfer_slots(self, src: int, dst: int, minor: int) -> None:
+        balances = self._balances
+        if minor > balances[src]:
+            raise InsufficientFundsError("Insufficient funds.")
+        if src != dst:
+            _check_credit(balances[dst], minor)
+        balances[src] -= minor
+        balances[dst] += minor
+
+    # -- AccountManager API ----------------------------------------------------
+    def create(self, account_id: str, owner: str = "", initial: Number = 0.0) -> AccountView:
+        if account_id in self._index:
+            raise DuplicateAccountError(f"Account id '{account_id}' already exists.")
+        code = self._owner_index.get(owner)
+        if code is None:
+            code = self._owner_index[owner] = len(self._owners)
+            self._owners.append(owner)
+        slot = len(self._ids)
+        self._balances.append(to_minor(initial, "Initial balance"))
+        self._owner_codes.append(code)
+        self._ids.append(account_id)
+        self._index[account_id] = slot
+        return AccountView(self, slot)
+
+    def get(self, account_id: str) -> Optional[AccountView]:
+        slot = self._index.get(account_id)
+        return None if slot is None else AccountView(self, slot)
+
+    def list_accounts(self) -> List[AccountView]:
+        return [AccountView(self, slot) for slot in self._index.values()]
+
+    def deposit(self, account_id: str, amount: Number) -> float:
+        return self._deposit_slot(self._slot(account_id), _to_minor(amount, "Deposit"))
+
+    def withdraw(self, account_id: str, amount: Number) -> float:
+        return self._withdraw_slot(self._slot(account_id), _to_minor(amount, "Withdrawal"))
+
+    def transfer(self, src_id: str, dst_id: str, amount: Number) -> None:
+        src = self._slot(src_id, "Source account")
+        dst = self._slot(dst_id, "Destination account")
+        self._transfer_slots(src, dst, _to_minor(amount, "Transfer"))
+
+    def delete(self, account_id: str) -> None:
+        slot = self._index.pop(account_id, None)
+        if slot is not None:
+            self._ids[slot] = None
+            self._balances[slot] = 0
+            self._owner_codes[slot] = 0
+
+    def apply_batch(
+        self, postings: Iterable[Tuple[str, str, float]], atomic: bool = False
+    ) -> List[Optional[Exception]]:
+        """Slot-level equivalent of :meth:`AccountManager.apply_batch`."""
+        rows = postings if isinstance(postings, list) else list(postings)
+        index = self._index
+        balances = self._balances
+        results: List[Optional[Exception]] = [None] * len(rows)
+        saved: Optional[Dict[int, int]] = {} if atomic else None
+        for i, (src_id, dst_id, amount) in enumerate(rows):
+            try:
+                src = index.get(src_id)
+                if src is None:
+                    raise AccountNotFoundError(f"Source account '{src_id}' not found.")
+                dst = index.get(dst_id)
+                if dst is None:
+                    raise AccountNotFoundError(f"Destination account '{dst_id}' not found.")
+                minor = _to_minor(amount, "Transfer")
+                if minor > balances[src]:
+                    raise InsufficientFundsError("Insufficient funds.")
+                if src != dst:
+                    _check_credit(balances[dst], minor)
+            except (TypeError, ValueError, AccountNotFoundError, NegativeAmountError, InsufficientFundsError) as e:
+                if saved is not None:
+                    for slot, value in saved.items():
+                        balances[slot] = value
+                    raise BatchError(i, e) from e
+                results[i] = e
+                continue
+            if saved is not None:
+                saved.setdefault(src, balances[src])
+                saved.setdefault(dst, balances[dst])
+            balances[src] -= minor
+            balances[dst] += minor
+        return results
+
+    # -- aggregates ------------------------------------------------------------
+    def total_balance_minor(self) -> int:
+        """Sum of all balances in minor units (deleted slots hold zero)."""
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - numpy ships with pandas
+            return sum(self._balances)
+        return int(np.frombuffer(self._balances, dtype=np.int64).sum())
+
+    def total_balance(self) -> float:
+        return self.total_balance_minor() / SCALE
+
+    def negative_balance_ids(self) -> List[str]:
+        """Ids of accounts whose balance is below zero."""
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - numpy ships with pandas
+            slots: Iterable[int] = (i for i, v in enumerate(self._balances) if v < 0)
+        else:
+            slots = np.flatnonzero(np.frombuffer(self._balances, dtype=np.int64) < 0).tolist()
+        return [self._ids[slot] for slot in slots]  # type: ignore[misc]
@@ -0,0 +1,282 @@
+"""Thread-safe :class:`~bank.manager.AccountManager` with lock striping.
+
+Each account id hashes to one of ``stripes`` locks. Single-account operations
+take that account's stripe; transfers take the stripes of both accounts in
+ascending stripe order, so two opposing transfers can never deadlock. A batch
+takes every stripe it touches, again in ascending order.
+
+Reads (:meth:`get`, :meth:`list_accounts`) take no manager lock: they rely on
+the dict's own thread-safety (the GIL, or per-object locking on free-threaded
+CPython 3.13+), or on each thread having its own connection with
+:class:`~bank.sqlite_storage.SQLiteStorage`, and return whatever is committed
+at that instant. Balance fields are only ever written while the owning stripe
+is held. Without an aggregate index, the totals, top/bottom balances and pages
+are computed from such a copy of the account list, so creates and deletes can
+run alongside them.
+
+Journal, ledger and aggregate-index updates happen under a separate leaf
+lock that is always acquired last, so their order matches the order in which
+mutations were applied; the top/bottom balance and paging queries read under
+it too. Snapshots (:meth:`checkpoint`) and the end-of-day run take all
+stripes and therefore see a consistent book.
+
+:meth:`snapshot` takes all stripes only long enough to fix a version (it
+copies nothing); the returned view is then read from any thread without a
+manager lock while writes continue (see :mod:`bank.mvcc`).
+
+With an idempotency cache, a replayed ``idempotency_key`` is answered from
+the cache before any stripe is taken.
+
+Mutating a returned :class:`~bank.account.BankAccount` directly bypasses the
+locks; go through the manager methods instead.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
+
+from bank.account import BankAccount, Number
+from bank.journal import Journal
+from bank.manager import AccountManager, _digest
+
+if TYPE_CHECKING:
+    from bank.accrual import AccrualResult, Schedule
+    from bank.aggregates import AggregateIndex
+    from bank.idempotency import IdempotencyCache
+    from bank.ledger import Ledger
+    from bank.limits import VelocityLimits
+    from bank.metrics import Metrics
+    from bank.mvcc import BookSnapshot
+    from bank.storage import Storage
+
+
+class ConcurrentAccountManager(AccountManager):
+    """AccountManager safe for concurrent use from many threads."""
+
+    def __init__(
+        self,
+        journal: Optional[Journal] = None,
+        ledger: Optional[Ledger] = None,
+        aggregates: Optional[AggregateIndex] = None,
+        metrics: Optional[Metrics] = None,
+        idempotency: Optional[IdempotencyCache] = None,
+        limits: Optional[VelocityLimits] = None,
+        storage: Optional[Storage] = None,
+        stripes: int = 64,
+    ) -> None:
+        super().__init__(journal, ledger, aggregates, metrics, idempotency, limits, storage)
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._journal_lock = threading.Lock()
+
+    # -- locking helpers -------------------------------------------------------
+    def _acquire(self, account_ids: Iterable[str]) -> List[threading.Lock]:
+        n = len(self._stripes)
+        locks = [self._stripes[i] for i in sorted({hash(a) % n for a in account_ids})]
+        for lock in locks:
+            lock.acquire()
+        return locks
+
+    @staticmethod
+    def _release(locks: List[threading.Lock]) -> None:
+        for lock in reversed(locks):
+            lock.release()
+
+    def _maybe_checkpoint(self) -> None:
+        journal = self._journal
+        if journal is not None and journal.needs_snapshot:
+            self.checkpoint()
+
+    # -- mutations -------------------------------------------------------------
+    def create(
+        self,
+        account_id: str,
+        owner: str = "",
+        initial: Number = 0.0,
+        idempotency_key: Optional[str] = None,
+    ) -> BankAccount:
+        if idempotency_key is not None:  # replays are answered before any stripe is taken
+            return self._idempotent("create", idempotency_key, (account_id, owner, initial))
+        locks = self._acquire((account_id,))
+        try:
+            acct = super().create(account_id, owner, initial)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return acct
+
+    def create_many(
+        self, rows: Iterable[Tuple[str, str, Any]], idempotency_key: Optional[str] = None
+    ) -> List[BankAccount]:
+        rows = rows if isinstance(rows, list) else list(rows)
+        if idempotency_key is not None:
+            return self._idempotent("create_many", idempotency_key, (rows,), (_digest(rows),))
+        locks = self._acquire(account_id for account_id, _, _ in rows)
+        try:
+            accounts = super().create_many(rows)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return accounts
+
+    def deposit(self, account_id: str, amount: Number, idempotency_key: Optional[str] = None) -> float:
+        if idempotency_key is not None:
+            return self._idempotent("deposit", idempotency_key, (account_id, amount))
+        locks = self._acquire((account_id,))
+        try:
+            balance = super().deposit(account_id, amount)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return balance
+
+    def withdraw(self, account_id: str, amount: Number, idempotency_key: Optional[str] = None) -> float:
+        if idempotency_key is not None:
+            return self._idempotent("withdraw", idempotency_key, (account_id, amount))
+        locks = self._acquire((account_id,))
+        try:
+            balance = super().withdraw(account_id, amount)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return balance
+
+    def delete(self, account_id: str, idempotency_key: Optional[str] = None) -> None:
+        if idempotency_key is not None:
+            return self._idempotent("delete", idempotency_key, (account_id,))
+        locks = self._acquire((account_id,))
+        try:
+            super().delete(account_id)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+
+    def transfer(
+        self, src_id: str, dst_id: str, amount: Number, idempotency_key: Optional[str] = None
+    ) -> None:
+        if idempotency_key is not None:
+            return self._idempotent("transfer", idempotency_key, (src_id, dst_id, amount))
+        locks = self._acquire((src_id, dst_id))
+        try:
+            super().transfer(src_id, dst_id, amount)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+
+    def apply_batch(
+        self,
+        postings: Iterable[Tuple[str, str, Any]],
+        atomic: bool = False,
+        minor_units: bool = False,
+        idempotency_key: Optional[str] = None,
+    ) -> List[Optional[Exception]]:
+        rows = postings if isinstance(postings, list) else list(postings)
+        if idempotency_key is not None:
+            return self._idempotent(
+                "apply_batch", idempotency_key, (rows, atomic, minor_units), (_digest(rows), atomic, minor_units)
+            )
+        locks = self._acquire(a for src_id, dst_id, _ in rows for a in (src_id, dst_id))
+        try:
+            results = super().apply_batch(rows, atomic=atomic, minor_units=minor_units)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return results
+
+    # -- aggregates ------------------------------------------------------------
+    def _scan(self) -> List[BankAccount]:
+        # a copy: walking the live dict fails if another thread creates an account meanwhile
+        return self.list_accounts()
+
+    def page_accounts(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        prefix: str = "",
+        sort: str = "id",
+        descending: bool = False,
+    ) -> Tuple[int, List[BankAccount]]:
+        with self._journal_lock:
+            return super().page_accounts(offset, limit, prefix, sort, descending)
+
+    def top_balances(self, n: int = 10) -> List[Tuple[str, int]]:
+        with self._journal_lock:
+            return super().top_balances(n)
+
+    def bottom_balances(self, n: int = 10) -> List[Tuple[str, int]]:
+        with self._journal_lock:
+            return super().bottom_balances(n)
+
+    # -- point-in-time reads ---------------------------------------------------
+    def snapshot(self) -> BookSnapshot:
+        locks = self._acquire_all()  # between writes: none is half-applied at the version
+        try:
+            return super().snapshot()
+        finally:
+            self._release(locks)
+
+    # -- durability ------------------------------------------------------------
+    def _log(self, op: int, strings: tuple, amount: Optional[int] = None) -> None:
+        # called with stripes held: append only, checkpoint after they are released
+        if self._journal is not None or self._ledger is not None or self._aggregates is not None:
+            with self._journal_lock:
+                if self._aggregates is not None:
+                    self._aggregates.record(op, strings, amount)
+                if self._ledger is not None:
+                    self._ledger.record(op, strings, amount)
+                if self._journal is not None:
+                    self._journal.append(op, strings, amount)
+
+    def _log_many(self, records: Iterable[Tuple[int, tuple, Optional[int]]]) -> None:
+        if self._journal is not None or self._ledger is not None or self._aggregates is not None:
+            with self._journal_lock:
+                for op, strings, amount in records:
+                    if self._aggregates is not None:
+                        self._aggregates.record(op, strings, amount)
+                    if self._ledger is not None:
+                        self._ledger.record(op, strings, amount)
+                    if self._journal is not None:
+                        self._journal.append(op, strings, amount)
+
+    def checkpoint(self) -> None:
+        locks = self._acquire_all()
+        try:
+            with self._journal_lock:
+                super().checkpoint()
+        finally:
+            self._release(locks)
+
+    def export_mapped(self, path: str | os.PathLike[str]) -> int:
+        locks = self._acquire_all()  # a consistent book, as for checkpoint()
+        try:
+            return super().export_mapped(path)
+        finally:
+            self._release(locks)
+
+    def end_of_day(
+        self,
+        schedule: Schedule,
+        days: int = 1,
+        charge_fees: bool = False,
+        chunk_size: int = 1_000_000,
+    ) -> AccrualResult:
+        locks = self._acquire_all()  # the whole book moves at once
+        try:
+            result = super().end_of_day(schedule, days, charge_fees, chunk_size)
+        finally:
+            self._release(locks)
+        self._maybe_checkpoint()
+        return result
+
+    def _acquire_all(self) -> List[threading.Lock]:
+        for lock in self._stripes:
+            lock.acquire()
+        return list(self._stripes)
+
+    def sync(self) -> None:
+        with self._journal_lock:
+            super().sync()
+
+    def close(self) -> None:
+        with self._journal_lock:
+            super().close()
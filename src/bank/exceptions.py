@@ -5,6 +5,8 @@ callers (CLI / API / UI) to selectively catch only what they expect.
 """
 from __future__ import annotations
 
+from typing import Optional
+
 
 class BankingError(Exception):
     """Base class for all banking related exceptions."""
@@ -23,4 +25,52 @@ class DuplicateAccountError(BankingError):
 
 
 class AccountNotFoundError(BankingError):
-    """Raised when referencing an account id that does not exist."""
\ No newline at end of file
+    """Raised when referencing an account id that does not exist."""
+
+
+class StorageError(BankingError):
+    """Raised when persisted account state cannot be read or written."""
+
+
+class BatchError(BankingError):
+    """Raised when an all-or-nothing batch is rejected; nothing was applied.
+
+    Attributes:
+        index: position of the first failing posting in the batch.
+        error: the exception raised for that posting.
+    """
+
+    def __init__(self, index: int, error: Exception) -> None:
+        super().__init__(f"Posting {index} rejected: {error}")
+        self.index = index
+        self.error = error
+
+
+class RemoteError(BankingError):
+    """Raised by :mod:`bank.client` for a server error with no matching local type."""
+
+
+class IdempotencyConflictError(BankingError):
+    """Raised when an idempotency key is reused for a different request, or replayed mid-flight."""
+
+
+class LimitExceededError(BankingError):
+    """Raised when an outflow would break a velocity limit (see :mod:`bank.limits`); nothing was applied.
+
+    Attributes:
+        limit: the :class:`~bank.limits.Limit` that was hit (``None`` when re-raised by a client).
+        key: the account id or owner it was counted against.
+    """
+
+    def __init__(self, message: str, limit: object = None, key: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.limit = limit
+        self.key = key
+
+
+class TransactionCountLimitError(LimitExceededError):
+    """Raised when an account or owner has made too many outflows within a limit's window."""
+
+
+class OutflowLimitError(LimitExceededError):
+    """Raised when an outflow would take an account's or owner's total out within a window over its limit."""
@@ -0,0 +1,137 @@
+"""Bounded replay cache that makes retried mutations idempotent.
+
+A caller that retries a mutation after a timeout cannot tell whether the
+first attempt was applied. Passing the same ``idempotency_key`` on every
+attempt fixes that: the first call runs and its result is remembered under
+the key; a replay returns the remembered result without touching any balance.
+
+:class:`IdempotencyCache` is an LRU-ordered dict (O(1) lookup, insert and
+eviction) capped at ``capacity`` keys, so memory is bounded by the cap times
+the size of one entry (the key, the request fingerprint and the result). Keys
+whose first attempt is still running are never evicted; while more calls than
+that are in flight the cache holds them all.
+Entries also expire ``ttl`` seconds after they were first claimed; an
+expired entry is dropped when it is looked up or reaches the cold end of the
+LRU order. A key is tied to the request it was first used with; reusing it
+for a different request raises
+:class:`~bank.exceptions.IdempotencyConflictError`, as does a replay that
+arrives while the first attempt is still running.
+
+Only completed calls are remembered. A call that raised releases its key, so
+a retry runs again (e.g. after the funds arrived). The cache lives in memory:
+keys do not survive a restart.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Callable, Dict, List, Tuple
+
+from bank.exceptions import IdempotencyConflictError
+
+_PENDING = object()  # result placeholder while the first attempt runs
+
+
+class IdempotencyCache:
+    """Remember mutation results by idempotency key.
+
+    Args:
+        capacity: most keys kept; the least recently used is evicted beyond it.
+        ttl: seconds a stored result can be replayed.
+        clock: monotonic time source in seconds (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        ttl: float = 24 * 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        # key -> [expires_at, request fingerprint, result or _PENDING]
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()  # held only for a few dict operations
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin(self, key: str, request: Any) -> Tuple[bool, Any]:
+        """Return ``(True, result)`` for a replay of ``key``, else claim it and return ``(False, None)``.
+
+        ``request`` is any equality-comparable description of the call; a key
+        stored for a different request raises
+        :class:`~bank.exceptions.IdempotencyConflictError`. After a miss the
+        caller must call :meth:`finish` or :meth:`release`.
+        """
+        entries = self._entries
+        with self._lock:
+            now = self.clock()
+            entry = entries.get(key)
+            if entry is not None:
+                expires, stored, result = entry
+                if result is _PENDING:
+                    raise IdempotencyConflictError(f"Request with key '{key}' is still in progress.")
+                if expires > now:
+                    if stored != request:
+                        raise IdempotencyConflictError(
+                            f"Key '{key}' was already used for a different request."
+                        )
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return True, result
+                del entries[key]
+                self.expirations += 1
+            self.misses += 1
+            entries[key] = [now + self.ttl, request, _PENDING]
+            if len(entries) > self.capacity:
+                self._evict(now)
+        return False, None
+
+    def _evict(self, now: float) -> None:
+        # least recently used completed entries first: dropping a pending one would
+        # let a retry run the mutation again once its first attempt finished
+        entries = self._entries
+        excess = len(entries) - self.capacity
+        done = (key for key, entry in entries.items() if entry[2] is not _PENDING)
+        for key in list(islice(done, excess)):  # stops at the first ``excess`` found
+            if entries.pop(key)[0] > now:
+                self.evictions += 1
+            else:
+                self.expirations += 1
+
+    def finish(self, key: str, result: Any) -> None:
+        """Store ``result`` for the key claimed by :meth:`begin`."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[2] = result  # in place: no reordering, so no lock needed
+
+    def release(self, key: str) -> None:
+        """Forget a claimed key whose call failed, so a retry runs again."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is _PENDING:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,353 @@
+"""Append-only write-ahead journal with snapshot + replay.
+
+Every mutation applied through :class:`~bank.manager.AccountManager` is
+appended to a binary journal as a length-prefixed, CRC-checked record. Records
+are buffered and written with a single ``fsync`` per *group* (group commit), so
+many mutations share the cost of one disk sync.
+
+Periodically the manager writes a compacted snapshot of the whole book and
+starts a new journal generation, so a cold start loads the snapshot and
+replays only the journal tail written after it.
+
+On-disk layout inside ``directory``::
+
+    snapshot.bin        latest compacted snapshot (replaced atomically)
+    journal.<gen>.log   journal segments, replayed in generation order
+
+A snapshot records the first generation that is *not* included in it, which
+keeps recovery correct even if the process dies half-way through a compaction.
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+import zlib
+from io import BufferedWriter
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bank.exceptions import StorageError
+
+# Operation codes stored as the first payload byte of every journal record.
+OP_CREATE = 1
+OP_DEPOSIT = 2
+OP_WITHDRAW = 3
+OP_TRANSFER = 4
+OP_DELETE = 5
+
+# op -> (number of string fields, has amount field)
+_LAYOUT = {
+    OP_CREATE: (2, True),
+    OP_DEPOSIT: (1, True),
+    OP_WITHDRAW: (1, True),
+    OP_TRANSFER: (2, True),
+    OP_DELETE: (1, False),
+}
+
+_HEADER = struct.Struct("<II")  # payload length, crc32(payload)
+_OP = struct.Struct("<B")
+_STR_LEN = struct.Struct("<H")
+_AMOUNT = struct.Struct("<q")  # minor units (see bank.money)
+_AMOUNT_MIN, _AMOUNT_MAX = -(1 << 63), (1 << 63) - 1
+
+_SNAPSHOT_MAGIC = b"BKSNAP2\0"
+_SNAPSHOT_HEADER = struct.Struct("<8sQQ")  # magic, next generation, account count
+
+SNAPSHOT_NAME = "snapshot.bin"
+
+Record = Tuple[int, Tuple[str, ...], Optional[int]]
+SnapshotRow = Tuple[str, str, int]  # id, owner, balance in minor units
+
+
+def _encode_str(value: str) -> bytes:
+    if not isinstance(value, str):
+        raise TypeError(f"Journal strings must be str, not {type(value).__name__}.")
+    raw = value.encode("utf-8")
+    if len(raw) > 0xFFFF:
+        raise ValueError("Journal strings are limited to 65535 bytes.")
+    return _STR_LEN.pack(len(raw)) + raw
+
+
+def _check_amount(amount: int) -> None:
+    if not _AMOUNT_MIN <= amount <= _AMOUNT_MAX:
+        raise ValueError(f"Amount {amount} does not fit a signed 64-bit journal field.")
+
+
+def check_record(
+    strings: Tuple[str, ...], amount: Optional[int] = None, balance: Optional[int] = None
+) -> None:
+    """Raise the error :func:`encode_record` would raise for these fields, without encoding them.
+
+    ``balance`` is a balance the change will leave behind, which a later
+    snapshot must be able to store. The manager calls this before it changes
+    any state, so a record that cannot be journaled never leaves the book
+    ahead of the journal.
+
+    Raises:
+        TypeError: if a string field is not a ``str``.
+        ValueError: if a string is over 65535 UTF-8 bytes, or ``amount`` or
+            ``balance`` is outside int64.
+    """
+    for value in strings:
+        if not isinstance(value, str):
+            raise TypeError(f"Journal strings must be str, not {type(value).__name__}.")
+        if len(value) > 0x3FFF and len(value.encode("utf-8")) > 0xFFFF:  # at most 4 bytes a char
+            raise ValueError("Journal strings are limited to 65535 bytes.")
+    if amount is not None:
+        _check_amount(amount)
+    if balance is not None and not _AMOUNT_MIN <= balance <= _AMOUNT_MAX:
+        raise ValueError(f"Balance {balance} would not fit a signed 64-bit journal field.")
+
+
+def encode_record(op: int, strings: Tuple[str, ...], amount: Optional[int] = None) -> bytes:
+    """Return the framed journal record for ``op``.
+
+    Raises:
+        TypeError, ValueError: as :func:`check_record`.
+    """
+    parts = [_OP.pack(op)]
+    parts.extend(_encode_str(s) for s in strings)
+    if amount is not None and _LAYOUT[op][1]:  # a delete's closing balance is not journaled
+        _check_amount(amount)
+        parts.append(_AMOUNT.pack(amount))
+    payload = b"".join(parts)
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_payload(payload: bytes) -> Record:
+    op = payload[0]
+    n_strings, has_amount = _LAYOUT[op]
+    pos = 1
+    strings = []
+    for _ in range(n_strings):
+        (length,) = _STR_LEN.unpack_from(payload, pos)
+        pos += 2
+        strings.append(payload[pos : pos + length].decode("utf-8"))
+        pos += length
+    amount = _AMOUNT.unpack_from(payload, pos)[0] if has_amount else None
+    return op, tuple(strings), amount
+
+
+def _scan(data: bytes) -> Tuple[List[Record], int]:
+    """Decode every complete record in ``data``.
+
+    Returns the records and the offset just past the last valid one; anything
+    after it is a torn or corrupt tail.
+    """
+    records: List[Record] = []
+    pos = 0
+    end = len(data)
+    header_size = _HEADER.size
+    while pos + header_size <= end:
+        length, crc = _HEADER.unpack_from(data, pos)
+        start = pos + header_size
+        stop = start + length
+        if stop > end:
+            break
+        payload = data[start:stop]
+        if zlib.crc32(payload) != crc or not payload or payload[0] not in _LAYOUT:
+            break
+        records.append(_decode_payload(payload))
+        pos = stop
+    return records, pos
+
+
+class Journal:
+    """Durable, append-only log of account mutations.
+
+    Args:
+        directory: where the snapshot and journal segments live (created if missing).
+        group_size: number of buffered records that forces a commit.
+        group_interval: seconds after which buffered records are committed
+            on the next append, even if the group is not full.
+        snapshot_every: number of records after which :attr:`needs_snapshot`
+            becomes true.
+        fsync: set to ``False`` to skip ``os.fsync`` (tests / benchmarks only).
+
+    Records still in the group buffer are not durable until :meth:`sync` or
+    :meth:`close` runs (or the next group commit happens).
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        group_size: int = 512,
+        group_interval: float = 0.01,
+        snapshot_every: int = 100_000,
+        fsync: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._buffer = bytearray()
+        self._pending = 0
+        self._since_snapshot = 0
+        self._last_commit = time.monotonic()
+        self._gen = 0
+        self._file: Optional[BufferedWriter] = None  # opened by recover()
+
+    # -- paths -----------------------------------------------------------------
+    @property
+    def snapshot_path(self) -> Path:
+        return self.directory / SNAPSHOT_NAME
+
+    def _segment_path(self, gen: int) -> Path:
+        return self.directory / f"journal.{gen:08d}.log"
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        found = []
+        for path in self.directory.glob("journal.*.log"):
+            try:
+                found.append((int(path.name.split(".")[1]), path))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def _sync_dir(self) -> None:
+        if not self.fsync or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # -- recovery --------------------------------------------------------------
+    def read_snapshot(self) -> Tuple[int, List[SnapshotRow]]:
+        """Return ``(next_generation, rows)`` from the current snapshot."""
+        path = self.snapshot_path
+        if not path.exists():
+            return 0, []
+        data = path.read_bytes()
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise StorageError(f"Snapshot '{path}' is truncated.")
+        magic, next_gen, count = _SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != _SNAPSHOT_MAGIC:
+            raise StorageError(f"Snapshot '{path}' has an unknown format.")
+        rows: List[SnapshotRow] = []
+        append = rows.append
+        unpack_len = _STR_LEN.unpack_from
+        unpack_amount = _AMOUNT.unpack_from
+        pos = _SNAPSHOT_HEADER.size
+        try:
+            for _ in range(count):
+                (n,) = unpack_len(data, pos)
+                pos += 2
+                account_id = data[pos : pos + n].decode("utf-8")
+                pos += n
+                (n,) = unpack_len(data, pos)
+                pos += 2
+                owner = data[pos : pos + n].decode("utf-8")
+                pos += n
+                (balance,) = unpack_amount(data, pos)
+                pos += 8
+                append((account_id, owner, balance))
+        except struct.error as e:
+            raise StorageError(f"Snapshot '{path}' is truncated.") from e
+        return next_gen, rows
+
+    def recover(self) -> Tuple[List[SnapshotRow], Iterator[Record]]:
+        """Open the journal for appending and return the state to rebuild.
+
+        Returns the snapshot rows and an iterator over journal records written
+        after the snapshot. A torn tail on the newest segment is truncated so
+        new records are appended after the last complete one.
+
+        Raises:
+            StorageError: if an older segment is damaged; replaying the
+                segments after it would skip the records that were lost.
+        """
+        next_gen, rows = self.read_snapshot()
+        segments = [(g, p) for g, p in self._segments() if g >= next_gen]
+        batches: List[List[Record]] = []
+        for i, (_, path) in enumerate(segments):
+            data = path.read_bytes()
+            records, valid = _scan(data)
+            if valid < len(data):
+                if i < len(segments) - 1:
+                    raise StorageError(f"Journal segment '{path}' is corrupt at byte {valid}.")
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            batches.append(records)
+        self._gen = segments[-1][0] if segments else next_gen
+        self._since_snapshot = sum(len(b) for b in batches)
+        self._file = open(self._segment_path(self._gen), "ab")
+        return rows, (record for batch in batches for record in batch)
+
+    # -- writing ---------------------------------------------------------------
+    def append(self, op: int, strings: Tuple[str, ...], amount: Optional[int] = None) -> None:
+        """Buffer one record, committing the group when it is full or stale."""
+        self._buffer += encode_record(op, strings, amount)
+        self._pending += 1
+        self._since_snapshot += 1
+        if (
+            self._pending >= self.group_size
+            or time.monotonic() - self._last_commit >= self.group_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Write buffered records and ``fsync`` them as one group."""
+        if self._file is None:
+            raise StorageError("Journal is not open; call recover() first.")
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._buffer.clear()
+            self._pending = 0
+        self._last_commit = time.monotonic()
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self._since_snapshot >= self.snapshot_every
+
+    def write_snapshot(self, rows: Iterable[SnapshotRow]) -> None:
+        """Persist ``rows`` as the new snapshot and start a fresh journal generation.
+
+        ``rows`` must reflect every record appended so far.
+        """
+        self.sync()
+        assert self._file is not None
+        self._file.close()
+        old_gen = self._gen
+        self._gen += 1
+        self._file = open(self._segment_path(self._gen), "ab")
+
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        count = 0
+        with open(tmp, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, self._gen, 0))
+            chunk = bytearray()
+            for account_id, owner, balance in rows:
+                chunk += _encode_str(account_id)
+                chunk += _encode_str(owner)
+                _check_amount(balance)
+                chunk += _AMOUNT.pack(balance)
+                count += 1
+                if len(chunk) >= 1 << 20:
+                    f.write(chunk)
+                    chunk.clear()
+            f.write(chunk)
+            f.seek(0)
+            f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, self._gen, count))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self._sync_dir()
+        for gen, path in self._segments():
+            if gen <= old_gen:
+                path.unlink()
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
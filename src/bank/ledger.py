@@ -0,0 +1,241 @@
+"""Bounded, indexed transaction ledger.
+
+:class:`Ledger` keeps the most recent ``capacity`` entries in a ring of
+parallel columns (timestamp, kind, amount in minor units, src, dst). When the
+ring is full the oldest entry is overwritten. A delete's amount is the
+balance the account was closed with.
+
+Every entry has a global, ever-increasing sequence number; its ring position
+is ``seq % capacity``. Each account has an ascending ``array('q')`` of the
+sequence numbers that touched it, so:
+
+* "last N entries for account X" is a slice of that array — O(log n + k),
+* time-range queries binary-search timestamps (which are non-decreasing in
+  sequence order) over the ring or over an account's index — O(log n + k).
+
+Index entries that point at overwritten sequence numbers are trimmed lazily,
+and a sweep every ``capacity`` appends drops them for idle accounts, so
+memory stays proportional to ``capacity``.
+"""
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from bank.journal import OP_CREATE, OP_DELETE, OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW
+
+KINDS = {
+    OP_CREATE: "create",
+    OP_DEPOSIT: "deposit",
+    OP_WITHDRAW: "withdraw",
+    OP_TRANSFER: "transfer",
+    OP_DELETE: "delete",
+}
+
+TimeLike = Union[int, float, datetime]
+
+
+class LedgerEntry(NamedTuple):
+    seq: int
+    time_ns: int
+    kind: str
+    src: Optional[str]
+    dst: Optional[str]
+    amount_minor: int
+
+    @property
+    def when(self) -> datetime:
+        return datetime.fromtimestamp(self.time_ns / 1e9, tz=timezone.utc)
+
+
+class LedgerColumns(NamedTuple):
+    """Entries ``first_seq, first_seq + 1, ...`` as parallel columns."""
+
+    first_seq: int
+    time_ns: array
+    kinds: bytes
+    src: List[Optional[str]]
+    dst: List[Optional[str]]
+    amount_minor: array
+
+
+def _to_ns(value: TimeLike) -> int:
+    """``datetime`` / epoch seconds (float) / epoch nanoseconds (int) -> ns."""
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000_000)
+    if isinstance(value, float):
+        return int(value * 1_000_000_000)
+    return value
+
+
+class Ledger:
+    """Ring-buffered transaction history with a per-account index.
+
+    Args:
+        capacity: maximum number of entries retained.
+        clock: nanosecond clock, injectable for tests.
+    """
+
+    def __init__(self, capacity: int = 100_000, clock: Callable[[], int] = time.time_ns) -> None:
+        if capacity <= 0:
+            raise ValueError("Ledger capacity must be positive.")
+        self.capacity = capacity
+        self._clock = clock
+        self._time = array("q", bytes(8 * capacity))
+        self._amount = array("q", bytes(8 * capacity))
+        self._kind = bytearray(capacity)
+        self._src: List[Optional[str]] = [None] * capacity
+        self._dst: List[Optional[str]] = [None] * capacity
+        self._next = 0  # sequence number of the next entry
+        self._last_ns = 0
+        self._by_account: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    @property
+    def oldest_seq(self) -> int:
+        return max(0, self._next - self.capacity)
+
+    # -- writing ---------------------------------------------------------------
+    def append(self, op: int, src: Optional[str], dst: Optional[str], amount_minor: int = 0) -> int:
+        """Record one entry and return its sequence number."""
+        seq = self._next
+        pos = seq % self.capacity
+        now = self._clock()
+        if now < self._last_ns:  # keep timestamps non-decreasing for bisection
+            now = self._last_ns
+        self._last_ns = now
+        self._time[pos] = now
+        self._amount[pos] = amount_minor
+        self._kind[pos] = op
+        self._src[pos] = src
+        self._dst[pos] = dst
+        self._next = seq + 1
+        if src is not None:
+            self._index(src, seq)
+        if dst is not None and dst != src:
+            self._index(dst, seq)
+        if self._next % self.capacity == 0:
+            self._sweep()
+        return seq
+
+    def record(self, op: int, strings: Tuple[str, ...], amount: Optional[int] = None) -> int:
+        """Record a manager mutation given in journal form (``op``, ids, amount)."""
+        if op == OP_TRANSFER:
+            return self.append(op, strings[0], strings[1], amount or 0)
+        if op in (OP_CREATE, OP_DEPOSIT):
+            return self.append(op, None, strings[0], amount or 0)
+        return self.append(op, strings[0], None, amount or 0)
+
+    def _index(self, account_id: str, seq: int) -> None:
+        seqs = self._by_account.get(account_id)
+        if seqs is None:
+            self._by_account[account_id] = array("q", (seq,))
+            return
+        seqs.append(seq)
+        # amortised trim: drop the evicted prefix once it is half the array
+        if seqs[len(seqs) // 2] < self.oldest_seq:
+            del seqs[: bisect_left(seqs, self.oldest_seq)]
+
+    def _sweep(self) -> None:
+        oldest = self.oldest_seq
+        stale = []
+        for account_id, seqs in self._by_account.items():
+            if seqs[-1] < oldest:
+                stale.append(account_id)
+            elif seqs[0] < oldest:
+                del seqs[: bisect_left(seqs, oldest)]
+        for account_id in stale:
+            del self._by_account[account_id]
+
+    # -- reading ---------------------------------------------------------------
+    def _entry(self, seq: int) -> LedgerEntry:
+        pos = seq % self.capacity
+        return LedgerEntry(
+            seq, self._time[pos], KINDS[self._kind[pos]], self._src[pos], self._dst[pos], self._amount[pos]
+        )
+
+    def _account_seqs(self, account_id: str) -> Tuple[array, int]:
+        """Return the account's seq array and the index of its first live entry."""
+        seqs = self._by_account.get(account_id)
+        if seqs is None:
+            return array("q"), 0
+        return seqs, bisect_left(seqs, self.oldest_seq)
+
+    def last(self, n: int = 50, account_id: Optional[str] = None) -> List[LedgerEntry]:
+        """Return up to ``n`` most recent entries (newest first), optionally for one account."""
+        if account_id is None:
+            stop = self.oldest_seq
+            return [self._entry(seq) for seq in range(self._next - 1, max(stop, self._next - n) - 1, -1)]
+        seqs, start = self._account_seqs(account_id)
+        first = max(start, len(seqs) - n)
+        return [self._entry(seqs[i]) for i in range(len(seqs) - 1, first - 1, -1)]
+
+    def _first_at_or_after(self, key: Callable[[int], int], lo: int, hi: int, ns: int) -> int:
+        # bisect_left over positions [lo, hi) using the timestamp at key(i)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time[key(mid) % self.capacity] < ns:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def between(
+        self, start: TimeLike, end: TimeLike, account_id: Optional[str] = None
+    ) -> List[LedgerEntry]:
+        """Return entries with ``start <= time < end`` (oldest first).
+
+        ``start`` / ``end`` may be datetimes, epoch seconds (float) or epoch
+        nanoseconds (int).
+        """
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        if account_id is None:
+            lo, hi = self.oldest_seq, self._next
+            first = self._first_at_or_after(lambda s: s, lo, hi, start_ns)
+            last = self._first_at_or_after(lambda s: s, first, hi, end_ns)
+            return [self._entry(seq) for seq in range(first, last)]
+        seqs, begin = self._account_seqs(account_id)
+        key = seqs.__getitem__
+        first = self._first_at_or_after(key, begin, len(seqs), start_ns)
+        last = self._first_at_or_after(key, first, len(seqs), end_ns)
+        return [self._entry(seqs[i]) for i in range(first, last)]
+
+    # -- bulk access -----------------------------------------------------------
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next entry will get (live entries are ``[oldest_seq, next_seq)``)."""
+        return self._next
+
+    def seq_at(self, when: TimeLike) -> int:
+        """First live sequence number whose time is ``>= when`` (``next_seq`` if none)."""
+        return self._first_at_or_after(lambda s: s, self.oldest_seq, self._next, _to_ns(when))
+
+    def columns(self, start_seq: int, stop_seq: int) -> LedgerColumns:
+        """Copy entries ``[start_seq, stop_seq)`` (clipped to the live range) out as columns.
+
+        ``kinds`` holds the raw op codes (see :data:`KINDS`). No per-entry
+        objects are created, so this is the fast path for bulk reporting.
+        """
+        start = max(start_seq, self.oldest_seq)
+        stop = max(min(stop_seq, self._next), start)
+        cap = self.capacity
+        lo, hi = start % cap, stop % cap
+        if stop - start == cap or (stop > start and hi <= lo):  # wraps around the ring
+            parts = [slice(lo, cap), slice(0, hi)]
+        else:
+            parts = [slice(lo, lo + stop - start)]
+        time_ns, amounts, kinds = array("q"), array("q"), bytearray()
+        src: List[Optional[str]] = []
+        dst: List[Optional[str]] = []
+        for part in parts:
+            time_ns += self._time[part]
+            amounts += self._amount[part]
+            kinds += self._kind[part]
+            src += self._src[part]
+            dst += self._dst[part]
+        return LedgerColumns(start, time_ns, bytes(kinds), src, dst, amounts)
@@ -0,0 +1,287 @@
+"""Velocity limits: bounded sliding-window counters checked inline on outflows.
+
+A :class:`Limit` caps how many outflows (withdrawals and outgoing transfers)
+an account, or all accounts of one owner, may make within a trailing
+``window`` of seconds, and/or their total amount. :class:`VelocityLimits`
+checks every limit when the manager is about to move money out and raises a
+:class:`~bank.exceptions.LimitExceededError` subclass before anything is
+applied.
+
+Each limit splits its window into ``buckets`` equal time slices. A key
+(account id or owner) owns one slot of ``buckets`` counts and ``buckets``
+sums in flat ``array('q')`` columns, plus a running count and sum over the
+live buckets. An admission moves the key's head to the current slice,
+subtracting and zeroing the slices that fell out of the window, then compares
+the running totals with the limit: O(1) amortised (at most ``buckets``
+slices are cleared per call, each one only once per window). The window
+slides one slice at a time, so an outflow stops counting between
+``window - window / buckets`` and ``window`` seconds after it was made.
+
+Slots of keys that have been idle for a whole window are reclaimed by a
+sweep that runs four times per (longest) window, so memory is bounded by the
+keys active within the last 1.25 windows, not by the number of accounts or
+the length of the history.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from bank.exceptions import LimitExceededError, OutflowLimitError, TransactionCountLimitError
+from bank.money import format_minor
+
+SCOPES = ("account", "owner")
+
+
+class Limit(NamedTuple):
+    """At most ``max_count`` outflows and/or ``max_outflow_minor`` out per ``window`` seconds.
+
+    ``scope`` is ``"account"`` (each account on its own) or ``"owner"`` (all
+    accounts of an owner together; accounts without an owner are exempt).
+    """
+
+    window: float
+    max_count: Optional[int] = None
+    max_outflow_minor: Optional[int] = None
+    scope: str = "account"
+    buckets: int = 60
+
+    def describe(self) -> str:
+        parts = []
+        if self.max_count is not None:
+            parts.append(f"{self.max_count} outflows")
+        if self.max_outflow_minor is not None:
+            parts.append(f"{format_minor(self.max_outflow_minor)} out")
+        return f"{' / '.join(parts)} per {self.window:g}s per {self.scope}"
+
+
+_UNLIMITED = 1 << 62
+
+
+class _Window:
+    """Sliding-window counters of one :class:`Limit`, one fixed-size record per slot.
+
+    A slot's record in :attr:`cells` is ``[head bucket number, outflows,
+    amount out, per-bucket outflows * n, per-bucket amounts * n]``.
+    """
+
+    __slots__ = ("limit", "n", "stride", "rate", "max_count", "max_outflow", "cells")
+
+    def __init__(self, limit: Limit) -> None:
+        self.limit = limit
+        self.n = limit.buckets
+        self.stride = 3 + 2 * limit.buckets
+        self.rate = limit.buckets / limit.window  # buckets per second
+        self.max_count = _UNLIMITED if limit.max_count is None else limit.max_count
+        self.max_outflow = _UNLIMITED if limit.max_outflow_minor is None else limit.max_outflow_minor
+        self.cells = array("q")
+
+    def add_slot(self, bucket: int) -> None:
+        self.cells.extend(array("q", bytes(8 * self.stride)))
+        self.cells[-self.stride] = bucket
+
+    def advance(self, base: int, bucket: int) -> None:
+        """Slide the window of the record at ``base`` forward to end at ``bucket``."""
+        cells = self.cells
+        head = cells[base]
+        if bucket <= head:
+            return
+        n = self.n
+        if bucket - head >= n:  # the whole window expired
+            cells[base : base + self.stride] = array("q", bytes(8 * self.stride))
+        else:
+            count, outflow = cells[base + 1], cells[base + 2]
+            ring = base + 3
+            for b in range(head + 1, bucket + 1):
+                i = ring + b % n
+                count -= cells[i]
+                outflow -= cells[i + n]
+                cells[i] = cells[i + n] = 0
+            cells[base + 1] = count
+            cells[base + 2] = outflow
+        cells[base] = bucket
+
+    def undo(self, slot: int, amount: int, when: float) -> None:
+        cells = self.cells
+        base = slot * self.stride
+        bucket = int(when * self.rate)
+        if not 0 <= cells[base] - bucket < self.n:  # already slid out of the window
+            return
+        i = base + 3 + bucket % self.n
+        cells[i] -= 1
+        cells[i + self.n] -= amount
+        cells[base + 1] -= 1
+        cells[base + 2] -= amount
+
+    def idle(self, slot: int, bucket: int) -> bool:
+        return bucket - self.cells[slot * self.stride] >= self.n
+
+    def error(self, key: str, count: int) -> LimitExceededError:
+        limit = self.limit
+        cls = TransactionCountLimitError if count > self.max_count else OutflowLimitError
+        return cls(f"{limit.scope.capitalize()} '{key}' is over its limit of {limit.describe()}.", limit, key)
+
+
+class _Scope:
+    """The windows of every limit with one scope, sharing a key -> slot index."""
+
+    def __init__(self, limits: List[Limit]) -> None:
+        self.windows = [_Window(limit) for limit in limits]
+        # hot-path constants, unpacked once per window instead of read as attributes
+        self.rules = [(w.cells, w.stride, w.rate, w.n, w.max_count, w.max_outflow, w) for w in self.windows]
+        self.slots: Dict[str, int] = {}
+        self.free: List[int] = []
+
+    def _slot(self, key: str, now: float) -> int:
+        if self.free:
+            slot = self.free.pop()
+            for w in self.windows:  # a freed record is already all zeros
+                w.cells[slot * w.stride] = int(now * w.rate)
+        else:
+            slot = len(self.slots) + len(self.free)
+            for w in self.windows:
+                w.add_slot(int(now * w.rate))
+        self.slots[key] = slot
+        return slot
+
+    def admit(self, key: str, amount: int, now: float) -> None:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self._slot(key, now)
+        admitted = 0
+        for cells, stride, rate, n, max_count, max_outflow, w in self.rules:
+            base = slot * stride
+            bucket = int(now * rate)
+            if cells[base] != bucket:
+                w.advance(base, bucket)
+            count = cells[base + 1] + 1
+            outflow = cells[base + 2] + amount
+            if count > max_count or outflow > max_outflow:
+                for prev in self.windows[:admitted]:
+                    prev.undo(slot, amount, now)
+                raise w.error(key, count)
+            cells[base + 1] = count
+            cells[base + 2] = outflow
+            i = base + 3 + bucket % n
+            cells[i] += 1
+            cells[i + n] += amount
+            admitted += 1
+
+    def undo(self, key: str, amount: int, when: float) -> None:
+        slot = self.slots.get(key)
+        if slot is not None:
+            for w in self.windows:
+                w.undo(slot, amount, when)
+
+    def usage(self, key: str, now: float) -> List[Tuple[Limit, int, int]]:
+        slot = self.slots.get(key)
+        rows = []
+        for w in self.windows:
+            if slot is None:
+                rows.append((w.limit, 0, 0))
+            else:
+                base = slot * w.stride
+                w.advance(base, int(now * w.rate))
+                rows.append((w.limit, w.cells[base + 1], w.cells[base + 2]))
+        return rows
+
+    def sweep(self, now: float) -> None:
+        """Free the slots of keys with no outflow in any of the windows."""
+        buckets = [(w, int(now * w.rate)) for w in self.windows]
+        idle = [key for key, slot in self.slots.items() if all(w.idle(slot, b) for w, b in buckets)]
+        for key in idle:
+            slot = self.slots.pop(key)
+            for w, b in buckets:
+                w.advance(slot * w.stride, b)  # zeroes the record for the next key
+            self.free.append(slot)
+
+
+class VelocityLimits:
+    """Enforce a set of :class:`Limit` rules on outflows.
+
+    Pass one to :class:`~bank.manager.AccountManager` (``limits=``) and every
+    withdrawal, transfer and batch posting that would otherwise succeed is
+    admitted here first. Safe to share between threads.
+
+    Args:
+        limits: the rules; every one must admit an outflow.
+        clock: time source in seconds (injectable for tests).
+    """
+
+    def __init__(self, limits: Iterable[Limit], clock: Callable[[], float] = time.monotonic) -> None:
+        self.limits = list(limits)
+        for limit in self.limits:
+            if limit.scope not in SCOPES:
+                raise ValueError(f"Unknown limit scope {limit.scope!r}; use 'account' or 'owner'.")
+            if limit.window <= 0 or limit.buckets <= 0:
+                raise ValueError("Limit window and buckets must be positive.")
+            if limit.max_count is None and limit.max_outflow_minor is None:
+                raise ValueError("A limit needs max_count and/or max_outflow_minor.")
+        self.clock = clock
+        self._account = _Scope([limit for limit in self.limits if limit.scope == "account"])
+        self._owner = _Scope([limit for limit in self.limits if limit.scope == "owner"])
+        self._has_owner = bool(self._owner.windows)
+        self._lock = threading.Lock()
+        # keys idle for the longest window are freed; look for them four times per window
+        self._sweep_every = max((limit.window for limit in self.limits), default=0.0) / 4
+        self._next_sweep = clock() + self._sweep_every
+        self.rejections = 0
+
+    def admit(self, account_id: str, owner: str, amount_minor: int) -> float:
+        """Count one outflow from ``account_id`` or raise if any limit would be broken.
+
+        On a violation nothing is counted. Returns the admission time, for
+        :meth:`cancel`.
+        """
+        lock = self._lock
+        lock.acquire()  # cheaper than ``with`` on this hot path
+        try:
+            now = self.clock()
+            self._account.admit(account_id, amount_minor, now)
+            if owner and self._has_owner:
+                try:
+                    self._owner.admit(owner, amount_minor, now)
+                except LimitExceededError:
+                    self._account.undo(account_id, amount_minor, now)
+                    raise
+            if now >= self._next_sweep:
+                self._sweep(now)
+            return now
+        except LimitExceededError:
+            self.rejections += 1
+            raise
+        finally:
+            lock.release()
+
+    def cancel(self, account_id: str, owner: str, amount_minor: int, admitted_at: float) -> None:
+        """Take back an outflow admitted at ``admitted_at`` that was not applied after all."""
+        with self._lock:
+            self._account.undo(account_id, amount_minor, admitted_at)
+            if owner:
+                self._owner.undo(owner, amount_minor, admitted_at)
+
+    def _sweep(self, now: float) -> None:
+        # amortised O(1): every live key had an outflow within the last 1.25 windows
+        self._account.sweep(now)
+        self._owner.sweep(now)
+        self._next_sweep = now + self._sweep_every
+
+    def usage(self, account_id: str, owner: str = "") -> List[Tuple[Limit, int, int]]:
+        """``(limit, outflows, amount out)`` in each limit's current window for this account."""
+        with self._lock:
+            now = self.clock()
+            rows = self._account.usage(account_id, now)
+            if owner:
+                rows += self._owner.usage(owner, now)
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        scopes = (self._account, self._owner)
+        return {
+            "limits": len(self.limits),
+            "tracked_keys": sum(len(s.slots) for s in scopes),
+            "slots": sum(len(s.slots) + len(s.free) for s in scopes),
+            "rejections": self.rejections,
+        }
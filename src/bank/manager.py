@@ -1,48 +1,649 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
-from bank.account import BankAccount
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+from bank.account import BankAccount, Number
 from bank.exceptions import (
-    DuplicateAccountError,
     AccountNotFoundError,
+    BankingError,
+    BatchError,
+    InsufficientFundsError,
+    LimitExceededError,
+    NegativeAmountError,
 )
+from bank.money import SCALE, as_minor, to_minor
+from bank.journal import (
+    Journal,
+    OP_CREATE,
+    OP_DEPOSIT,
+    OP_WITHDRAW,
+    OP_TRANSFER,
+    OP_DELETE,
+    check_record,
+)
+from bank.storage import MemoryStorage, Row, Storage
+
+if TYPE_CHECKING:  # optional features are imported by whoever constructs them
+    from bank.accrual import AccrualResult, Schedule
+    from bank.aggregates import AggregateIndex
+    from bank.idempotency import IdempotencyCache
+    from bank.ledger import Ledger
+    from bank.limits import VelocityLimits
+    from bank.metrics import Metrics
+    from bank.mvcc import BookSnapshot, Versions
+
+
+def _digest(rows: List[Tuple[Any, ...]]) -> Tuple[int, int]:
+    """Fixed-size stand-in for batch rows in an idempotency fingerprint."""
+    return len(rows), hash(tuple(rows))
 
 
 class AccountManager:
-    """Manage BankAccount instances in-memory."""
+    """Manage BankAccount instances, in memory unless given another :class:`~bank.storage.Storage`.
+
+    Pass a ``storage`` such as :class:`~bank.sqlite_storage.SQLiteStorage` to
+    keep the accounts somewhere other processes can share; the default
+    :class:`~bank.storage.MemoryStorage` is a plain dict of accounts.
+
+    Pass a :class:`~bank.journal.Journal` (or use :meth:`open`) to make the
+    book durable: every mutation made through the manager is then appended to
+    the journal. Mutations made directly on a :class:`BankAccount` bypass the
+    journal, so callers should go through :meth:`deposit` / :meth:`withdraw`.
+
+    Pass a :class:`~bank.ledger.Ledger` to keep a bounded, queryable history of
+    the mutations made through the manager (see :attr:`ledger`).
+
+    Pass an :class:`~bank.aggregates.AggregateIndex` to maintain the total,
+    per-owner sums and top/bottom balances incrementally; without one those
+    queries fall back to a full pass over the accounts.
+
+    Pass a :class:`~bank.metrics.Metrics` to time and count the manager's
+    operations on this instance (see :mod:`bank.metrics`).
+
+    Pass an :class:`~bank.idempotency.IdempotencyCache` to accept an
+    ``idempotency_key`` on every mutation: a retried call with the same key
+    returns the first call's result instead of applying it again.
 
-    def __init__(self) -> None:
-        self._accounts: Dict[str, BankAccount] = {}
+    Pass :class:`~bank.limits.VelocityLimits` to cap how many outflows
+    (withdrawals, transfers, batch postings) an account or owner may make, and
+    how much they may move out, within sliding time windows.
 
-    def create(self, account_id: str, owner: str = "", initial: float = 0.0) -> BankAccount:
+    :meth:`snapshot` returns a consistent point-in-time view of every balance
+    that later writes do not change (see :mod:`bank.mvcc`).
+    """
+
+    def __init__(
+        self,
+        journal: Optional[Journal] = None,
+        ledger: Optional[Ledger] = None,
+        aggregates: Optional[AggregateIndex] = None,
+        metrics: Optional[Metrics] = None,
+        idempotency: Optional[IdempotencyCache] = None,
+        limits: Optional[VelocityLimits] = None,
+        storage: Optional[Storage] = None,
+    ) -> None:
+        self._storage: Storage = MemoryStorage() if storage is None else storage
+        self._journal = journal
+        self._ledger = ledger
+        self._aggregates = aggregates
+        self._metrics = metrics
+        self._idempotency = idempotency
+        self._limits = limits
+        self._versions: Optional[Versions] = None  # created by the first snapshot()
+        if aggregates is not None:
+            aggregates.rebuild(self._storage.accounts())
+        if metrics is not None:
+            from bank.metrics import instrument
+
+            instrument(self, metrics)
+
+    @classmethod
+    def open(
+        cls,
+        directory: str | os.PathLike[str],
+        ledger: Optional[Ledger] = None,
+        aggregates: Optional[AggregateIndex] = None,
+        metrics: Optional[Metrics] = None,
+        idempotency: Optional[IdempotencyCache] = None,
+        limits: Optional[VelocityLimits] = None,
+        **options: Any,
+    ) -> "AccountManager":
+        """Recover a manager from the journal in ``directory`` and keep journaling to it.
+
+        Keyword options are forwarded to :class:`~bank.journal.Journal`. The
+        ``ledger``, ``metrics`` and ``limits`` only see operations made after recovery;
+        ``aggregates`` is rebuilt from the recovered book.
+        """
+        journal = Journal(directory, **options)
+        rows, records = journal.recover()
+        accounts = MemoryStorage()  # replayed straight into its dict
+        mgr = cls(storage=accounts)
+        for account_id, owner, balance in rows:
+            mgr._add(account_id, owner, balance)
+        replay = {
+            OP_CREATE: lambda s, a: mgr._add(s[0], s[1], a),
+            OP_DEPOSIT: lambda s, a: accounts[s[0]].deposit_minor(a),
+            OP_WITHDRAW: lambda s, a: accounts[s[0]].withdraw_minor(a),
+            OP_TRANSFER: lambda s, a: accounts[s[0]].transfer_minor(accounts[s[1]], a),
+            OP_DELETE: lambda s, a: accounts.pop(s[0], None),
+        }
+        for op, strings, amount in records:
+            replay[op](strings, amount)
+        mgr._journal = journal
+        mgr._ledger = ledger
+        mgr._idempotency = idempotency
+        mgr._limits = limits
+        if aggregates is not None:
+            aggregates.rebuild(accounts.values())
+            mgr._aggregates = aggregates
+        if metrics is not None:
+            mgr._metrics = metrics
+            from bank.metrics import instrument
+
+            instrument(mgr, metrics)
+        return mgr
+
+    def create(
+        self,
+        account_id: str,
+        owner: str = "",
+        initial: Number = 0.0,
+        idempotency_key: Optional[str] = None,
+    ) -> BankAccount:
         """Create and return a new :class:`BankAccount`.
 
         Raises:
             KeyError: if ``account_id`` already exists.
+            TypeError, ValueError: with a journal, if the record cannot be journaled
+                (see :func:`~bank.journal.check_record`); nothing is changed.
         """
-        if account_id in self._accounts:
-            raise DuplicateAccountError(f"Account id '{account_id}' already exists.")
-        acct = BankAccount(account_id, initial)
-        # optional owner attribute for display
-        if owner:
-            setattr(acct, "owner", owner)
-        self._accounts[account_id] = acct
+        if idempotency_key is not None:
+            return self._idempotent("create", idempotency_key, (account_id, owner, initial))
+        minor = to_minor(initial, "Initial balance")
+        if self._journal is not None:  # before any change: the book never gets ahead of the journal
+            check_record((account_id, owner), minor)
+        versions = self._versions
+        if versions is not None and versions.live and account_id not in self._storage:
+            versions.save(account_id, None)
+        acct = self._storage.add(account_id, owner, minor)
+        self._log(OP_CREATE, (account_id, owner), acct.balance_minor)
         return acct
 
+    def create_many(
+        self, rows: Iterable[Tuple[str, str, Any]], idempotency_key: Optional[str] = None
+    ) -> List[BankAccount]:
+        """Create accounts from ``(account_id, owner, initial)`` rows, all or none.
+
+        The storage adds them in one bulk operation (a single ``executemany``
+        for SQLite).
+
+        Raises:
+            DuplicateAccountError: if any id exists already or repeats in ``rows``.
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if idempotency_key is not None:
+            return self._idempotent("create_many", idempotency_key, (rows,), (_digest(rows),))
+        entries: List[Row] = [
+            (account_id, owner, to_minor(initial, "Initial balance")) for account_id, owner, initial in rows
+        ]
+        if self._journal is not None:
+            for account_id, owner, minor in entries:
+                check_record((account_id, owner), minor)
+        versions = self._versions
+        if versions is not None and versions.live:
+            for account_id, _, _ in entries:
+                if account_id not in self._storage:
+                    versions.save(account_id, None)
+        accounts = self._storage.add_many(entries)
+        if self._journal is not None or self._ledger is not None or self._aggregates is not None:
+            self._log_many((OP_CREATE, (account_id, owner), minor) for account_id, owner, minor in entries)
+        return accounts
+
+    def _add(self, account_id: str, owner: str, balance_minor: int) -> BankAccount:
+        return self._storage.add(account_id, owner, balance_minor)
+
+    @property
+    def ledger(self) -> Optional[Ledger]:
+        return self._ledger
+
+    @property
+    def aggregates(self) -> Optional[AggregateIndex]:
+        return self._aggregates
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        return self._metrics
+
+    @property
+    def idempotency(self) -> Optional[IdempotencyCache]:
+        return self._idempotency
+
+    @property
+    def limits(self) -> Optional[VelocityLimits]:
+        return self._limits
+
+    @property
+    def storage(self) -> Storage:
+        return self._storage
+
     def get(self, account_id: str) -> Optional[BankAccount]:
-        return self._accounts.get(account_id)
+        return self._storage.get(account_id)
+
+    def _require(self, account_id: str, role: str = "Account") -> BankAccount:
+        acct = self._storage.get(account_id)
+        if acct is None:
+            raise AccountNotFoundError(f"{role} '{account_id}' not found.")
+        return acct
 
     def list_accounts(self) -> List[BankAccount]:
-        return list(self._accounts.values())
+        return list(self._storage.accounts())
+
+    def page_accounts(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        prefix: str = "",
+        sort: str = "id",
+        descending: bool = False,
+    ) -> Tuple[int, List[BankAccount]]:
+        """Return ``(matches, accounts)`` for one page of accounts whose id starts with ``prefix``.
+
+        ``sort`` is ``"id"`` or ``"balance"``. With an aggregate index the page
+        is read off its sorted indexes, so the cost does not grow with the
+        book; without one the storage pages itself (:meth:`Storage.page`):
+        SQLite runs one indexed query, the in-memory store filters and sorts
+        all accounts.
+        """
+        if self._aggregates is not None:
+            total, ids = self._aggregates.page(offset, limit, prefix, sort, descending)
+            with self._storage.reading():
+                return total, [a for a in map(self._storage.get, ids) if a is not None]
+        if sort not in ("id", "balance"):
+            raise ValueError(f"Unknown sort key {sort!r}")
+        return self._storage.page(max(offset, 0), max(limit, 0), prefix, sort, descending)
 
-    def delete(self, account_id: str) -> None:
-        self._accounts.pop(account_id, None)
+    # -- aggregates ------------------------------------------------------------
+    def _scan(self) -> Iterable[BankAccount]:
+        """Accounts for the aggregate queries when there is no aggregate index."""
+        return self._storage.accounts()
 
-    def transfer(self, src_id: str, dst_id: str, amount: float) -> None:
-        src = self.get(src_id)
-        dst = self.get(dst_id)
+    def total_balance_minor(self) -> int:
+        """Sum of all balances in minor units."""
+        if self._aggregates is not None:
+            return self._aggregates.total_minor
+        return sum(a.balance_minor for a in self._scan())
+
+    def owner_total_minor(self, owner: str) -> int:
+        """Sum of ``owner``'s balances in minor units ("" groups accounts with no owner)."""
+        if self._aggregates is not None:
+            return self._aggregates.owner_total(owner)
+        return sum(a.balance_minor for a in self._scan() if getattr(a, "owner", "") == owner)
+
+    def top_balances(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The ``n`` largest ``(account_id, balance_minor)`` pairs, largest first.
+
+        Accounts with equal balances come back in no particular order.
+        """
+        if self._aggregates is not None:
+            return self._aggregates.top(n)
+        rows = sorted(((a.balance_minor, a.name) for a in self._scan()), reverse=True)
+        return [(name, balance) for balance, name in rows[:n]]
+
+    def bottom_balances(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The ``n`` smallest ``(account_id, balance_minor)`` pairs, smallest first."""
+        if self._aggregates is not None:
+            return self._aggregates.bottom(n)
+        rows = sorted((a.balance_minor, a.name) for a in self._scan())
+        return [(name, balance) for balance, name in rows[:n]]
+
+    def deposit(self, account_id: str, amount: Number, idempotency_key: Optional[str] = None) -> float:
+        """Deposit into ``account_id`` and return the new balance."""
+        if idempotency_key is not None:
+            return self._idempotent("deposit", idempotency_key, (account_id, amount))
+        acct = self._require(account_id)
+        minor = to_minor(amount, "Deposit amount")
+        if self._journal is not None:
+            check_record((account_id,), minor, acct.balance_minor + minor)
+        versions = self._versions
+        if versions is not None and versions.live:
+            versions.save(account_id, acct)
+        balance = self._storage.deposit(acct, minor)
+        self._log(OP_DEPOSIT, (account_id,), minor)
+        return balance / SCALE
+
+    def withdraw(self, account_id: str, amount: Number, idempotency_key: Optional[str] = None) -> float:
+        """Withdraw from ``account_id`` and return the new balance."""
+        if idempotency_key is not None:
+            return self._idempotent("withdraw", idempotency_key, (account_id, amount))
+        acct = self._require(account_id)
+        minor = to_minor(amount, "Withdrawal amount")
+        if self._journal is not None:
+            check_record((account_id,), minor)
+        admission = None
+        if self._limits is not None and 0 < minor <= acct.balance_minor:  # else the storage raises
+            owner = getattr(acct, "owner", "")
+            admission = (account_id, owner, minor, self._limits.admit(account_id, owner, minor))
+        versions = self._versions
+        if versions is not None and versions.live:
+            versions.save(account_id, acct)
+        try:
+            balance = self._storage.withdraw(acct, minor)
+        except BankingError:
+            if admission is not None:  # a shared store can still refuse: another process got there first
+                self._limits.cancel(*admission)  # type: ignore[union-attr]
+            raise
+        self._log(OP_WITHDRAW, (account_id,), minor)
+        return balance / SCALE
+
+    def delete(self, account_id: str, idempotency_key: Optional[str] = None) -> None:
+        if idempotency_key is not None:
+            return self._idempotent("delete", idempotency_key, (account_id,))
+        if self._journal is not None:
+            check_record((account_id,))
+        acct = self._storage.get(account_id)
+        if acct is None:
+            return
+        versions = self._versions
+        if versions is not None and versions.live:
+            versions.save(account_id, acct)
+        balance = acct.balance_minor
+        if self._storage.remove(account_id):
+            # the closing balance lets the ledger rebuild the account's history
+            self._log(OP_DELETE, (account_id,), balance)
+
+    def transfer(
+        self, src_id: str, dst_id: str, amount: Number, idempotency_key: Optional[str] = None
+    ) -> None:
+        if idempotency_key is not None:
+            return self._idempotent("transfer", idempotency_key, (src_id, dst_id, amount))
+        storage = self._storage
+        with storage.reading():  # one cache check covers both lookups
+            src = storage.get(src_id)
+            dst = storage.get(dst_id)
         if src is None:
             raise AccountNotFoundError(f"Source account '{src_id}' not found.")
         if dst is None:
             raise AccountNotFoundError(f"Destination account '{dst_id}' not found.")
-        src.transfer(dst, amount)
+        minor = to_minor(amount, "Transfer amount")
+        if self._journal is not None:
+            check_record((src_id, dst_id), minor, dst.balance_minor + minor)
+        admission = None
+        if self._limits is not None and 0 < minor <= src.balance_minor:  # else the storage raises
+            owner = getattr(src, "owner", "")
+            admission = (src_id, owner, minor, self._limits.admit(src_id, owner, minor))
+        versions = self._versions
+        if versions is not None and versions.live:
+            versions.save(src_id, src)
+            versions.save(dst_id, dst)
+        try:
+            storage.transfer(src, dst, minor)
+        except BankingError:
+            if admission is not None:
+                self._limits.cancel(*admission)  # type: ignore[union-attr]
+            raise
+        self._log(OP_TRANSFER, (src_id, dst_id), minor)
+
+    def apply_batch(
+        self,
+        postings: Iterable[Tuple[str, str, Any]],
+        atomic: bool = False,
+        minor_units: bool = False,
+        idempotency_key: Optional[str] = None,
+    ) -> List[Optional[Exception]]:
+        """Apply many ``(src_id, dst_id, amount)`` transfers in one pass.
+
+        Each posting is looked up and validated once, then applied directly to
+        the balances instead of going through :meth:`BankAccount.transfer`.
+        Columnar input can be passed as ``zip(src_ids, dst_ids, amounts)``.
+
+        With ``atomic=False`` every posting stands on its own: the returned list
+        holds ``None`` for an applied posting or the exception that rejected it.
+        With ``atomic=True`` the first rejected posting restores every balance
+        touched by the batch and raises :class:`~bank.exceptions.BatchError`.
+
+        Pass ``minor_units=True`` when amounts are already integer minor units
+        (cents); this skips the per-posting conversion and is the fastest path.
+
+        With an ``idempotency_key`` a replayed batch returns the first run's
+        per-posting results and applies nothing.
+
+        With velocity limits every posting is admitted like a transfer; a
+        posting over a limit is rejected with a
+        :class:`~bank.exceptions.LimitExceededError`.
+        """
+        rows = postings if isinstance(postings, list) else list(postings)
+        if idempotency_key is not None:
+            return self._idempotent(
+                "apply_batch", idempotency_key, (rows, atomic, minor_units), (_digest(rows), atomic, minor_units)
+            )
+        limits = self._limits
+        admitted: List[Tuple[str, str, int, float]] = []  # limit admissions to take back on rollback
+        results: List[Optional[Exception]] = [None] * len(rows)
+        minors = [0] * len(rows)
+        versions = self._versions
+        if versions is not None and not versions.live:
+            versions = None
+        with self._storage.transaction():  # batch changes are stored together
+            get = self._storage.get
+            saved: Optional[Dict[str, Tuple[BankAccount, int]]] = {} if atomic else None
+            index = 0
+            for src_id, dst_id, amount in rows:
+                src = get(src_id)
+                dst = get(dst_id)
+                error: Optional[Exception] = None
+                if src is None:
+                    error = AccountNotFoundError(f"Source account '{src_id}' not found.")
+                elif dst is None:
+                    error = AccountNotFoundError(f"Destination account '{dst_id}' not found.")
+                else:
+                    try:
+                        if not minor_units:
+                            minor = to_minor(amount, "Transfer amount")
+                        elif type(amount) is int:
+                            minor = amount
+                        else:
+                            minor = as_minor(amount, "Transfer amount")
+                    except (TypeError, ValueError) as e:
+                        error = e
+                    else:
+                        if minor <= 0:
+                            error = NegativeAmountError("Transfer amount must be positive.")
+                        elif minor > src.balance_minor:
+                            error = InsufficientFundsError("Insufficient funds.")
+                        else:
+                            if limits is not None:
+                                owner = getattr(src, "owner", "")
+                                try:
+                                    when = limits.admit(src_id, owner, minor)
+                                except LimitExceededError as e:
+                                    error = e
+                                else:
+                                    if atomic:
+                                        admitted.append((src_id, owner, minor, when))
+                        if error is None:
+                            if saved is not None:
+                                if src_id not in saved:
+                                    saved[src_id] = (src, src.balance_minor)
+                                if dst_id not in saved:
+                                    saved[dst_id] = (dst, dst.balance_minor)
+                            if versions is not None:
+                                versions.save(src_id, src)
+                                versions.save(dst_id, dst)
+                            src.balance_minor -= minor
+                            dst.balance_minor += minor
+                            minors[index] = minor
+                if error is not None:
+                    if saved is not None:
+                        for acct, balance in saved.values():
+                            acct.balance_minor = balance
+                        for admission in admitted:
+                            limits.cancel(*admission)  # type: ignore[union-attr]
+                        raise BatchError(index, error) from error
+                    results[index] = error
+                index += 1
+
+        if self._journal is not None or self._ledger is not None or self._aggregates is not None:
+            self._log_many(
+                (OP_TRANSFER, (src_id, dst_id), minor)
+                for (src_id, dst_id, _), minor, error in zip(rows, minors, results)
+                if error is None
+            )
+        return results
+
+    def _idempotent(self, op: str, key: str, args: tuple, request: Optional[tuple] = None) -> Any:
+        """Run ``op(*args)`` once per ``key``; replays return the stored result.
+
+        ``request`` identifies the call in the cache (default ``args``); batch
+        operations pass a digest so an entry does not grow with the batch.
+        """
+        cache = self._idempotency
+        if cache is None:
+            raise ValueError("idempotency_key needs a manager built with an IdempotencyCache.")
+        replay, result = cache.begin(key, (op, args if request is None else request))
+        if replay:
+            return result
+        try:
+            # the class method: keeps subclass locking, skips per-instance instrumentation
+            result = getattr(type(self), op)(self, *args)
+        except BaseException:
+            cache.release(key)
+            raise
+        cache.finish(key, result)
+        return result
+
+    # -- point-in-time reads ---------------------------------------------------
+    def snapshot(self) -> BookSnapshot:
+        """Return an immutable view of every balance as of now; close it when done.
+
+        Taking one copies nothing and reading it never blocks writes: while it
+        is open, each account's first change saves the state it replaces (see
+        :mod:`bank.mvcc`). A storage with its own snapshots (SQLite) provides
+        them instead.
+        """
+        snap = self._storage.snapshot()
+        if snap is not None:
+            return snap
+        versions = self._versions
+        if versions is None:
+            from bank.mvcc import Versions
+
+            versions = self._versions = Versions()
+        return versions.snapshot(self._storage)
+
+    # -- durability ------------------------------------------------------------
+    def _log(self, op: int, strings: tuple, amount: Optional[int] = None) -> None:
+        if self._aggregates is not None:
+            self._aggregates.record(op, strings, amount)
+        if self._ledger is not None:
+            self._ledger.record(op, strings, amount)
+        journal = self._journal
+        if journal is None:
+            return
+        journal.append(op, strings, amount)
+        if journal.needs_snapshot:
+            self.checkpoint()
+
+    def _log_many(self, records: Iterable[Tuple[int, tuple, Optional[int]]]) -> None:
+        journal = self._journal
+        ledger = self._ledger
+        aggregates = self._aggregates
+        for op, strings, amount in records:
+            if aggregates is not None:
+                aggregates.record(op, strings, amount)
+            if ledger is not None:
+                ledger.record(op, strings, amount)
+            if journal is not None:
+                journal.append(op, strings, amount)
+        if journal is not None and journal.needs_snapshot:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write a compacted snapshot so recovery only replays later records."""
+        if self._journal is None:
+            return
+        self._journal.write_snapshot(
+            (a.name, getattr(a, "owner", ""), a.balance_minor) for a in self._storage.accounts()
+        )
+
+    def export_mapped(self, path: str | os.PathLike[str]) -> int:
+        """Write the book as a read-only :mod:`bank.mapped` snapshot; return the account count."""
+        from bank.mapped import write_mapped
+
+        return write_mapped(
+            path, ((a.name, getattr(a, "owner", ""), a.balance_minor) for a in self._storage.accounts())
+        )
+
+    # -- scheduled processing --------------------------------------------------
+    def end_of_day(
+        self,
+        schedule: Schedule,
+        days: int = 1,
+        charge_fees: bool = False,
+        chunk_size: int = 1_000_000,
+    ) -> AccrualResult:
+        """Accrue ``days`` of interest (and the fee, with ``charge_fees``) on every account.
+
+        Balances are read, computed on (see :mod:`bank.accrual`) and written
+        back ``chunk_size`` accounts at a time; each changed account gets one
+        deposit or withdrawal record with its net change. The run is one
+        storage transaction, so a shared store sees all of it or none. Velocity
+        limits do not apply to this bank-initiated run.
+
+        Raises:
+            ValueError: if the schedule or ``days`` is invalid (nothing is applied).
+        """
+        from itertools import islice
+
+        import numpy as np
+
+        from bank.accrual import AccrualResult, postings, validate
+
+        validate(schedule, days)  # before anything is touched, even for an empty book
+        logging = self._journal is not None or self._ledger is not None or self._aggregates is not None
+        count = interest_total = credited = fee_total = charged = 0
+        versions = self._versions
+        if versions is not None and not versions.live:
+            versions = None
+        with self._storage.transaction():  # the whole run is stored at once, or not at all
+            accounts = iter(self._storage.accounts())
+            while True:
+                chunk = list(islice(accounts, chunk_size))
+                if not chunk:
+                    break
+                balances = np.fromiter((a.balance_minor for a in chunk), dtype=np.int64, count=len(chunk))
+                interest, fees = postings(balances, schedule, days, charge_fees)
+                net = interest - fees
+                changed = np.flatnonzero(net)
+                if versions is not None:
+                    for i in changed.tolist():
+                        versions.save(chunk[i].name, chunk[i])
+                for i, balance in zip(changed.tolist(), (balances[changed] + net[changed]).tolist()):
+                    chunk[i].balance_minor = balance
+                if logging:
+                    self._log_many(
+                        (OP_DEPOSIT, (chunk[i].name,), d) if d > 0 else (OP_WITHDRAW, (chunk[i].name,), -d)
+                        for i, d in zip(changed.tolist(), net[changed].tolist())
+                    )
+                self._storage.flush()  # a shared store keeps at most one chunk of accounts pending
+                count += len(chunk)
+                interest_total += int(interest.sum())
+                credited += int(np.count_nonzero(interest))
+                fee_total += int(fees.sum())
+                charged += int(np.count_nonzero(fees))
+        return AccrualResult(count, interest_total, credited, fee_total, charged)
+
+    def sync(self) -> None:
+        """Force buffered journal records to disk."""
+        if self._journal is not None:
+            self._journal.sync()
+
+    def close(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        self._storage.close()
+
+    def __enter__(self) -> "AccountManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,319 @@
+"""Read-optimised, memory-mapped snapshot of an account book.
+
+:func:`write_mapped` stores a book as fixed-width columns plus string tables;
+:class:`MappedBook` opens the file with ``mmap`` and answers ``get`` /
+``list_accounts`` / paging straight from the mapping. Nothing is loaded up
+front, so opening a 10M-account book takes milliseconds, only the pages a
+query touches are read, and every process opening the same file shares one
+copy in the OS page cache.
+
+File layout (little-endian, each section 8-byte aligned)::
+
+    header         magic, account count, owner count, hash slots, section offsets
+    balances       int64[count]          minor units, rows in id order
+    id_offsets     uint64[count + 1]     row -> start of its id in id_blob
+    owner_codes    uint32[count]         row -> owner number
+    hash_slots     uint32[slots]         row + 1 (0 = empty), linear probing on crc32(id)
+    owner_offsets  uint64[owners + 1]    owner number -> start in owner_blob
+    id_blob        UTF-8 ids, concatenated in byte (= code point) order
+    owner_blob     UTF-8 owners, "" is owner 0
+
+Rows are sorted by id, so listing is in id order and an id-prefix page is a
+binary search away; point lookups go through the hash table in O(1). The
+file is immutable: write a new one (atomically replaced) to refresh it.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from bank.account import BankAccount
+from bank.exceptions import StorageError
+
+MAGIC = b"BKMAP1\0\0"
+# magic, accounts, owners, hash slots, then offsets of the 7 sections and the end of file
+_HEADER = struct.Struct("<8s3Q8Q")
+
+Row = Tuple[str, str, int]  # id, owner, balance in minor units (as journal snapshots)
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_mapped(path: Union[str, os.PathLike[str]], rows: Iterable[Row], fsync: bool = True) -> int:
+    """Write ``(id, owner, balance_minor)`` rows as a mapped snapshot at ``path``.
+
+    The file is written next to ``path`` and renamed over it, so readers see
+    either the old or the new book. Returns the number of accounts written.
+    """
+    if sys.byteorder != "little":  # pragma: no cover - the format is little-endian
+        raise StorageError("Mapped snapshots can only be written on little-endian hosts.")
+    encoded = sorted((account_id.encode("utf-8"), owner, balance) for account_id, owner, balance in rows)
+    count = len(encoded)
+
+    balances = array("q", bytes(8 * count))
+    id_offsets = array("Q", bytes(8 * (count + 1)))
+    owner_codes = array("I", bytes(4 * count))
+    owner_numbers: Dict[str, int] = {"": 0}
+    id_blob = bytearray()
+    for row, (key, owner, balance) in enumerate(encoded):
+        if row and key == encoded[row - 1][0]:
+            raise ValueError(f"Duplicate account id {key.decode('utf-8')!r}.")
+        balances[row] = balance
+        id_offsets[row] = len(id_blob)
+        id_blob += key
+        code = owner_numbers.get(owner)
+        if code is None:
+            code = owner_numbers[owner] = len(owner_numbers)
+        owner_codes[row] = code
+    id_offsets[count] = len(id_blob)
+
+    slots = 8
+    while slots < 2 * count:
+        slots <<= 1
+    mask = slots - 1
+    hash_slots = array("I", bytes(4 * slots))
+    for row, (key, _, _) in enumerate(encoded):
+        h = zlib.crc32(key) & mask
+        while hash_slots[h]:
+            h = (h + 1) & mask
+        hash_slots[h] = row + 1
+
+    owner_offsets = array("Q", bytes(8 * (len(owner_numbers) + 1)))
+    owner_blob = bytearray()
+    for owner, code in owner_numbers.items():  # insertion order == code order
+        owner_offsets[code] = len(owner_blob)
+        owner_blob += owner.encode("utf-8")
+    owner_offsets[len(owner_numbers)] = len(owner_blob)
+
+    sections: List[Union[array, bytearray]] = [
+        balances, id_offsets, owner_codes, hash_slots, owner_offsets, id_blob, owner_blob,
+    ]  # fmt: skip
+    offsets = []
+    pos = _HEADER.size
+    for section in sections:
+        pos = _align(pos)
+        offsets.append(pos)
+        pos += len(section) * (section.itemsize if isinstance(section, array) else 1)
+    offsets.append(pos)
+
+    tmp = f"{os.fspath(path)}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, count, len(owner_numbers), slots, *offsets))
+        for section, start in zip(sections, offsets):
+            f.write(bytes(start - f.tell()))
+            f.write(section)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return count
+
+
+class MappedAccount(BankAccount):
+    """Read-only ``BankAccount`` view of one row of a :class:`MappedBook`."""
+
+    def __init__(self, book: "MappedBook", row: int) -> None:
+        # BankAccount.__init__ is deliberately not called: state lives in the mapping.
+        self._book = book
+        self._row = row
+
+    @property
+    def name(self) -> str:
+        return self._book._id_bytes(self._row).decode("utf-8")
+
+    @name.setter
+    def name(self, value: str) -> None:
+        raise AttributeError("Mapped accounts are read-only.")
+
+    @property
+    def owner(self) -> str:
+        return self._book._owner(self._row)
+
+    @property
+    def balance_minor(self) -> int:
+        return self._book._balances[self._row]
+
+    @balance_minor.setter
+    def balance_minor(self, value: int) -> None:
+        raise AttributeError("Mapped accounts are read-only.")
+
+    def __repr__(self) -> str:
+        return f"MappedAccount({self.name!r}, balance={self.balance:.2f})"
+
+
+class _Rows(Sequence[MappedAccount]):
+    """Lazy, id-ordered sequence of a book's accounts (views built on access)."""
+
+    def __init__(self, book: "MappedBook", start: int = 0, stop: Optional[int] = None) -> None:
+        self._book = book
+        self._start = start
+        self._stop = len(book) if stop is None else stop
+
+    def __len__(self) -> int:
+        return max(self._stop - self._start, 0)
+
+    @overload
+    def __getitem__(self, index: int) -> MappedAccount: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "_Rows": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[MappedAccount, "_Rows"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Mapped account slices do not support a step.")
+            return _Rows(self._book, self._start + start, self._start + max(stop, start))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("account index out of range")
+        return MappedAccount(self._book, self._start + index)
+
+    def __iter__(self) -> Iterator[MappedAccount]:
+        book = self._book
+        return (MappedAccount(book, row) for row in range(self._start, self._stop))
+
+
+class MappedBook:
+    """Read-only account book served from a :func:`write_mapped` file.
+
+    Offers the read side of :class:`~bank.manager.AccountManager` (``get``,
+    ``list_accounts``, ``page_accounts``, ``total_balance_minor``). Returned
+    accounts read the mapping directly and stay valid until :meth:`close`.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike[str]]) -> None:
+        if sys.byteorder != "little":  # pragma: no cover - the format is little-endian
+            raise StorageError("Mapped snapshots can only be read on little-endian hosts.")
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise StorageError(f"{self.path}: not a mapped account snapshot.") from e
+        mm = self._mm
+        try:
+            magic, count, owners, slots, *offsets = _HEADER.unpack_from(mm, 0)
+        except struct.error as e:
+            mm.close()
+            raise StorageError(f"{self.path}: truncated mapped snapshot header.") from e
+        if magic != MAGIC or offsets[-1] != len(mm):
+            mm.close()
+            raise StorageError(f"{self.path}: not a mapped account snapshot or truncated.")
+        self._count = count
+        view = memoryview(mm)
+        balances, id_offsets, owner_codes, hash_slots, owner_offsets, id_base, owner_base, _ = offsets
+        # zero-copy typed views over the mapping
+        self._views = [
+            view[balances : balances + 8 * count].cast("q"),
+            view[id_offsets : id_offsets + 8 * (count + 1)].cast("Q"),
+            view[owner_codes : owner_codes + 4 * count].cast("I"),
+            view[hash_slots : hash_slots + 4 * slots].cast("I"),
+            view[owner_offsets : owner_offsets + 8 * (owners + 1)].cast("Q"),
+            view,
+        ]
+        self._balances, self._id_offsets, self._owner_codes, self._slots, self._owner_offsets, _ = self._views
+        self._balances_at = balances
+        self._id_base = id_base
+        self._owner_base = owner_base
+        self._owner_cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, account_id: object) -> bool:
+        return isinstance(account_id, str) and self._find(account_id) is not None
+
+    # -- row access ------------------------------------------------------------
+    def _id_bytes(self, row: int) -> bytes:
+        offsets = self._id_offsets
+        base = self._id_base
+        return self._mm[base + offsets[row] : base + offsets[row + 1]]
+
+    def _owner(self, row: int) -> str:
+        code = self._owner_codes[row]
+        owner = self._owner_cache.get(code)
+        if owner is None:
+            offsets = self._owner_offsets
+            base = self._owner_base
+            owner = self._mm[base + offsets[code] : base + offsets[code + 1]].decode("utf-8")
+            self._owner_cache[code] = owner
+        return owner
+
+    def _find(self, account_id: str) -> Optional[int]:
+        key = account_id.encode("utf-8")
+        slots = self._slots
+        mask = len(slots) - 1
+        mm = self._mm
+        offsets = self._id_offsets
+        base = self._id_base
+        h = zlib.crc32(key) & mask
+        while True:
+            row = slots[h]
+            if not row:
+                return None
+            row -= 1
+            if mm[base + offsets[row] : base + offsets[row + 1]] == key:
+                return row
+            h = (h + 1) & mask
+
+    def _lower_bound(self, key: bytes) -> int:
+        """First row whose id is >= ``key`` (ids compare as UTF-8 bytes)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # -- AccountManager read API -----------------------------------------------
+    def get(self, account_id: str) -> Optional[MappedAccount]:
+        row = self._find(account_id)
+        return None if row is None else MappedAccount(self, row)
+
+    def list_accounts(self) -> Sequence[MappedAccount]:
+        """All accounts in id order, as a lazy sequence (no rows are read until indexed)."""
+        return _Rows(self)
+
+    def page_accounts(self, offset: int = 0, limit: int = 50, prefix: str = "") -> Tuple[int, List[MappedAccount]]:
+        """Return ``(matches, accounts)`` for one id-ordered page of ids starting with ``prefix``."""
+        if prefix:
+            key = prefix.encode("utf-8")
+            start = self._lower_bound(key)
+            stop = self._lower_bound(key + b"\xff")  # 0xFF never occurs in UTF-8
+        else:
+            start, stop = 0, self._count
+        offset = max(offset, 0)
+        first = min(start + offset, stop)
+        return stop - start, list(_Rows(self, first, min(first + max(limit, 0), stop)))
+
+    def total_balance_minor(self) -> int:
+        """Sum of all balances in minor units, computed over the mapped column."""
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover - numpy ships with pandas
+            return sum(self._balances)
+        column = np.frombuffer(self._mm, dtype=np.int64, count=self._count, offset=self._balances_at)
+        return int(column.sum())
+
+    def close(self) -> None:
+        for view in self._views:  # typed views first, the base view last
+            view.release()  # exported buffers must go before the mapping can close
+        self._views = []
+        self._mm.close()
+
+    def __enter__(self) -> "MappedBook":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,301 @@
+"""Optional operation metrics, Prometheus export and an on-demand profiler.
+
+Instrumentation is opt-in: ``AccountManager(metrics=Metrics())`` wraps the
+manager's ``create`` / ``get`` / ``deposit`` / ``withdraw`` / ``transfer`` /
+``delete`` on that instance only. A manager built without ``metrics`` runs
+the plain class methods, so disabled instrumentation costs nothing.
+
+Each wrapped call adds two clock reads and one bucket increment, under a
+microsecond. Latencies go into :class:`Histogram`, an HDR-style log-linear
+histogram with 16 sub-buckets per power of two (under 6.25% relative error,
+fixed memory). Failed calls are also counted per exception type.
+
+Counters are plain ints updated without a lock; under heavy multi-threaded
+use an occasional increment may be lost, which is acceptable for metrics.
+"""
+from __future__ import annotations
+
+import io
+import os
+import signal
+import sys
+import time
+from array import array
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # cProfile / pstats cost ~10ms to import; loaded when profiling starts
+    import cProfile
+    import pstats
+
+INSTRUMENTED_OPS = ("create", "get", "deposit", "withdraw", "transfer", "delete")
+
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS  # sub-buckets per power of two
+_BUCKETS = 64 * _SUB
+
+# Prometheus ``le`` boundaries in seconds (the HDR buckets are re-binned onto these)
+EXPORT_BOUNDS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+
+
+def _index(ns: int) -> int:
+    # values below _SUB map to themselves; above, the top _SUB_BITS + 1 bits pick the bucket
+    bits = ns.bit_length()
+    if bits <= _SUB_BITS:
+        return max(ns, 0)
+    shift = bits - _SUB_BITS - 1
+    return (shift << _SUB_BITS) + (ns >> shift)
+
+
+def _upper(index: int) -> int:
+    """Largest value (ns) that falls in bucket ``index``."""
+    if index < _SUB:
+        return index
+    shift = index // _SUB - 1
+    return ((index % _SUB + _SUB + 1) << shift) - 1
+
+
+class Histogram:
+    """Fixed-size log-linear latency histogram (values in nanoseconds).
+
+    Only the bucket counts and the running sum are updated per value; the
+    count and maximum are derived from the buckets when read.
+    """
+
+    def __init__(self) -> None:
+        self.counts = array("q", bytes(8 * _BUCKETS))
+        self.total_ns = 0
+
+    def reset(self) -> None:
+        # in place: instrumented callers hold a reference to ``counts``
+        self.counts[:] = array("q", bytes(8 * _BUCKETS))
+        self.total_ns = 0
+
+    def record(self, ns: int) -> None:
+        self.counts[_index(ns)] += 1
+        self.total_ns += ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def max_ns(self) -> int:
+        """Upper bound of the highest non-empty bucket."""
+        for i in range(_BUCKETS - 1, -1, -1):
+            if self.counts[i]:
+                return _upper(i)
+        return 0
+
+    def percentile(self, q: float) -> int:
+        """Upper bound (ns) of the bucket holding the ``q``-th percentile (0-100)."""
+        count = self.count
+        if not count:
+            return 0
+        rank = max(1, int(count * q / 100 + 0.5))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return _upper(i)
+        return self.max_ns
+
+    def cumulative(self, bounds_ns: List[int]) -> List[int]:
+        """Counts of values ``<= bound`` for each of the ascending ``bounds_ns``."""
+        out = []
+        seen = 0
+        i = 0
+        for bound in bounds_ns:
+            while i < _BUCKETS and _upper(i) <= bound:
+                seen += self.counts[i]
+                i += 1
+            out.append(seen)
+        return out
+
+
+class Metrics:
+    """Per-operation call counts, error counts and latency histograms."""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns) -> None:
+        self.clock = clock
+        self.started = time.time()
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+
+    def histogram(self, op: str) -> Histogram:
+        hist = self.histograms.get(op)
+        if hist is None:
+            hist = self.histograms[op] = Histogram()
+        return hist
+
+    def observe(self, op: str, ns: int, error: Optional[str] = None) -> None:
+        self.histogram(op).record(ns)
+        if error is not None:
+            self.errors[op, error] = self.errors.get((op, error), 0) + 1
+
+    def reset(self) -> None:
+        # histograms are cleared in place: instrumented managers hold references to them
+        for hist in self.histograms.values():
+            hist.reset()
+        self.errors.clear()  # cleared in place for the same reason
+        self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view: per op count, errors, rate and latency percentiles (µs)."""
+        uptime = max(time.time() - self.started, 1e-9)
+        ops = {}
+        for op, hist in sorted(self.histograms.items()):
+            ops[op] = {
+                "count": hist.count,
+                "errors": {e: n for (o, e), n in sorted(self.errors.items()) if o == op},
+                "rate_per_s": hist.count / uptime,
+                "mean_us": hist.total_ns / hist.count / 1e3 if hist.count else 0.0,
+                "p50_us": hist.percentile(50) / 1e3,
+                "p90_us": hist.percentile(90) / 1e3,
+                "p99_us": hist.percentile(99) / 1e3,
+                "max_us": hist.max_ns / 1e3,
+            }
+        return {"uptime_s": uptime, "ops": ops}
+
+    def to_prometheus(self, prefix: str = "bank") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        bounds_ns = [int(b * 1e9) for b in EXPORT_BOUNDS]
+        lines = [
+            f"# HELP {prefix}_operations_total Operations called on the account manager.",
+            f"# TYPE {prefix}_operations_total counter",
+        ]
+        items = sorted(self.histograms.items())
+        lines += [f'{prefix}_operations_total{{op="{op}"}} {h.count}' for op, h in items]
+        lines += [
+            f"# HELP {prefix}_operation_errors_total Operations that raised, by exception type.",
+            f"# TYPE {prefix}_operation_errors_total counter",
+        ]
+        lines += [
+            f'{prefix}_operation_errors_total{{op="{op}",error="{error}"}} {n}'
+            for (op, error), n in sorted(self.errors.items())
+        ]
+        name = f"{prefix}_operation_duration_seconds"
+        lines += [
+            f"# HELP {name} Latency of account manager operations.",
+            f"# TYPE {name} histogram",
+        ]
+        for op, hist in items:
+            for bound, n in zip(EXPORT_BOUNDS, hist.cumulative(bounds_ns)):
+                lines.append(f'{name}_bucket{{op="{op}",le="{bound:g}"}} {n}')
+            lines.append(f'{name}_bucket{{op="{op}",le="+Inf"}} {hist.count}')
+            lines.append(f'{name}_sum{{op="{op}"}} {hist.total_ns / 1e9:.9f}')
+            lines.append(f'{name}_count{{op="{op}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | os.PathLike[str], prefix: str = "bank") -> None:
+        """Atomically write :meth:`to_prometheus` to ``path`` (node_exporter textfile style)."""
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".prom.tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp, path)
+
+
+def instrument(manager: Any, metrics: Metrics, ops: Tuple[str, ...] = INSTRUMENTED_OPS) -> None:
+    """Wrap ``ops`` on this ``manager`` instance so each call is timed into ``metrics``."""
+    for op in ops:
+        setattr(manager, op, _timed(getattr(manager, op), metrics.histogram(op), op, metrics))
+
+
+def _timed(fn: Callable[..., Any], hist: Histogram, op: str, metrics: Metrics) -> Callable[..., Any]:
+    clock = metrics.clock
+    counts = hist.counts
+    errors = metrics.errors
+
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            key = (op, type(e).__name__)
+            errors[key] = errors.get(key, 0) + 1
+            raise
+        finally:
+            # Histogram.record, inlined: this runs on every instrumented call
+            ns = clock() - start
+            bits = ns.bit_length()
+            if bits <= _SUB_BITS:
+                counts[ns if ns > 0 else 0] += 1
+            else:
+                shift = bits - _SUB_BITS - 1
+                counts[(shift << _SUB_BITS) + (ns >> shift)] += 1
+            hist.total_ns += ns
+
+    timed.__name__ = getattr(fn, "__name__", op)
+    timed.__doc__ = fn.__doc__
+    timed.__wrapped__ = fn  # type: ignore[attr-defined]
+    return timed
+
+
+class Profiler:
+    """cProfile wrapper that reports the hottest call paths on demand.
+
+    ``start()`` / ``stop()`` bracket the code to profile (only the calling
+    thread is profiled); :meth:`report` renders the top functions by
+    cumulative time together with their callers.
+    """
+
+    def __init__(self) -> None:
+        self._profile: Optional[cProfile.Profile] = None
+        self._stats: Optional[pstats.Stats] = None
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self) -> None:
+        if self._profile is None:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+            import pstats  # after disable(), so the import is not profiled
+
+            self._stats = pstats.Stats(self._profile)
+            self._profile = None
+
+    def toggle(self, out: IO[str] = sys.stderr, top: int = 25) -> None:
+        """Start profiling, or stop and write the report to ``out``."""
+        if self.running:
+            self.stop()
+            out.write(self.report(top))
+            out.flush()
+        else:
+            self.start()
+
+    def report(self, top: int = 25) -> str:
+        if self._stats is None:
+            return "no profile collected\n"
+        buf = io.StringIO()
+        stats = self._stats
+        stats.stream = buf  # type: ignore[attr-defined]
+        stats.sort_stats("cumulative").print_stats(top)
+        stats.print_callers(top // 2 or 1)
+        return buf.getvalue()
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR1", 0), top: int = 25) -> bool:
+        """Toggle profiling whenever the process receives ``signum`` (POSIX only).
+
+        Returns ``False`` where the signal does not exist or this is not the
+        main thread.
+        """
+        if not signum:
+            return False
+        try:
+            signal.signal(signum, lambda *_: self.toggle(sys.stderr, top))
+        except ValueError:  # not the main thread
+            return False
+        return True
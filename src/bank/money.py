@@ -0,0 +1,108 @@
+"""Fixed-point money helpers.
+
+Balances and amounts are carried as ``int`` minor units (cents) everywhere in
+the ``bank`` package; conversion happens only at the parse/format boundary.
+
+Rounding rule: a value is rounded to the nearest minor unit, ties to even
+(banker's rounding), based on its *decimal* value. For a ``float`` that is the
+shortest ``repr`` — the number the user typed — so ``to_minor(0.125)`` is
+``12`` and ``to_minor(0.135)`` is ``14`` even though neither is exactly
+representable in binary.
+"""
+from __future__ import annotations
+
+import operator
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from typing import Union
+
+SCALE = 100  # minor units per major unit
+
+Amount = Union[int, float, Decimal]
+
+# |fraction| above this is treated as a possible tie and re-checked exactly
+_TIE_EPSILON = 0.5 - 1e-6
+
+# minor units are stored as signed 64-bit integers (journal, snapshots, columns)
+_MINOR_LIMIT = 1 << 63
+
+
+def _decimal_to_minor(value: Decimal) -> int:
+    try:
+        return int((value * SCALE).to_integral_value(ROUND_HALF_EVEN))
+    except (InvalidOperation, ValueError, OverflowError) as e:
+        raise ValueError("Amount must be a finite number.") from e
+
+
+def _checked(minor: int, what: str) -> int:
+    if -_MINOR_LIMIT < minor < _MINOR_LIMIT:
+        return minor
+    raise ValueError(f"{what} is out of range.")
+
+
+def to_minor(amount: Amount, what: str = "Amount") -> int:
+    """Convert a major-unit ``amount`` to integer minor units.
+
+    Raises:
+        TypeError: if ``amount`` is not an int, float or Decimal.
+        ValueError: if ``amount`` is NaN or infinite, or its minor units do
+            not fit a signed 64-bit integer.
+    """
+    if type(amount) is float:
+        scaled = amount * SCALE
+        try:
+            minor = round(scaled)
+        except (OverflowError, ValueError) as e:
+            raise ValueError(f"{what} must be a finite number.") from e
+        if abs(scaled - minor) < _TIE_EPSILON:
+            return _checked(minor, what)
+        # close to a half-cent: decide from the decimal value as written
+        return _checked(_decimal_to_minor(Decimal(repr(amount))), what)
+    if type(amount) is int:
+        return _checked(amount * SCALE, what)
+    if isinstance(amount, Decimal):
+        return _checked(_decimal_to_minor(amount), what)
+    if isinstance(amount, int):  # subclasses such as bool
+        return _checked(int(amount) * SCALE, what)
+    if isinstance(amount, float):
+        return to_minor(float(amount), what)
+    raise TypeError(f"{what} must be a number.")
+
+
+def as_minor(amount: object, what: str = "Amount") -> int:
+    """Return ``amount``, already in minor units, as an ``int``.
+
+    Any integer type is accepted, NumPy's included (columns read with
+    ``zip(ids, ids, amounts)`` yield ``numpy.int64``).
+
+    Raises:
+        TypeError: if ``amount`` is a ``bool`` or not an integer.
+    """
+    if type(amount) is int:
+        return amount
+    if not isinstance(amount, bool):
+        try:
+            return operator.index(amount)  # type: ignore[arg-type]
+        except TypeError:
+            pass
+    raise TypeError(f"{what} must be an integer number of minor units.")
+
+
+def parse(text: str) -> int:
+    """Parse user input such as ``"1,234.56"`` into minor units."""
+    try:
+        value = Decimal(text.strip().replace(",", "").replace("_", ""))
+    except InvalidOperation as e:
+        raise ValueError(f"Invalid amount: {text!r}") from e
+    return _checked(_decimal_to_minor(value), "Amount")
+
+
+def from_minor(minor: int) -> float:
+    """Return ``minor`` as a float in major units (for display / legacy callers)."""
+    return minor / SCALE
+
+
+def format_minor(minor: int, thousands: bool = True) -> str:
+    """Format minor units exactly, e.g. ``123456 -> "1,234.56"``."""
+    sign = "-" if minor < 0 else ""
+    major, cents = divmod(abs(minor), SCALE)
+    return f"{sign}{major:,}.{cents:02d}" if thousands else f"{sign}{major}.{cents:02d}"
@@ -0,0 +1,232 @@
+"""Multi-version, point-in-time snapshots of the book.
+
+:meth:`AccountManager.snapshot() <bank.manager.AccountManager.snapshot>`
+returns a :class:`BookSnapshot`: an immutable view of every account's balance
+(and owner) as of one version. Taking one copies nothing, and reading one
+never blocks a writer, so a long report or audit can sum the book exactly
+while transfers keep running::
+
+    with mgr.snapshot() as snap:
+        assert snap.total_minor() == expected_total
+
+With the in-memory store the manager keeps the versions itself
+(:class:`Versions`). Taking a snapshot freezes the current version number and
+moves writes on to the next one. While any snapshot is open, the first write
+to an account in each version first saves the account's previous state,
+stamped with that version: copy-on-write per account, not per book. Creating
+an account saves "absent". A snapshot at version ``v`` reads an account's live
+state and *then* its saved states. The first saved state stamped after ``v``
+is what the account held at ``v``; if there is none, the live state is
+already the one at ``v``. Writers always save before they change anything, so
+a reader never sees half of a transfer or batch.
+
+Saved states are reclaimed without a sweep. When the last open snapshot
+closes (:meth:`BookSnapshot.close`, the ``with`` block, or garbage
+collection), all of them are dropped at once. While others stay open, states
+only older snapshots could read are dropped the next time their account is
+written.
+
+A storage with its own multi-version reads returns its own snapshot from
+:meth:`Storage.snapshot() <bank.storage.Storage.snapshot>`:
+:class:`~bank.sqlite_storage.SQLiteStorage` holds a WAL read transaction open,
+which also sees other processes' commits up to that instant.
+
+The plain :class:`~bank.manager.AccountManager` is single-threaded, so take
+and read snapshots on its thread. :class:`~bank.concurrent.ConcurrentAccountManager`
+takes a snapshot between writes (all stripes, for an instant) and may then be
+read from any thread.
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from bisect import bisect_right
+from itertools import compress
+from operator import attrgetter, itemgetter
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from bank.account import BankAccount
+    from bank.storage import Row, Storage
+
+State = Tuple[int, Optional[int], str]  # (stamp, balance_minor or None if absent, owner)
+# an account's saved states, oldest first: a tuple of ints and strings, which the garbage
+# collector stops tracking, so a long-open snapshot does not make full collections slower
+Chain = Tuple[State, ...]
+
+_STAMP = itemgetter(0)
+_NAME = attrgetter("name")
+_BALANCE = attrgetter("balance_minor")
+_CHUNK = 1 << 15
+
+
+class BookSnapshot:
+    """Immutable view of every balance at :attr:`version`; close it (or use ``with``) when done."""
+
+    version: int
+
+    def get(self, account_id: str) -> Optional[int]:
+        """``account_id``'s balance in minor units at this version, or ``None`` if it did not exist."""
+        raise NotImplementedError
+
+    def rows(self) -> Iterator[Row]:
+        """``(account_id, owner, balance_minor)`` for every account, in no particular order."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __contains__(self, account_id: object) -> bool:
+        return self.get(account_id) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.rows())
+
+    def total_minor(self) -> int:
+        return sum(balance for _, _, balance in self.rows())
+
+    def __enter__(self) -> "BookSnapshot":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class Versions:
+    """Version counter and saved account states for the in-memory store's snapshots."""
+
+    def __init__(self) -> None:
+        self.version = 0  # stamp of current writes; a snapshot sees stamps up to its own version
+        self.live = 0  # open snapshots; writes save states only while this is non-zero
+        self.saved: Dict[str, Chain] = {}
+        self._open: Dict[int, int] = {}  # version -> open snapshots at it
+        self._oldest = 0
+        # snapshots are closed from any thread, or by garbage collection while this is held
+        self._lock = threading.RLock()
+
+    def snapshot(self, storage: Storage) -> "MemorySnapshot":
+        with self._lock:
+            version = self.version
+            self.version = version + 1
+            self._open[version] = self._open.get(version, 0) + 1
+            self._oldest = min(self._open)
+            self.live += 1
+        return MemorySnapshot(self, storage, version)
+
+    def release(self, version: int) -> None:
+        with self._lock:
+            left = self._open[version] - 1
+            if left:
+                self._open[version] = left
+            else:
+                del self._open[version]
+            self.live -= 1
+            if self._open:
+                self._oldest = min(self._open)
+            else:
+                self.saved = {}  # no snapshot can read any saved state
+
+    def save(self, account_id: str, acct: Optional[BankAccount]) -> None:
+        """Save ``account_id``'s state before a write changes it (``acct=None``: being created)."""
+        stamp = self.version
+        saved = self.saved
+        chain = saved.get(account_id)
+        if chain is not None and chain[-1][0] == stamp:
+            return  # only the first write in a version matters
+        if acct is None:
+            state: State = (stamp, None, "")
+        else:
+            state = (stamp, acct.balance_minor, getattr(acct, "owner", ""))
+        if chain is None:
+            saved[account_id] = (state,)
+            return
+        oldest = self._oldest
+        if chain[0][0] <= oldest:  # states no open snapshot reads any more
+            chain = tuple(s for s in chain if s[0] > oldest)
+        saved[account_id] = chain + (state,)
+
+
+class MemorySnapshot(BookSnapshot):
+    """Snapshot of an in-memory book, resolved through :class:`Versions`."""
+
+    def __init__(self, versions: Versions, storage: Storage, version: int) -> None:
+        self.version = version
+        self._versions = versions
+        self._storage = storage
+        self._release = weakref.finalize(self, versions.release, version)
+
+    def _saved(self) -> Dict[str, Chain]:
+        if not self._release.alive:
+            raise ValueError("Snapshot is closed.")
+        return self._versions.saved
+
+    def _at(self, chain: Chain) -> Optional[State]:
+        i = bisect_right(chain, self.version, key=_STAMP)
+        return chain[i] if i < len(chain) else None
+
+    def get(self, account_id: str) -> Optional[int]:
+        saved = self._saved()
+        acct = self._storage.get(account_id)
+        balance = None if acct is None else acct.balance_minor
+        chain = saved.get(account_id)  # read after the live state: see the module docstring
+        state = self._at(chain) if chain else None
+        return balance if state is None else state[1]
+
+    def rows(self) -> Iterator[Row]:
+        saved = self._saved()
+        accounts = list(self._storage.accounts())
+        for acct in accounts:
+            account_id = acct.name
+            balance: Optional[int] = acct.balance_minor
+            owner = getattr(acct, "owner", "")
+            chain = saved.get(account_id)
+            state = self._at(chain) if chain else None
+            if state is not None:
+                _, balance, owner = state
+            if balance is not None:
+                yield account_id, owner, balance
+        # accounts deleted since this version are only in the saved states
+        listed = None
+        for account_id, chain in list(saved.items()):
+            state = self._at(chain)
+            if state is None or state[1] is None:
+                continue
+            if listed is None:
+                listed = {a.name for a in accounts}
+            if account_id not in listed:
+                yield account_id, state[2], state[1]
+
+    def _tally(self) -> Tuple[int, int]:
+        """``(accounts, total balance in minor units)`` at this version, without a Python-level pass."""
+        saved = self._saved()
+        accounts = list(self._storage.accounts())
+        count = len(accounts)
+        # chunks, so the GIL can switch to writers between C-level passes over a large book
+        chunks = [accounts[i : i + _CHUNK] for i in range(0, count, _CHUNK)]
+        balances = [list(map(_BALANCE, chunk)) for chunk in chunks]  # live values, then saved states
+        changed = {}
+        for account_id, chain in list(saved.items()):
+            state = self._at(chain)
+            if state is not None:
+                changed[account_id] = state[1]
+        total = 0
+        for chunk, values in zip(chunks, balances):
+            total += sum(values)
+            if changed:  # swap the live values of accounts changed since for their saved ones
+                stale = list(compress(values, map(changed.__contains__, map(_NAME, chunk))))
+                total -= sum(stale)
+                count -= len(stale)
+        for balance in changed.values():
+            if balance is not None:
+                total += balance
+                count += 1
+        return count, total
+
+    def total_minor(self) -> int:
+        return self._tally()[1]
+
+    def __len__(self) -> int:
+        return self._tally()[0]
+
+    def close(self) -> None:
+        self._release()
@@ -0,0 +1,361 @@
+"""Statements, daily balance roll-ups and owner summaries with pandas.
+
+Reports are built from the manager's accounts and its
+:class:`~bank.ledger.Ledger` (the timestamped history of mutations made
+through the manager). Ledger entries are copied out as columns
+(:meth:`~bank.ledger.Ledger.columns`) and turned into frames with NumPy, and
+every aggregation is a vectorised pandas operation.
+
+Balances are reconstructed *backwards* from the current balances: an
+account's balance at time ``t`` is its balance now minus the net of all
+postings after ``t``. History therefore never has to reach back to an
+account's creation, but a report cannot look past the ledger's oldest
+retained entry. A delete is recorded with the account's closing balance and
+posted as a debit of it, so a deleted account's history comes out right
+from its balance now, zero.
+
+Large reports are produced as iterators of frames (``*_chunks``) and written
+with :func:`write_csv` / :func:`write_parquet` one chunk at a time, so memory
+stays bounded by ``chunk_rows`` (plus one running sum per account) however
+long the history is. Amounts are integer minor units throughout.
+
+pandas and NumPy are required; Parquet output also needs ``pyarrow``.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from bank.ledger import KINDS, Ledger, LedgerColumns, TimeLike, _to_ns
+
+if TYPE_CHECKING:
+    from bank.manager import AccountManager
+
+CHUNK_ROWS = 100_000
+_KIND_NAMES = [KINDS[code] for code in sorted(KINDS)]  # categories, in op-code order
+_MIN_CODE = min(KINDS)
+
+Frames = Iterable[pd.DataFrame]
+
+
+def _ledger(manager: AccountManager) -> Ledger:
+    ledger = manager.ledger
+    if ledger is None:
+        raise ValueError("Reports need a manager built with a Ledger (AccountManager(ledger=...)).")
+    return ledger
+
+
+def _seq_range(ledger: Ledger, start: Optional[TimeLike], end: Optional[TimeLike]) -> range:
+    first = ledger.oldest_seq if start is None else ledger.seq_at(start)
+    last = ledger.next_seq if end is None else ledger.seq_at(end)
+    return range(first, max(first, last))
+
+
+def _current_balances(manager: AccountManager) -> pd.Series:
+    accounts = manager.list_accounts()
+    return pd.Series(
+        np.fromiter((a.balance_minor for a in accounts), dtype=np.int64, count=len(accounts)),
+        index=pd.Index([a.name for a in accounts], dtype=object),
+    )
+
+
+# -- frames ----------------------------------------------------------------------
+def entries_frame(columns: LedgerColumns) -> pd.DataFrame:
+    """Ledger columns as a frame: seq, time (UTC), kind, src, dst, amount_minor."""
+    n = len(columns.amount_minor)
+    codes = np.frombuffer(columns.kinds, dtype=np.uint8).astype(np.int8) - _MIN_CODE
+    return pd.DataFrame(
+        {
+            "seq": np.arange(columns.first_seq, columns.first_seq + n, dtype=np.int64),
+            "time": pd.to_datetime(np.frombuffer(columns.time_ns, dtype=np.int64), utc=True),
+            "kind": pd.Categorical.from_codes(codes, categories=_KIND_NAMES),
+            "src": pd.array(columns.src, dtype="string"),
+            "dst": pd.array(columns.dst, dtype="string"),
+            "amount_minor": np.frombuffer(columns.amount_minor, dtype=np.int64),
+        }
+    )
+
+
+def postings(entries: pd.DataFrame) -> pd.DataFrame:
+    """Split entries into signed per-account postings, in sequence order.
+
+    A transfer becomes a debit of ``src`` and a credit of ``dst``; creates
+    and deposits credit ``dst``, withdrawals and deletes (for the closing
+    balance) debit ``src``. Columns: seq, time, kind, account_id, counterparty, delta_minor.
+    """
+    credit = entries[entries["dst"].notna()]
+    debit = entries[entries["src"].notna()]
+    frame = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "seq": credit["seq"],
+                    "time": credit["time"],
+                    "kind": credit["kind"],
+                    "account_id": credit["dst"],
+                    "counterparty": credit["src"],
+                    "delta_minor": credit["amount_minor"],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "seq": debit["seq"],
+                    "time": debit["time"],
+                    "kind": debit["kind"],
+                    "account_id": debit["src"],
+                    "counterparty": debit["dst"],
+                    "delta_minor": -debit["amount_minor"],
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    return frame.sort_values("seq", kind="stable", ignore_index=True)
+
+
+def ledger_chunks(
+    manager: AccountManager,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Ledger entries with ``start <= time < end`` as frames of up to ``chunk_rows`` rows."""
+    ledger = _ledger(manager)
+    seqs = _seq_range(ledger, start, end)
+    for first in range(seqs.start, seqs.stop, chunk_rows):
+        yield entries_frame(ledger.columns(first, min(first + chunk_rows, seqs.stop)))
+
+
+# -- reports ---------------------------------------------------------------------
+def statement(
+    manager: AccountManager,
+    account_id: str,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+) -> pd.DataFrame:
+    """Postings of ``account_id`` with ``start <= time < end`` and the balance after each.
+
+    Columns: time, kind, counterparty, amount_minor (signed), balance_minor.
+    ``frame.attrs`` holds ``opening_minor`` and ``closing_minor``.
+    """
+    ledger = _ledger(manager)
+    # everything from ``start`` to now: later postings are undone from the current balance
+    first = ledger.oldest_seq if start is None else ledger.seq_at(start)
+    columns = ledger.columns(first, ledger.next_seq)
+    src = np.array(columns.src, dtype=object)
+    dst = np.array(columns.dst, dtype=object)
+    incoming, outgoing = dst == account_id, src == account_id
+    mine = incoming | outgoing
+    incoming, outgoing = incoming[mine], outgoing[mine]
+    time_ns = np.frombuffer(columns.time_ns, dtype=np.int64)[mine]
+    amounts = np.frombuffer(columns.amount_minor, dtype=np.int64)[mine]
+    signed = np.where(incoming, amounts, -amounts)
+    signed[incoming & outgoing] = 0  # a self-transfer nets to 0
+    acct = manager.get(account_id)
+    current = acct.balance_minor if acct is not None else 0
+    opening = current - int(signed.sum())
+    balances = opening + np.cumsum(signed)
+    keep = slice(None) if end is None else time_ns < _to_ns(end)
+    codes = np.frombuffer(columns.kinds, dtype=np.uint8)[mine].astype(np.int8) - _MIN_CODE
+    frame = pd.DataFrame(
+        {
+            "time": pd.to_datetime(time_ns[keep], utc=True),
+            "kind": pd.Categorical.from_codes(codes[keep], categories=_KIND_NAMES),
+            "counterparty": pd.array(np.where(incoming, src[mine], dst[mine])[keep], dtype="string"),
+            "amount_minor": signed[keep],
+            "balance_minor": balances[keep],
+        }
+    )
+    frame.attrs["opening_minor"] = opening
+    frame.attrs["closing_minor"] = int(frame["balance_minor"].iloc[-1]) if len(frame) else opening
+    return frame
+
+
+def daily_balance_chunks(
+    manager: AccountManager,
+    start: Optional[TimeLike] = None,
+    end: Optional[TimeLike] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Per (UTC day, account) net flow and closing balance, newest day first.
+
+    The ledger is walked backwards in chunks of ``chunk_rows`` entries; the
+    only state kept between chunks is each account's net of later postings.
+    Each yielded frame (date, account_id, net_minor, closing_minor) covers
+    whole days, sorted by account id within a day.
+    """
+    ledger = _ledger(manager)
+    seqs = _seq_range(ledger, start, end)
+    balances = _current_balances(manager)
+    # postings after the window still count towards "later"
+    later = _net_by_account(manager, seqs.stop, ledger.next_seq, chunk_rows)
+    pending: Optional[pd.Series] = None  # the oldest, possibly partial, day of the last chunk
+    stop = seqs.stop
+    while stop > seqs.start:
+        first = max(seqs.start, stop - chunk_rows)
+        frame = postings(entries_frame(ledger.columns(first, stop)))
+        frame["date"] = frame["time"].dt.floor("D")
+        daily = frame.groupby(["date", "account_id"], sort=False, observed=True)["delta_minor"].sum()
+        if pending is not None:
+            daily = daily.add(pending, fill_value=0).astype(np.int64)
+        oldest = daily.index.get_level_values("date").min()
+        complete = daily[daily.index.get_level_values("date") > oldest] if first > seqs.start else daily
+        pending = daily[daily.index.get_level_values("date") == oldest] if first > seqs.start else None
+        for date in sorted(complete.index.get_level_values("date").unique(), reverse=True):
+            frame, later = _close_day(complete.xs(date, level="date"), date, balances, later)
+            yield frame
+        stop = first
+
+
+def _close_day(
+    net: pd.Series, date: pd.Timestamp, balances: pd.Series, later: pd.Series
+) -> tuple[pd.DataFrame, pd.Series]:
+    net = net.sort_index()
+    ids = net.index
+    closing = balances.reindex(ids, fill_value=0) - later.reindex(ids, fill_value=0)
+    frame = pd.DataFrame(
+        {
+            "date": date.date(),
+            "account_id": ids.astype(object),
+            "net_minor": net.to_numpy(dtype=np.int64),
+            "closing_minor": closing.to_numpy(dtype=np.int64),
+        }
+    )
+    return frame, later.add(net, fill_value=0).astype(np.int64)
+
+
+def _net_by_account(manager: AccountManager, first: int, stop: int, chunk_rows: int) -> pd.Series:
+    ledger = _ledger(manager)
+    total = pd.Series(dtype=np.int64, index=pd.Index([], dtype=object))
+    for lo in range(first, stop, chunk_rows):
+        frame = postings(entries_frame(ledger.columns(lo, min(lo + chunk_rows, stop))))
+        net = frame.groupby("account_id", sort=False, observed=True)["delta_minor"].sum()
+        total = total.add(net, fill_value=0).astype(np.int64)
+    return total
+
+
+def daily_balances(
+    manager: AccountManager, start: Optional[TimeLike] = None, end: Optional[TimeLike] = None
+) -> pd.DataFrame:
+    """:func:`daily_balance_chunks` as one frame, oldest day first."""
+    chunks = list(daily_balance_chunks(manager, start, end))
+    if not chunks:
+        return pd.DataFrame(columns=["date", "account_id", "net_minor", "closing_minor"])
+    return pd.concat(chunks[::-1], ignore_index=True)
+
+
+def accounts_frame(manager: AccountManager) -> pd.DataFrame:
+    """One row per account: account_id, owner, balance_minor.
+
+    Read from one :meth:`~bank.manager.AccountManager.snapshot`, so the rows
+    are consistent with each other even while transfers run.
+    """
+    with manager.snapshot() as snap:
+        rows = list(snap.rows())
+    return pd.DataFrame(
+        {
+            "account_id": pd.array([r[0] for r in rows], dtype="string"),
+            "owner": pd.array([r[1] for r in rows], dtype="string"),
+            "balance_minor": np.fromiter((r[2] for r in rows), np.int64, len(rows)),
+        }
+    )
+
+
+def owner_summary(manager: AccountManager) -> pd.DataFrame:
+    """Per owner ("" = no owner): accounts, total, mean, min and max balance in minor units."""
+    summary = (
+        accounts_frame(manager)
+        .groupby("owner", sort=True)["balance_minor"]
+        .agg(accounts="count", total_minor="sum", mean_minor="mean", min_minor="min", max_minor="max")
+        .reset_index()
+    )
+    summary["mean_minor"] = summary["mean_minor"].round().astype(np.int64)
+    return summary
+
+
+# -- export ----------------------------------------------------------------------
+def write_csv(chunks: Frames, dest: Union[str, os.PathLike[str], IO[str]]) -> int:
+    """Write frames as one CSV (header once), chunk by chunk; return the row count."""
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, "w", newline="", encoding="utf-8") as f:
+            return write_csv(chunks, f)
+    rows = 0
+    first = True
+    for frame in chunks:
+        frame.to_csv(dest, header=first, index=False)
+        first = False
+        rows += len(frame)
+    return rows
+
+
+def write_parquet(chunks: Frames, dest: Union[str, os.PathLike[str], IO[bytes]]) -> int:
+    """Write frames as one Parquet file (path or binary stream), one row group per chunk.
+
+    Returns the row count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover - pyarrow is optional
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow).") from e
+    writer: Optional[pq.ParquetWriter] = None
+    schema: Optional[pa.Schema] = None
+    rows = 0
+    try:
+        for frame in chunks:
+            if schema is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                # an all-null first chunk would otherwise fix a column's type to null
+                schema = pa.schema(
+                    [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+                )
+                table = table.cast(schema)
+                writer = pq.ParquetWriter(dest, schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            writer.write_table(table)  # type: ignore[union-attr]
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+REPORTS: Dict[str, Callable[..., Frames]] = {
+    "ledger": ledger_chunks,
+    "daily": daily_balance_chunks,
+    "statement": lambda manager, account_id, start=None, end=None: [
+        statement(manager, account_id, start, end)
+    ],
+    "owners": lambda manager, **_: [owner_summary(manager)],
+    "accounts": lambda manager, **_: [accounts_frame(manager)],
+}
+
+
+def export(
+    manager: AccountManager,
+    report: str,
+    dest: Union[str, os.PathLike[str], IO[Any]],
+    fmt: Optional[str] = None,
+    **options: Any,
+) -> int:
+    """Write ``report`` (a key of :data:`REPORTS`) to ``dest`` as CSV or Parquet.
+
+    ``fmt`` defaults to ``"parquet"`` for ``*.parquet`` paths and CSV
+    otherwise (Parquet streams must be binary, CSV streams text); ``options`` go to the report (``account_id``, ``start``,
+    ``end``). Returns the number of rows written.
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report {report!r}; choose from {', '.join(sorted(REPORTS))}.")
+    chunks = REPORTS[report](manager, **options)
+    if fmt is None:
+        fmt = "parquet" if isinstance(dest, (str, os.PathLike)) and os.fspath(dest).endswith(".parquet") else "csv"
+    if fmt == "parquet":
+        return write_parquet(chunks, dest)
+    if fmt != "csv":
+        raise ValueError(f"Unknown export format {fmt!r}.")
+    return write_csv(chunks, dest)
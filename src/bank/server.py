@@ -0,0 +1,323 @@
+"""Asyncio service front-end exposing :class:`~bank.manager.AccountManager`.
+
+Protocol: newline-delimited JSON over TCP or a Unix socket. Each request is
+one object per line::
+
+    {"id": 7, "op": "transfer", "args": {"src_id": "A1", "dst_id": "A2", "amount": "12.50"}}
+
+and each response echoes the request id::
+
+    {"id": 7, "ok": true, "result": null}
+    {"id": 8, "ok": false, "error": "InsufficientFundsError", "message": "Insufficient funds."}
+
+Amounts may be JSON numbers or decimal strings (parsed exactly); balances are
+returned as integer minor units (``balance_minor``).
+
+Mutations accept an optional ``"idempotency_key"`` argument. A client that
+retries after a timeout with the same key gets the first attempt's response
+and the mutation is applied once (see :mod:`bank.idempotency`).
+
+Clients may pipeline any number of requests without waiting for responses.
+Requests from all connections go through one FIFO queue that a single applier
+task drains in micro-batches: the batch is applied to the manager, the journal
+(if any) is synced once, and only then are the responses written. Each
+connection therefore sees its responses in request order, and every
+acknowledged mutation is durable. A connection may have at most
+``max_pending`` requests waiting for a response; beyond that the server stops
+reading from it. If the journal sync fails, every request of that micro-batch
+is answered with the error.
+
+Run standalone::
+
+    python -m bank.server --port 8765 --data-dir ./data
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from collections import deque
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from bank import exceptions as exc
+from bank.account import BankAccount
+from bank.idempotency import IdempotencyCache
+from bank.manager import AccountManager
+
+
+def _amount(value: Any) -> Any:
+    # decimal strings keep exact cents; numbers pass through to bank.money
+    if isinstance(value, str):
+        try:
+            return Decimal(value)
+        except InvalidOperation as e:
+            raise ValueError(f"Invalid amount: {value!r}") from e
+    return value
+
+
+def _account(acct: Optional[BankAccount]) -> Optional[Dict[str, Any]]:
+    if acct is None:
+        return None
+    return {"id": acct.name, "owner": getattr(acct, "owner", ""), "balance_minor": acct.balance_minor}
+
+
+def _error_name(e: Exception) -> str:
+    return type(e).__name__
+
+
+def _encode(response: Dict[str, Any]) -> bytes:
+    return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+
+def _error(request_id: Any, name: str, message: str) -> Dict[str, Any]:
+    return {"id": request_id, "ok": False, "error": name, "message": message}
+
+
+# arguments the manager journals or indexes by, which JSON could send as any type
+_STRING_ARGS = ("account_id", "src_id", "dst_id", "owner")
+
+
+def _check_args(args: Any) -> Dict[str, Any]:
+    if not isinstance(args, dict):
+        raise TypeError("args must be a JSON object")
+    for name in _STRING_ARGS:
+        if name in args and not isinstance(args[name], str):
+            raise TypeError(f"{name} must be a string")
+    key = args.get("idempotency_key")
+    if key is not None and not isinstance(key, str):
+        raise TypeError("idempotency_key must be a string")
+    return args
+
+
+class BankServer:
+    """Serve an :class:`AccountManager` over a line-delimited JSON protocol.
+
+    Args:
+        manager: the book to serve. Only the applier task touches it, so a
+            plain (non-concurrent) manager is safe.
+        max_batch: upper bound on requests applied per micro-batch.
+        max_pending: most unanswered requests one connection may queue.
+    """
+
+    def __init__(
+        self, manager: AccountManager, max_batch: int = 1024, max_pending: int = 1024
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive.")
+        self.manager = manager
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        # (request or parse error, connection, that connection's pending-request slots)
+        self._queue: Deque[
+            Tuple[Union[Dict[str, Any], ValueError], asyncio.StreamWriter, asyncio.Semaphore]
+        ] = deque()
+        self._wakeup = asyncio.Event()
+        self._applier: Optional[asyncio.Task[None]] = None
+        self._server: Optional[asyncio.Server] = None
+        self._ops: Dict[str, Callable[..., Any]] = {
+            "create": self._create,
+            "get": lambda account_id: _account(manager.get(account_id)),
+            "deposit": self._deposit,
+            "withdraw": self._withdraw,
+            "transfer": lambda src_id, dst_id, amount, idempotency_key=None: manager.transfer(
+                src_id, dst_id, _amount(amount), idempotency_key
+            ),
+            "delete": manager.delete,
+            "batch": self._batch,
+            "list": self._list,
+        }
+
+    # -- operations ------------------------------------------------------------
+    def _create(
+        self, account_id: str, owner: str = "", initial: Any = 0, idempotency_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return _account(self.manager.create(account_id, owner, _amount(initial), idempotency_key))
+
+    def _deposit(self, account_id: str, amount: Any, idempotency_key: Optional[str] = None) -> int:
+        return self._post("deposit", account_id, _amount(amount), idempotency_key)
+
+    def _withdraw(self, account_id: str, amount: Any, idempotency_key: Optional[str] = None) -> int:
+        return self._post("withdraw", account_id, _amount(amount), idempotency_key)
+
+    def _post(self, op: str, account_id: str, amount: Any, idempotency_key: Optional[str]) -> int:
+        """Run ``manager.<op>`` and answer with the exact new ``balance_minor``.
+
+        The manager returns the balance as a float, which loses cents on large
+        balances. Only the applier touches the book, so the account read right
+        after the call holds the exact value; with a key, that value is what
+        the manager's idempotency cache remembers, so a replay answers as the
+        first attempt did.
+        """
+        run = getattr(self.manager, op)
+        if idempotency_key is None:
+            run(account_id, amount)
+            return self._balance(account_id)
+        cache = self.manager.idempotency
+        if cache is None:
+            raise ValueError("idempotency_key needs a manager built with an IdempotencyCache.")
+        replay, result = cache.begin(idempotency_key, (op, (account_id, amount)))
+        if replay:
+            return result
+        try:
+            run(account_id, amount)
+            result = self._balance(account_id)
+        except BaseException:
+            cache.release(idempotency_key)
+            raise
+        cache.finish(idempotency_key, result)
+        return result
+
+    def _balance(self, account_id: str) -> int:
+        acct = self.manager.get(account_id)
+        assert acct is not None  # the call just succeeded on it
+        return acct.balance_minor
+
+    def _batch(
+        self, postings: List[List[Any]], atomic: bool = False, idempotency_key: Optional[str] = None
+    ) -> List[Optional[str]]:
+        rows = [(src, dst, _amount(amount)) for src, dst, amount in postings]
+        if not all(isinstance(src, str) and isinstance(dst, str) for src, dst, _ in rows):
+            raise TypeError("posting account ids must be strings")
+        results = self.manager.apply_batch(
+            rows,
+            atomic=atomic,
+            idempotency_key=idempotency_key,
+        )
+        return [None if e is None else _error_name(e) for e in results]
+
+    def _list(self, offset: int = 0, limit: int = 100) -> List[Optional[Dict[str, Any]]]:
+        _, accounts = self.manager.page_accounts(offset, limit)
+        return [_account(a) for a in accounts]
+
+    # -- lifecycle -------------------------------------------------------------
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None
+    ) -> asyncio.Server:
+        """Start listening on ``host:port`` (or the Unix socket ``path``)."""
+        self._applier = asyncio.create_task(self._apply_loop())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path, limit=1 << 20)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=1 << 20)
+        return self._server
+
+    @property
+    def address(self) -> Any:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._applier is not None:
+            self._applier.cancel()
+            try:
+                await self._applier
+            except asyncio.CancelledError:
+                pass
+        self.manager.close()
+
+    # -- connection handling ---------------------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queue = self._queue
+        pending = asyncio.Semaphore(self.max_pending)
+        try:
+            while True:
+                # released by the applier once the response is written
+                await pending.acquire()
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as e:
+                    # queued like a request so responses stay in order
+                    request = e
+                queue.append((request, writer, pending))
+                self._wakeup.set()
+                # backpressure: stop reading while this client's responses are unsent
+                await writer.drain()
+        except (ConnectionError, ValueError):  # ValueError: line over the reader limit
+            pass
+        finally:
+            writer.close()
+
+    def _execute(self, request: Union[Dict[str, Any], ValueError]) -> Dict[str, Any]:
+        if isinstance(request, ValueError):
+            return _error(None, "ProtocolError", str(request))
+        request_id = request.get("id")
+        try:
+            name = request.get("op", "")
+            op = self._ops.get(name) if isinstance(name, str) else None
+            if op is None:
+                return _error(request_id, "ProtocolError", f"Unknown op {name!r}")
+            result = op(**_check_args(request.get("args", {})))
+        except (exc.BankingError, TypeError, ValueError) as e:
+            return _error(request_id, _error_name(e), str(e))
+        except Exception as e:  # one bad request must not stop the applier for every client
+            return _error(request_id, "InternalError", str(e))
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _apply_loop(self) -> None:
+        queue = self._queue
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while queue:
+                n = min(len(queue), self.max_batch)
+                batch = [queue.popleft() for _ in range(n)]
+                responses = [
+                    (writer, pending, self._execute(request)) for request, writer, pending in batch
+                ]
+                # group commit: one journal sync covers the whole micro-batch
+                try:
+                    self.manager.sync()
+                except Exception as e:  # nothing in the batch is known durable; keep serving
+                    responses = [
+                        (writer, pending, _error(response["id"], _error_name(e), str(e)))
+                        for writer, pending, response in responses
+                    ]
+                for writer, pending, response in responses:
+                    pending.release()
+                    if not writer.is_closing():
+                        writer.write(_encode(response))
+                # let connection handlers read more before the next batch
+                await asyncio.sleep(0)
+
+
+async def serve(
+    manager: AccountManager, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None
+) -> None:
+    server = BankServer(manager)
+    listener = await server.start(host, port, path)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the bank over line-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--data-dir", help="journal accounts to this directory")
+    args = parser.parse_args(argv)
+    cache = IdempotencyCache()
+    manager = (
+        AccountManager.open(args.data_dir, idempotency=cache)
+        if args.data_dir
+        else AccountManager(idempotency=cache)
+    )
+    try:
+        asyncio.run(serve(manager, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""Multi-process :class:`~bank.manager.AccountManager` partitioned by account id.
+
+:class:`ShardedAccountManager` starts ``shards`` worker processes, each owning
+a plain in-memory ``AccountManager``. Account ids are routed with a stable hash
+(CRC-32, so routing does not depend on ``PYTHONHASHSEED``). The coordinator
+talks to every worker over a pipe, one pickled *batch* of commands per
+message, and sends to all workers before waiting on any, so shards execute
+their part of a batch in parallel.
+
+Commands touching a single shard (including transfers whose accounts share a
+shard) are forwarded as-is and applied in batch order. A transfer between
+shards uses two-phase commit:
+
+1. *prepare* — the source shard reserves the amount (debits it into a hold)
+   in batch order; the destination shard checks the account exists after its
+   other commands for the batch.
+2. *commit* — if both sides prepared, the destination is credited and the
+   hold dropped; otherwise the hold is refunded (*abort*).
+
+Money is therefore only ever moved by a matched debit/credit pair, and
+:meth:`total_balance_minor` (which counts open holds) is constant across
+transfers. Credits from cross-shard transfers become visible at the end of the
+batch that carries them.
+
+An atomic batch (``apply_batch(..., atomic=True)``) sends *every* posting
+through both phases, same-shard ones included, and commits only if all of them
+prepared; otherwise every hold is refunded. Its credits are therefore visible
+only once the whole batch commits, so a posting cannot spend money an earlier
+posting in the same atomic batch moves into its source account.
+
+The coordinator is synchronous: every public call returns after both phases,
+so no hold outlives a call. Shards are in-memory only.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bank.account import BankAccount, Number
+from bank.exceptions import BatchError, NegativeAmountError
+from bank.manager import AccountManager
+from bank.money import as_minor, to_minor
+from bank.storage import MemoryStorage
+
+Command = Tuple[Any, ...]  # (op, *args), e.g. ("transfer", "A1", "B7", 12.5)
+
+_SINGLE_SHARD_OPS = frozenset({"create", "get", "deposit", "withdraw", "delete"})
+
+
+def shard_of(account_id: str, shards: int) -> int:
+    """Shard index for ``account_id`` (stable across processes and runs)."""
+    return zlib.crc32(account_id.encode()) % shards
+
+
+# -- worker side -----------------------------------------------------------------
+def _row(acct: Optional[BankAccount]) -> Optional[Tuple[str, str, int]]:
+    return None if acct is None else (acct.name, getattr(acct, "owner", ""), acct.balance_minor)
+
+
+def _worker(conn: Any) -> None:
+    accounts = MemoryStorage()  # the id -> account dict
+    mgr = AccountManager(storage=accounts)
+    holds: Dict[int, Tuple[BankAccount, int]] = {}  # txid -> debited source account, amount
+    pending: Dict[int, Tuple[str, int]] = {}  # txid -> destination id, amount to credit
+
+    def transfer_minor(src_id: str, dst_id: str, minor: int) -> None:
+        src = mgr._require(src_id, "Source account")
+        src.transfer_minor(mgr._require(dst_id, "Destination account"), minor)
+
+    def reserve(txid: int, src_id: str, minor: int) -> None:
+        if minor <= 0:
+            raise NegativeAmountError("Transfer amount must be positive.")
+        acct = mgr._require(src_id, "Source account")
+        acct.withdraw_minor(minor)
+        holds[txid] = (acct, minor)
+
+    def prepare(txid: int, dst_id: str, minor: int) -> None:
+        mgr._require(dst_id, "Destination account")
+        pending[txid] = (dst_id, minor)
+
+    def commit(txid: int) -> None:
+        holds.pop(txid, None)
+        if txid in pending:
+            dst_id, minor = pending.pop(txid)
+            accounts[dst_id].deposit_minor(minor)
+
+    def abort(txid: int) -> None:
+        pending.pop(txid, None)
+        if txid in holds:
+            acct, minor = holds.pop(txid)
+            acct.deposit_minor(minor)
+
+    ops: Dict[str, Callable[..., Any]] = {
+        "create": lambda *args: _row(mgr.create(*args)),
+        "get": lambda account_id: _row(mgr.get(account_id)),
+        "deposit": mgr.deposit,
+        "withdraw": mgr.withdraw,
+        "delete": mgr.delete,
+        "transfer_minor": transfer_minor,
+        "reserve": reserve,
+        "prepare": prepare,
+        "commit": commit,
+        "abort": abort,
+        "rows": lambda: [_row(a) for a in accounts.values()],
+        "total": lambda: sum(a.balance_minor for a in accounts.values())
+        + sum(minor for _, minor in holds.values()),
+    }
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        results: List[Any] = []
+        for op, *args in batch:
+            try:
+                results.append(ops[op](*args))
+            except Exception as e:  # returned, re-raised or reported by the coordinator
+                results.append(e)
+        conn.send(results)
+    conn.close()
+
+
+# -- coordinator -------------------------------------------------------------------
+class ShardedAccountManager:
+    """Account book partitioned over ``shards`` worker processes.
+
+    Offers the :class:`~bank.manager.AccountManager` operations plus
+    :meth:`execute` for mixed command batches. Accounts returned by
+    :meth:`get` / :meth:`list_accounts` are snapshots; mutate through the
+    manager.
+
+    Args:
+        shards: number of worker processes (one per core is a good start).
+        start_method: ``multiprocessing`` start method, default for the platform.
+    """
+
+    def __init__(self, shards: int = 4, start_method: Optional[str] = None) -> None:
+        if shards <= 0:
+            raise ValueError("shards must be positive.")
+        ctx: Any = multiprocessing.get_context(start_method)  # typeshed's BaseContext has no Process
+        self.shards = shards
+        self._conns = []
+        self._procs = []
+        for _ in range(shards):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(child,), daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._lock = threading.Lock()
+        self._next_txid = 0
+        self._route: Dict[str, int] = {}  # memoised shard_of
+
+    # -- transport ---------------------------------------------------------------
+    def _scatter(self, per_shard: Sequence[List[Command]]) -> List[List[Any]]:
+        """Send each shard its commands, then collect every shard's results."""
+        busy = [i for i, commands in enumerate(per_shard) if commands]
+        for i in busy:
+            self._conns[i].send(per_shard[i])
+        results: List[List[Any]] = [[] for _ in per_shard]
+        for i in busy:
+            results[i] = self._conns[i].recv()
+        return results
+
+    def execute(self, commands: Iterable[Command]) -> List[Any]:
+        """Apply a batch of ``(op, *args)`` commands; return one result per command.
+
+        Ops are ``create``, ``get``, ``deposit``, ``withdraw``, ``transfer`` and
+        ``delete`` with the same arguments as the manager methods, plus
+        ``transfer_minor`` taking an integer amount in minor units. A failed
+        command's result is its exception; the rest of the batch still runs.
+        """
+        n = self.shards
+        route = self._route
+        phase1: List[List[Command]] = [[] for _ in range(n)]
+        prepares: List[List[Command]] = [[] for _ in range(n)]
+        # per command: the shard whose reply stream holds its result, or a local error
+        where: List[Any] = []
+        cross: List[Tuple[int, int, int, int]] = []  # command index, txid, src shard, dst shard
+        with self._lock:
+            for command in commands:
+                op = command[0]
+                if op == "transfer" or op == "transfer_minor":
+                    _, src_id, dst_id, amount = command
+                    try:
+                        minor = _transfer_minor(amount, op == "transfer_minor")
+                    except (TypeError, ValueError) as e:
+                        where.append(e)
+                        continue
+                    src = route.get(src_id)
+                    if src is None:
+                        src = route[src_id] = shard_of(src_id, n)
+                    dst = route.get(dst_id)
+                    if dst is None:
+                        dst = route[dst_id] = shard_of(dst_id, n)
+                    where.append(src)
+                    if src == dst:
+                        phase1[src].append(("transfer_minor", src_id, dst_id, minor))
+                    else:
+                        txid = self._next_txid
+                        self._next_txid += 1
+                        cross.append((len(where) - 1, txid, src, dst))
+                        phase1[src].append(("reserve", txid, src_id, minor))
+                        prepares[dst].append(("prepare", txid, dst_id, minor))
+                elif op in _SINGLE_SHARD_OPS:
+                    account_id = command[1]
+                    shard = route.get(account_id)
+                    if shard is None:
+                        shard = route[account_id] = shard_of(account_id, n)
+                    where.append(shard)
+                    phase1[shard].append(command)
+                else:
+                    where.append(ValueError(f"Unknown command {op!r}"))
+            # destination checks go last so nothing on that shard runs between prepare and commit
+            offsets = [len(shard_commands) for shard_commands in phase1]
+            for shard in range(n):
+                phase1[shard].extend(prepares[shard])
+            replies = self._scatter(phase1)
+
+            # each shard answers in the order it was sent, so replies are consumed in sequence
+            streams = [iter(reply) for reply in replies]
+            results = [w if isinstance(w, Exception) else next(streams[w]) for w in where]
+            if cross:
+                tails = [iter(reply[offsets[shard] :]) for shard, reply in enumerate(replies)]
+                phase2: List[List[Command]] = [[] for _ in range(n)]
+                for index, txid, src, dst in cross:
+                    prepared = next(tails[dst])
+                    error = results[index] if results[index] is not None else prepared
+                    decision = "abort" if error is not None else "commit"
+                    phase2[src].append((decision, txid))
+                    phase2[dst].append((decision, txid))
+                    results[index] = error
+                self._scatter(phase2)
+        return results
+
+    def _call(self, command: Command) -> Any:
+        result = self.execute([command])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    # -- AccountManager API ------------------------------------------------------
+    def create(self, account_id: str, owner: str = "", initial: Number = 0.0) -> BankAccount:
+        return _account(self._call(("create", account_id, owner, initial)))
+
+    def get(self, account_id: str) -> Optional[BankAccount]:
+        row = self._call(("get", account_id))
+        return None if row is None else _account(row)
+
+    def deposit(self, account_id: str, amount: Number) -> float:
+        return self._call(("deposit", account_id, amount))
+
+    def withdraw(self, account_id: str, amount: Number) -> float:
+        return self._call(("withdraw", account_id, amount))
+
+    def delete(self, account_id: str) -> None:
+        self._call(("delete", account_id))
+
+    def transfer(self, src_id: str, dst_id: str, amount: Number) -> None:
+        self._call(("transfer", src_id, dst_id, amount))
+
+    def apply_batch(
+        self,
+        postings: Iterable[Tuple[str, str, Any]],
+        atomic: bool = False,
+        minor_units: bool = False,
+    ) -> List[Optional[Exception]]:
+        """Apply ``(src_id, dst_id, amount)`` transfers; see :meth:`execute` for ordering.
+
+        With ``atomic=True`` the batch is all-or-nothing across shards (see the
+        module docstring): the first rejected posting aborts every hold and
+        raises :class:`~bank.exceptions.BatchError`.
+        """
+        if atomic:
+            return [None] * self._apply_atomic(postings, minor_units)
+        op = "transfer_minor" if minor_units else "transfer"
+        return self.execute((op, src_id, dst_id, amount) for src_id, dst_id, amount in postings)
+
+    def _apply_atomic(self, postings: Iterable[Tuple[str, str, Any]], minor_units: bool) -> int:
+        """Reserve/prepare every posting, then commit all or abort all; return the posting count."""
+        rows = []
+        for i, (src_id, dst_id, amount) in enumerate(postings):
+            try:
+                rows.append((src_id, dst_id, _transfer_minor(amount, minor_units)))
+            except (TypeError, ValueError) as e:
+                raise BatchError(i, e) from e
+        n = self.shards
+        route = self._route
+        phase1: List[List[Command]] = [[] for _ in range(n)]
+        prepares: List[List[Command]] = [[] for _ in range(n)]
+        plan: List[Tuple[int, int, int]] = []  # txid, src shard, dst shard
+        with self._lock:
+            for src_id, dst_id, minor in rows:
+                src = route.get(src_id)
+                if src is None:
+                    src = route[src_id] = shard_of(src_id, n)
+                dst = route.get(dst_id)
+                if dst is None:
+                    dst = route[dst_id] = shard_of(dst_id, n)
+                txid = self._next_txid
+                self._next_txid += 1
+                plan.append((txid, src, dst))
+                phase1[src].append(("reserve", txid, src_id, minor))
+                prepares[dst].append(("prepare", txid, dst_id, minor))
+            for shard in range(n):
+                phase1[shard].extend(prepares[shard])
+            streams = [iter(reply) for reply in self._scatter(phase1)]
+            # every shard answers its reserves (in batch order) before its prepares
+            reserved = [next(streams[src]) for _, src, _ in plan]
+            prepared = [next(streams[dst]) for _, _, dst in plan]
+            failed = next(
+                (
+                    (i, held if held is not None else ready)
+                    for i, (held, ready) in enumerate(zip(reserved, prepared, strict=True))
+                    if held is not None or ready is not None
+                ),
+                None,
+            )
+            decision = "abort" if failed is not None else "commit"
+            phase2: List[List[Command]] = [[] for _ in range(n)]
+            for txid, src, dst in plan:
+                phase2[src].append((decision, txid))
+                if dst != src:
+                    phase2[dst].append((decision, txid))
+            self._scatter(phase2)
+        if failed is not None:
+            index, error = failed
+            raise BatchError(index, error) from error
+        return len(rows)
+
+    def list_accounts(self) -> List[BankAccount]:
+        with self._lock:
+            replies = self._scatter([[("rows",)] for _ in range(self.shards)])
+        return [_account(row) for reply in replies for row in reply[0]]
+
+    def total_balance_minor(self) -> int:
+        """Sum of all balances across shards, including open cross-shard holds."""
+        with self._lock:
+            return sum(reply[0] for reply in self._scatter([[("total",)] for _ in range(self.shards)]))
+
+    def close(self) -> None:
+        for conn, proc in zip(self._conns, self._procs):
+            if proc.is_alive():
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():  # pragma: no cover - worker stuck
+                proc.terminate()
+        self._procs = []
+        self._conns = []
+
+    def __enter__(self) -> "ShardedAccountManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _transfer_minor(amount: Any, minor_units: bool) -> int:
+    if not minor_units:
+        return to_minor(amount, "Transfer amount")
+    return as_minor(amount, "Transfer amount")
+
+
+def _account(row: Tuple[str, str, int]) -> BankAccount:
+    name, owner, balance_minor = row
+    acct = BankAccount.from_minor(name, balance_minor)
+    if owner:
+        setattr(acct, "owner", owner)
+    return acct
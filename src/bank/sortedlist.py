@@ -0,0 +1,131 @@
+"""Bucketed sorted list used by the manager's secondary indexes.
+
+Values are kept in a list of sorted buckets of at most ``2 * load`` items plus a
+list of bucket maxima. Finding a value is two binary searches; inserting or
+removing one shifts at most one bucket, so updates stay cheap at millions of
+entries where a single flat list would memmove the whole array.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Any, Generic, Iterable, Iterator, List, Protocol, TypeVar
+
+
+class _Comparable(Protocol):
+    def __lt__(self, other: Any, /) -> bool: ...
+
+
+T = TypeVar("T", bound=_Comparable)
+
+
+class SortedList(Generic[T]):
+    """Minimal sorted multiset supporting add/remove and ordered/positional scans."""
+
+    def __init__(self, iterable: Iterable[T] = (), load: int = 512) -> None:
+        self._load = load
+        values = sorted(iterable)
+        self._lists: List[List[T]] = [values[i : i + load] for i in range(0, len(values), load)]
+        self._maxes: List[T] = [bucket[-1] for bucket in self._lists]
+        self._len = len(values)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[T]:
+        for bucket in self._lists:
+            yield from bucket
+
+    def __reversed__(self) -> Iterator[T]:
+        for bucket in reversed(self._lists):
+            yield from reversed(bucket)
+
+    def __contains__(self, value: Any) -> bool:
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return False
+        bucket = self._lists[i]
+        j = bisect_left(bucket, value)
+        return j < len(bucket) and bucket[j] == value
+
+    def add(self, value: T) -> None:
+        maxes = self._maxes
+        if not maxes:
+            self._lists.append([value])
+            maxes.append(value)
+        else:
+            i = bisect_right(maxes, value)
+            if i == len(maxes):
+                i -= 1
+                self._lists[i].append(value)
+                maxes[i] = value
+            else:
+                insort(self._lists[i], value)
+            bucket = self._lists[i]
+            if len(bucket) > 2 * self._load:
+                half = bucket[self._load :]
+                del bucket[self._load :]
+                self._lists.insert(i + 1, half)
+                maxes[i] = bucket[-1]
+                maxes.insert(i + 1, half[-1])
+        self._len += 1
+
+    def remove(self, value: T) -> None:
+        """Remove one occurrence of ``value``; raise ``ValueError`` if absent."""
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            raise ValueError(f"{value!r} not in SortedList")
+        bucket = self._lists[i]
+        j = bisect_left(bucket, value)
+        if j == len(bucket) or bucket[j] != value:
+            raise ValueError(f"{value!r} not in SortedList")
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._lists[i]
+            del self._maxes[i]
+
+    def bisect_left(self, value: Any) -> int:
+        """Position of the first item ``>= value``."""
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return self._len
+        return sum(len(b) for b in self._lists[:i]) + bisect_left(self._lists[i], value)
+
+    def bisect_right(self, value: Any) -> int:
+        """Position just past the last item ``<= value``."""
+        i = bisect_right(self._maxes, value)
+        if i == len(self._maxes):
+            return self._len
+        return sum(len(b) for b in self._lists[:i]) + bisect_right(self._lists[i], value)
+
+    def islice(self, start: int = 0, stop: int | None = None, reverse: bool = False) -> Iterator[T]:
+        """Iterate items at positions ``[start, stop)`` (from the end when ``reverse``)."""
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return iter(())
+        # skip whole buckets before ``start``
+        buckets = self._lists[::-1] if reverse else self._lists
+        skipped = 0
+        first = 0
+        for first, bucket in enumerate(buckets):
+            if skipped + len(bucket) > start:
+                break
+            skipped += len(bucket)
+        if reverse:
+            tail = (v for bucket in buckets[first:] for v in reversed(bucket))
+        else:
+            tail = (v for bucket in buckets[first:] for v in bucket)
+        return islice(tail, start - skipped, stop - skipped)
+
+    def irange_from(self, value: Any) -> Iterator[T]:
+        """Iterate items ``>= value`` in order."""
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return
+        bucket = self._lists[i]
+        yield from bucket[bisect_left(bucket, value) :]
+        for bucket in self._lists[i + 1 :]:
+            yield from bucket
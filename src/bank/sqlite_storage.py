@@ -0,0 +1,484 @@
+"""SQLite account storage, shareable between processes.
+
+:class:`SQLiteStorage` keeps the book in one ``accounts`` table
+(``id``, ``owner``, ``balance`` in minor units), so the CLI, the Streamlit
+app and any other process opening the same file see one book::
+
+    mgr = AccountManager(storage=SQLiteStorage("bank.db"))
+
+* The database runs in WAL mode: readers never block the writer and a commit
+  appends to the log instead of rewriting pages.
+* Every thread gets its own connection, opened on first use and kept for the
+  storage's lifetime. The SQL text is fixed, so each connection prepares a
+  statement once and reuses it from its statement cache.
+* ``deposit``, ``withdraw`` and ``transfer`` are each one conditional
+  ``UPDATE ... RETURNING``: the balance check and the change happen in the
+  same statement, so two processes can never both spend the same funds. A
+  transfer updates both rows in that one statement or neither.
+* :meth:`~SQLiteStorage.add_many` (``AccountManager.create_many``) inserts
+  with one ``executemany`` in one transaction. Batches and the end-of-day run
+  use :meth:`~SQLiteStorage.transaction` (``BEGIN IMMEDIATE``) and write the
+  changed balances back with one ``executemany``.
+* :meth:`~SQLiteStorage.snapshot` (``AccountManager.snapshot``) opens its own
+  connection and holds a read transaction on it: WAL keeps serving that
+  reader the book as of its first read while writers carry on committing.
+* :meth:`~SQLiteStorage.page` (``AccountManager.page_accounts`` without an
+  aggregate index) counts and fetches one page with ``ORDER BY ... LIMIT ...
+  OFFSET``, bounding an id prefix as a primary-key range.
+* Hot accounts are served from a bounded read-through cache. Before a read
+  the connection's ``PRAGMA data_version`` is checked, and the cache is
+  dropped when any other connection has committed since. Reads are therefore
+  never stale, and the cache pays off most when one connection does most of
+  the writing. The check runs once per :meth:`~SQLiteStorage.reading` block
+  (both lookups of a transfer, a page of accounts) and not at all inside a
+  transaction, whose write lock already keeps other writers out. A
+  transaction works on its own copies of the accounts, which replace the
+  cached ones only once it commits, so no thread reads uncommitted balances.
+* Inside a transaction, :meth:`~SQLiteStorage.accounts` scans the table in
+  primary-key pages and :meth:`~SQLiteStorage.flush` writes the changes so
+  far, so the end-of-day run over the whole book holds one chunk of accounts
+  at a time and still commits (or rolls back) as a whole.
+
+The manager's journal, ledger, aggregates and velocity limits only see the
+operations made through their own manager. Other processes' changes are
+visible in balances but not there.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bank.account import BankAccount
+from bank.exceptions import (
+    AccountNotFoundError,
+    DuplicateAccountError,
+    InsufficientFundsError,
+    NegativeAmountError,
+    StorageError,
+)
+from bank.mvcc import BookSnapshot
+from bank.storage import Row, Storage, prefix_end
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    balance INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+
+_SELECT = "SELECT owner, balance FROM accounts WHERE id = ?"
+_SELECT_ALL = "SELECT id, owner, balance FROM accounts"
+_SCAN_FIRST = "SELECT id, owner, balance FROM accounts ORDER BY id LIMIT ?"
+_SCAN_NEXT = "SELECT id, owner, balance FROM accounts WHERE id > ? ORDER BY id LIMIT ?"
+_SCAN_ROWS = 10_000  # rows per primary-key page when scanning inside a transaction
+_INSERT = "INSERT INTO accounts (id, owner, balance) VALUES (?, ?, ?)"
+_DELETE = "DELETE FROM accounts WHERE id = ?"
+_DEPOSIT = "UPDATE accounts SET balance = balance + ?1 WHERE id = ?2 RETURNING balance"
+_WITHDRAW = "UPDATE accounts SET balance = balance - ?1 WHERE id = ?2 AND balance >= ?1 RETURNING balance"
+# both rows or neither: the subqueries are uncorrelated, so SQLite evaluates them once, up front
+_TRANSFER = """
+UPDATE accounts SET balance = balance + CASE WHEN :src = :dst THEN 0 WHEN id = :src THEN -:amount ELSE :amount END
+WHERE id IN (:src, :dst)
+  AND (SELECT count(*) FROM accounts WHERE id IN (:src, :dst)) = (CASE WHEN :src = :dst THEN 1 ELSE 2 END)
+  AND (SELECT balance FROM accounts WHERE id = :src) >= :amount
+RETURNING id, balance
+"""
+_SET_BALANCE = "UPDATE accounts SET balance = ? WHERE id = ?"
+# (prefix bound, sort) -> query text; a handful of fixed variants, so the statement cache still hits
+_PAGE_WHERE = {0: "", 1: " WHERE id >= ?", 2: " WHERE id >= ? AND id < ?"}
+_PAGE_ORDER = {
+    ("id", False): "id",
+    ("id", True): "id DESC",
+    ("balance", False): "balance, id",
+    ("balance", True): "balance DESC, id DESC",
+}
+
+
+def _account(account_id: str, owner: str, balance: int) -> BankAccount:
+    acct = BankAccount.from_minor(account_id, balance)
+    if owner:
+        setattr(acct, "owner", owner)
+    return acct
+
+
+class SQLiteStorage(Storage):
+    """Accounts in the SQLite database at ``path``.
+
+    ``cache_size`` bounds the read-through account cache; ``synchronous`` is
+    the SQLite ``synchronous`` pragma (``"NORMAL"`` is durable across
+    process crashes in WAL mode; ``"FULL"`` also survives power loss).
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        cache_size: int = 10_000,
+        synchronous: str = "NORMAL",
+        timeout: float = 5.0,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.cache_size = cache_size
+        self._synchronous = synchronous
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()  # guards the connection list and cache eviction
+        self._cache: Dict[str, BankAccount] = {}
+        self._closed = False
+        self._versions = itertools.count()
+        self._conn().execute(SCHEMA)
+
+    # -- connections and cache ---------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._closed:
+                raise StorageError(f"SQLite storage {self.path!r} is closed.")
+            try:
+                conn = self._connect()
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(f"PRAGMA synchronous={self._synchronous}")
+            except sqlite3.Error as e:
+                raise StorageError(f"Cannot open SQLite database {self.path!r}: {e}") from e
+            self._local.conn = conn
+            self._local.version = None
+            self._local.touched = None
+            self._local.reading = False
+            self._local.flushed = False
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.path,
+            timeout=self._timeout,
+            isolation_level=None,  # autocommit; transactions are explicit
+            check_same_thread=False,  # for close() and snapshots read from another thread
+            cached_statements=64,
+        )
+
+    def _fresh(self, conn: sqlite3.Connection) -> None:
+        """Drop the cache if another connection has committed since this one last looked."""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.version:
+            if self._local.version is not None:
+                with self._lock:
+                    self._cache.clear()
+            self._local.version = version
+
+    def _remember(self, acct: BankAccount) -> None:
+        cache = self._cache
+        with self._lock:
+            if len(cache) >= self.cache_size:
+                del cache[next(iter(cache))]  # oldest first
+            cache[acct.name] = acct
+
+    def _forget(self, account_id: str) -> None:
+        with self._lock:
+            self._cache.pop(account_id, None)
+
+    # -- Storage API -------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT count(*) FROM accounts").fetchone()[0]
+
+    def __contains__(self, account_id: object) -> bool:
+        return self.get(account_id) is not None  # type: ignore[arg-type]
+
+    def get(self, account_id: str) -> Optional[BankAccount]:
+        conn = self._conn()
+        touched = self._local.touched
+        if touched is not None:
+            return self._load(conn, account_id, touched)
+        if not self._local.reading:
+            self._fresh(conn)
+        acct = self._cache.get(account_id)
+        if acct is None:
+            row = conn.execute(_SELECT, (account_id,)).fetchone()
+            if row is None:
+                return None
+            acct = _account(account_id, *row)
+            self._remember(acct)
+        return acct
+
+    def _load(
+        self, conn: sqlite3.Connection, account_id: str, touched: Dict[str, Tuple[BankAccount, int]]
+    ) -> Optional[BankAccount]:
+        """Read ``account_id`` inside a transaction and track it for write-back."""
+        seen = touched.get(account_id)
+        if seen is not None:
+            return seen[0]
+        row = conn.execute(_SELECT, (account_id,)).fetchone()
+        if row is None:
+            return None
+        acct = _account(account_id, *row)  # not the cached object: other threads read that one
+        touched[account_id] = (acct, acct.balance_minor)
+        return acct
+
+    def accounts(self) -> Iterator[BankAccount]:
+        conn = self._conn()
+        local = self._local
+        if local.touched is not None:
+            yield from self._scan(conn)
+            return
+        self._fresh(conn)
+        cached = self._cache.get
+        for account_id, owner, balance in conn.execute(_SELECT_ALL):
+            acct = cached(account_id) or _account(account_id, owner, balance)
+            acct.balance_minor = balance
+            yield acct
+
+    def _scan(self, conn: sqlite3.Connection) -> Iterator[BankAccount]:
+        """Every account, read inside a transaction in primary-key pages and tracked for write-back.
+
+        No cursor stays open between pages, so the caller may :meth:`flush`
+        (write to the table) while iterating.
+        """
+        local = self._local
+        rows = conn.execute(_SCAN_FIRST, (_SCAN_ROWS,)).fetchall()
+        while rows:
+            for account_id, owner, balance in rows:
+                touched = local.touched  # flush() may have started a fresh one
+                seen = touched.get(account_id)
+                if seen is not None:
+                    yield seen[0]
+                    continue
+                acct = _account(account_id, owner, balance)
+                touched[account_id] = (acct, balance)
+                yield acct
+            rows = conn.execute(_SCAN_NEXT, (rows[-1][0], _SCAN_ROWS)).fetchall()
+
+    def page(
+        self, offset: int, limit: int, prefix: str, sort: str, descending: bool
+    ) -> Tuple[int, List[BankAccount]]:
+        conn = self._conn()
+        params: Tuple[str, ...] = ()
+        if prefix:
+            end = prefix_end(prefix)
+            params = (prefix,) if end is None else (prefix, end)
+        where = _PAGE_WHERE[len(params)]
+        order = _PAGE_ORDER[sort, descending]
+        touched = self._local.touched
+        if touched is None:
+            self._fresh(conn)
+            conn.execute("BEGIN")  # the count and the page read one version of the book
+        try:
+            total = conn.execute(f"SELECT count(*) FROM accounts{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT id, owner, balance FROM accounts{where} ORDER BY {order} LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        finally:
+            if touched is None:
+                conn.execute("COMMIT")
+        if touched is not None:  # uncommitted values: keep them out of the shared cache
+            return total, [
+                touched[row[0]][0] if row[0] in touched else _account(*row) for row in rows
+            ]
+        cached = self._cache.get
+        page = []
+        for account_id, owner, balance in rows:
+            acct = cached(account_id) or _account(account_id, owner, balance)
+            acct.balance_minor = balance
+            page.append(acct)
+        return total, page
+
+    def add(self, account_id: str, owner: str, balance_minor: int) -> BankAccount:
+        try:
+            self._conn().execute(_INSERT, (account_id, owner, balance_minor))
+        except sqlite3.IntegrityError:
+            raise DuplicateAccountError(f"Account id '{account_id}' already exists.") from None
+        acct = _account(account_id, owner, balance_minor)
+        if self._local.touched is None:  # else not committed yet
+            self._remember(acct)
+        return acct
+
+    def add_many(self, rows: List[Row]) -> List[BankAccount]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT, rows)
+        except sqlite3.IntegrityError:
+            conn.execute("ROLLBACK")
+            seen = set()
+            for account_id, _, _ in rows:  # name the first offender
+                if account_id in seen or conn.execute(_SELECT, (account_id,)).fetchone() is not None:
+                    raise DuplicateAccountError(f"Account id '{account_id}' already exists.") from None
+                seen.add(account_id)
+            raise
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return [_account(*row) for row in rows]
+
+    def remove(self, account_id: str) -> bool:
+        self._forget(account_id)
+        return self._conn().execute(_DELETE, (account_id,)).rowcount > 0
+
+    def deposit(self, acct: BankAccount, minor: int) -> int:
+        if minor <= 0:
+            raise NegativeAmountError("Deposit amount must be positive.")
+        row = self._conn().execute(_DEPOSIT, (minor, acct.name)).fetchone()
+        if row is None:
+            self._forget(acct.name)
+            raise AccountNotFoundError(f"Account '{acct.name}' not found.")
+        acct.balance_minor = row[0]
+        return row[0]
+
+    def withdraw(self, acct: BankAccount, minor: int) -> int:
+        if minor <= 0:
+            raise NegativeAmountError("Withdrawal amount must be positive.")
+        conn = self._conn()
+        row = conn.execute(_WITHDRAW, (minor, acct.name)).fetchone()
+        if row is None:
+            self._missing_or_short(conn, acct, "Account")
+        acct.balance_minor = row[0]
+        return row[0]
+
+    def transfer(self, src: BankAccount, dst: BankAccount, minor: int) -> None:
+        if minor <= 0:
+            raise NegativeAmountError("Transfer amount must be positive.")
+        conn = self._conn()
+        rows = conn.execute(_TRANSFER, {"src": src.name, "dst": dst.name, "amount": minor}).fetchall()
+        if not rows:
+            if conn.execute(_SELECT, (dst.name,)).fetchone() is None:
+                self._forget(dst.name)
+                raise AccountNotFoundError(f"Destination account '{dst.name}' not found.")
+            self._missing_or_short(conn, src, "Source account")
+        for account_id, balance in rows:
+            (src if account_id == src.name else dst).balance_minor = balance
+
+    def _missing_or_short(self, conn: sqlite3.Connection, acct: BankAccount, role: str) -> None:
+        """Raise the right error for a conditional update that matched no row."""
+        row = conn.execute(_SELECT, (acct.name,)).fetchone()
+        if row is None:
+            self._forget(acct.name)
+            raise AccountNotFoundError(f"{role} '{acct.name}' not found.")
+        acct.balance_minor = row[1]  # another process moved it
+        raise InsufficientFundsError("Insufficient funds.")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        local = self._local
+        conn = self._conn()
+        if local.touched is not None:  # nested: the outer block commits
+            yield
+            return
+        conn.execute("BEGIN IMMEDIATE")  # take the write lock first: reads below stay current
+        local.touched = {}
+        local.flushed = False
+        try:
+            yield
+            self._write_back(conn, local.touched)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")  # the cache never saw this transaction's objects
+            raise
+        else:
+            self._publish(local.touched, local.flushed)
+        finally:
+            local.touched = None
+
+    def _publish(self, touched: Dict[str, Tuple[BankAccount, int]], flushed: bool) -> None:
+        """After a commit, let the cache serve the transaction's accounts."""
+        with self._lock:
+            cache = self._cache
+            if flushed:  # flushed accounts are no longer tracked: their cached copies are stale
+                cache.clear()
+                return
+            for account_id, (acct, _) in touched.items():
+                if account_id in cache:
+                    cache[account_id] = acct
+
+    @staticmethod
+    def _write_back(conn: sqlite3.Connection, touched: Dict[str, Tuple[BankAccount, int]]) -> None:
+        conn.executemany(
+            _SET_BALANCE,
+            ((acct.balance_minor, account_id) for account_id, (acct, loaded) in touched.items()
+             if acct.balance_minor != loaded),
+        )
+
+    def flush(self) -> None:
+        local = self._local
+        touched = local.touched
+        if not touched:
+            return
+        self._write_back(self._conn(), touched)
+        local.touched = {}
+        local.flushed = True
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        local = self._local
+        conn = self._conn()
+        if local.touched is not None or local.reading:  # already current
+            yield
+            return
+        self._fresh(conn)
+        local.reading = True
+        try:
+            yield
+        finally:
+            local.reading = False
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        if self._closed:
+            raise StorageError(f"SQLite storage {self.path!r} is closed.")
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            conn.execute("SELECT 1 FROM accounts LIMIT 1").fetchall()  # the read transaction starts here
+        except sqlite3.Error as e:
+            raise StorageError(f"Cannot open SQLite database {self.path!r}: {e}") from e
+        return SQLiteSnapshot(conn, next(self._versions))
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._local = threading.local()  # threads must not reuse their closed connection
+            connections, self._connections = self._connections, []
+            self._cache.clear()
+        for conn in connections:
+            conn.close()
+
+
+class SQLiteSnapshot(BookSnapshot):
+    """The book as of one WAL read transaction, held open on a dedicated connection.
+
+    Closing it (or garbage collection) ends the transaction, which lets SQLite
+    checkpoint the log past it again.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, version: int) -> None:
+        self.version = version
+        self._conn = conn
+        self._release = weakref.finalize(self, conn.close)
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        if not self._release.alive:
+            raise ValueError("Snapshot is closed.")
+        return self._conn.execute(sql, params)
+
+    def get(self, account_id: str) -> Optional[int]:
+        row = self._execute(_SELECT, (account_id,)).fetchone()
+        return None if row is None else row[1]
+
+    def rows(self) -> Iterator[Row]:
+        return iter(self._execute(_SELECT_ALL))
+
+    def __len__(self) -> int:
+        return self._execute("SELECT count(*) FROM accounts").fetchone()[0]
+
+    def total_minor(self) -> int:
+        return self._execute("SELECT coalesce(sum(balance), 0) FROM accounts").fetchone()[0]
+
+    def close(self) -> None:
+        self._release()
@@ -0,0 +1,191 @@
+"""Pluggable account storage for :class:`~bank.manager.AccountManager`.
+
+The manager keeps its accounts in a :class:`Storage`. :class:`MemoryStorage`
+(the default) is the original in-process dict of
+:class:`~bank.account.BankAccount` objects;
+:class:`~bank.sqlite_storage.SQLiteStorage` keeps them in a SQLite database
+that several processes (the CLI, the Streamlit app) can share.
+
+Accounts handed out by a storage are ``BankAccount`` objects. The manager
+validates an operation against them, then asks the storage to apply it:
+:meth:`Storage.deposit`, :meth:`Storage.withdraw` and :meth:`Storage.transfer`
+for single operations, and :meth:`Storage.transaction` around bulk work
+(batches, the end-of-day run) that changes ``balance_minor`` directly.
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+from bank.account import BankAccount
+from bank.exceptions import DuplicateAccountError
+
+if TYPE_CHECKING:
+    from bank.mvcc import BookSnapshot
+
+Row = Tuple[str, str, int]  # (account_id, owner, balance_minor)
+
+_NO_TRANSACTION = nullcontext()
+
+
+def prefix_end(prefix: str) -> Optional[str]:
+    """The smallest id above every id that starts with ``prefix`` (``None`` if there is none).
+
+    Ids starting with ``prefix`` are exactly those in ``[prefix, prefix_end(prefix))``.
+    """
+    stem = prefix.rstrip("\U0010ffff")
+    if not stem:
+        return None
+    code = ord(stem[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:  # surrogates are not valid UTF-8; skip to the next character
+        code = 0xE000
+    return stem[:-1] + chr(code)
+
+
+class Storage:
+    """Interface between :class:`~bank.manager.AccountManager` and where its accounts live.
+
+    Amounts are integer minor units. Methods that take an account take the
+    object returned by :meth:`get`; implementations update its
+    ``balance_minor`` to the stored value.
+    """
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, account_id: object) -> bool:
+        raise NotImplementedError
+
+    def get(self, account_id: str) -> Optional[BankAccount]:
+        raise NotImplementedError
+
+    def accounts(self) -> Iterable[BankAccount]:
+        """Every account, in no particular order."""
+        raise NotImplementedError
+
+    def page(
+        self, offset: int, limit: int, prefix: str, sort: str, descending: bool
+    ) -> Tuple[int, List[BankAccount]]:
+        """``(matches, accounts)`` for one page of accounts whose id starts with ``prefix``.
+
+        ``sort`` is ``"id"`` or ``"balance"``. This default filters and sorts
+        every account; a store that can page by itself overrides it.
+        """
+        # from a copy, so a concurrent insert cannot resize the dict mid-walk
+        rows = [a for a in list(self.accounts()) if a.name.startswith(prefix)]
+        if sort == "id":
+            rows.sort(key=lambda a: a.name, reverse=descending)
+        else:
+            rows.sort(key=lambda a: a.balance_minor, reverse=descending)
+        return len(rows), rows[offset : offset + limit]
+
+    def add(self, account_id: str, owner: str, balance_minor: int) -> BankAccount:
+        """Store a new account.
+
+        Raises:
+            DuplicateAccountError: if ``account_id`` already exists.
+        """
+        raise NotImplementedError
+
+    def add_many(self, rows: List[Row]) -> List[BankAccount]:
+        """Store many new accounts, all or none.
+
+        Raises:
+            DuplicateAccountError: if any id already exists or repeats in ``rows``.
+        """
+        raise NotImplementedError
+
+    def remove(self, account_id: str) -> bool:
+        """Delete ``account_id``; return whether it existed."""
+        raise NotImplementedError
+
+    def deposit(self, acct: BankAccount, minor: int) -> int:
+        """Credit ``acct`` and return its new balance."""
+        raise NotImplementedError
+
+    def withdraw(self, acct: BankAccount, minor: int) -> int:
+        """Debit ``acct`` and return its new balance.
+
+        Raises:
+            InsufficientFundsError: if the stored balance is below ``minor``.
+        """
+        raise NotImplementedError
+
+    def transfer(self, src: BankAccount, dst: BankAccount, minor: int) -> None:
+        """Move ``minor`` from ``src`` to ``dst``; both change or neither does."""
+        raise NotImplementedError
+
+    def transaction(self) -> ContextManager[None]:
+        """Group bulk changes made directly on ``balance_minor``.
+
+        Inside the block, :meth:`get` and :meth:`accounts` return current
+        values and changes made to those objects are stored when the block
+        exits normally. If it raises, nothing is stored; callers restore any
+        balances they changed themselves.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Inside :meth:`transaction`, store the changes made so far and stop tracking those accounts.
+
+        The block stays one transaction. Long runs call this between chunks so
+        the store does not hold every account it has handed out.
+        """
+
+    def reading(self) -> ContextManager[None]:
+        """Group several reads (e.g. both accounts of a transfer).
+
+        A store with a read cache checks once, on entry, that the cache is
+        current, instead of once per :meth:`get`.
+        """
+        return _NO_TRANSACTION
+
+    def snapshot(self) -> Optional[BookSnapshot]:
+        """A point-in-time view from the store itself, or ``None`` to let the manager keep versions."""
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStorage(Dict[str, BankAccount], Storage):
+    """Accounts in a dict of ``BankAccount`` objects, changed in place (the default).
+
+    It *is* the ``id -> account`` dict, so lookups stay plain dict lookups.
+    """
+
+    __slots__ = ()
+
+    def accounts(self) -> Iterable[BankAccount]:
+        return self.values()
+
+    def add(self, account_id: str, owner: str, balance_minor: int) -> BankAccount:
+        if account_id in self:
+            raise DuplicateAccountError(f"Account id '{account_id}' already exists.")
+        acct = BankAccount.from_minor(account_id, balance_minor)
+        # optional owner attribute for display
+        if owner:
+            setattr(acct, "owner", owner)
+        self[account_id] = acct
+        return acct
+
+    def add_many(self, rows: List[Row]) -> List[BankAccount]:
+        seen = set()
+        for account_id, _, _ in rows:
+            if account_id in self or account_id in seen:
+                raise DuplicateAccountError(f"Account id '{account_id}' already exists.")
+            seen.add(account_id)
+        return [self.add(account_id, owner, balance) for account_id, owner, balance in rows]
+
+    def remove(self, account_id: str) -> bool:
+        return self.pop(account_id, None) is not None
+
+    # the account methods themselves: no extra call on the in-memory hot path
+    deposit = staticmethod(BankAccount.deposit_minor)  # type: ignore[assignment]
+    withdraw = staticmethod(BankAccount.withdraw_minor)  # type: ignore[assignment]
+    transfer = staticmethod(BankAccount.transfer_minor)  # type: ignore[assignment]
+
+    def transaction(self) -> ContextManager[None]:
+        return _NO_TRANSACTION  # changes are already in place
@@ -3,46 +3,368 @@
 Execution modes:
     python -m src.cli
     python src/cli.py
+    python src/cli.py --data-dir ./data --batch commands.csv   # non-interactive
+    python src/cli.py --db bank.db --batch commands.csv        # shared SQLite book
+    python src/cli.py --batch commands.csv --metrics-file bank.prom --profile
+    python src/cli.py --data-dir ./data --batch - --export-mapped book.map < /dev/null
+    python src/cli.py --batch day.csv --report daily --report-out daily.parquet
+    python src/cli.py --data-dir ./data --interest 0:0.01,10000:0.02 --fee 5 --fee-waiver 1000
 
-If the package is installed (``pip install -e .``) the relative import path is
-used. Otherwise we fall back to injecting the local ``src`` path for an ad‑hoc
-run. For a cleaner environment prefer installing in editable mode.
+Batch files hold one command per line, either CSV (``op,args...``)::
+
+    create,A1,Alice,100.00
+    deposit,A1,25
+    transfer,A1,A2,10.50
+
+or JSON lines (``{"op": "transfer", "src_id": "A1", "dst_id": "A2", "amount": "10.50"}``).
+Rows are streamed, so memory stays constant regardless of file size. Failing
+rows are reported on stderr with their line number and do not stop the run.
+
+``--metrics-file`` writes operation counts and latency histograms in the
+Prometheus text format when the run ends (menu option 7 prints them in
+interactive mode). ``--profile`` prints the hottest call paths on exit. With
+either option, on POSIX, ``kill -USR1 <pid>`` starts profiling the running
+process and a second signal prints the report.
+
+``--db`` keeps the accounts in a SQLite database (:mod:`bank.sqlite_storage`)
+instead of memory or a journal; the Streamlit app opens the same file when
+``BANK_DB`` points at it, so both see one book.
+
+``--export-mapped`` writes the book on exit as a :mod:`bank.mapped` snapshot
+that reporting processes can open instantly with ``MappedBook``.
+
+``--interest`` / ``--fee`` run the end-of-day job (:mod:`bank.accrual`) over
+the whole book after the batch, or on its own without ``--batch``: tiered
+interest for ``--accrue-days`` days and, with ``--fee``, the account fee.
+
+``--report`` writes a :mod:`bank.reporting` report on exit (CSV, or Parquet
+for ``*.parquet`` paths). ``ledger``, ``statement`` and ``daily`` cover the
+mutations made during this run; ``accounts`` and ``owners`` cover the book.
+
+Startup is kept small for cron and script use: ``bank`` loads its exports
+lazily, and optional features (ledger, aggregates, metrics, cProfile, JSON
+parsing) are imported only by the code paths that use them.
 """
 
 from __future__ import annotations
 
+import argparse
+import csv
+import time
+from decimal import Decimal, InvalidOperation
 from pathlib import Path
 import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, IO, Iterator, List, Tuple
+
+
+# One import path for every way of running this file (``python src/cli.py``,
+# ``python -m src.cli``, an editable install): ``bank`` is always the package
+# next to this file, imported absolutely, so its classes are never loaded twice.
+SRC_DIR = str(Path(__file__).resolve().parent)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
+from bank import exceptions as exc  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+from bank.money import format_minor  # noqa: E402
 
-try:  # First attempt: package-relative import (installed or run as module)
-    from .bank.manager import AccountManager  # type: ignore
-    from .bank import exceptions as exc  # type: ignore
-except Exception:  # pragma: no cover - fallback path
-    SRC_DIR = Path(__file__).resolve().parent
-    if str(SRC_DIR) not in sys.path:
-        sys.path.insert(0, str(SRC_DIR))
-    from bank.manager import AccountManager  # type: ignore
-    from bank import exceptions as exc  # type: ignore
+if TYPE_CHECKING:
+    from bank.metrics import Metrics, Profiler
 
 
-def _float_input(prompt: str, default: float | None = None) -> float:
-    """Prompt user for a positive float (or any float if default provided)."""
+def _amount_input(prompt: str, default: Decimal | None = None) -> Decimal:
+    """Prompt user for an amount, parsed exactly as a Decimal (no float rounding)."""
     while True:
         s = input(prompt).strip()
         if s == "" and default is not None:
             return default
         try:
-            value = float(s)
-            return value
-        except ValueError:
-            print("Invalid number, try again.")
+            value = Decimal(s.replace(",", ""))
+            if value.is_finite():
+                return value
+        except InvalidOperation:
+            pass
+        print("Invalid number, try again.")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Aurora Nexus Bank CLI")
+    parser.add_argument(
+        "--data-dir",
+        help="persist accounts in this directory (journal + snapshots) instead of memory",
+    )
+    parser.add_argument(
+        "--db",
+        metavar="PATH",
+        help="keep accounts in this SQLite database, shared with other processes (e.g. the web app)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run commands from a CSV/JSONL file ('-' for stdin) instead of the menu",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        help="batch file format (default: from the file extension, csv for stdin)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="write operation metrics in Prometheus text format to PATH on exit",
+    )
+    parser.add_argument(
+        "--export-mapped",
+        metavar="PATH",
+        help="write the book as a read-only memory-mapped snapshot to PATH on exit",
+    )
+    parser.add_argument(
+        "--interest",
+        metavar="TIERS",
+        help="run end-of-day interest: RATE or FLOOR:RATE,... (floors in currency units, annual rates)",
+    )
+    parser.add_argument(
+        "--accrue-days",
+        type=int,
+        default=1,
+        metavar="N",
+        help="days of interest to accrue in the end-of-day run (default 1)",
+    )
+    parser.add_argument(
+        "--fee",
+        metavar="AMOUNT",
+        help="charge this account fee in the end-of-day run (never below a zero balance)",
+    )
+    parser.add_argument(
+        "--fee-waiver",
+        metavar="BALANCE",
+        help="waive the fee for balances at or above BALANCE",
+    )
+    parser.add_argument(
+        "--report",
+        choices=("accounts", "owners", "ledger", "statement", "daily"),
+        help="write this report on exit (ledger/statement/daily cover this run's operations)",
+    )
+    parser.add_argument(
+        "--report-out",
+        metavar="PATH",
+        default="-",
+        help="report destination: .parquet for Parquet, otherwise CSV ('-' for stdout, the default)",
+    )
+    parser.add_argument(
+        "--account",
+        metavar="ID",
+        help="account id for --report statement",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the run and print the hottest call paths to stderr on exit",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.report == "statement" and not args.account:
+        parser.error("--report statement needs --account")
+    if args.db and args.data_dir:
+        parser.error("--db and --data-dir are alternatives; pick one")
+    schedule = None
+    if args.interest or args.fee:
+        try:
+            schedule = _schedule(args)
+        except ValueError as e:
+            parser.error(str(e))
+    # batch runs are timed only on request; the interactive menu can always show them
+    metrics: Metrics | None = None
+    if args.metrics_file or not args.batch:
+        from bank.metrics import Metrics
+
+        metrics = Metrics()
+    ledger = None
+    if args.report:
+        from bank.ledger import Ledger
+
+        ledger = Ledger()
+    if args.data_dir:
+        mgr = AccountManager.open(args.data_dir, ledger=ledger, metrics=metrics)
+    elif args.db:
+        from bank.sqlite_storage import SQLiteStorage
+
+        mgr = AccountManager(ledger=ledger, metrics=metrics, storage=SQLiteStorage(args.db))
+    else:
+        mgr = AccountManager(ledger=ledger, metrics=metrics)
+    profiler: Profiler | None = None
+    if args.profile or args.metrics_file:  # only instrumented runs claim SIGUSR1
+        from bank.metrics import Profiler
+
+        profiler = Profiler()
+        profiler.install_signal()
+        if args.profile:
+            profiler.start()
+    try:
+        if args.batch or schedule is not None:
+            status = _batch_main(mgr, args.batch, args.format) if args.batch else 0
+            if schedule is not None:
+                _end_of_day(mgr, schedule, args.accrue_days, charge_fees=bool(args.fee))
+            return status
+        _interactive(mgr)
+        return 0
+    finally:
+        if args.export_mapped:
+            mgr.export_mapped(args.export_mapped)
+        if args.report:
+            _write_report(mgr, args.report, args.report_out, args.account)
+        mgr.close()
+        if profiler is not None and profiler.running:
+            profiler.toggle(sys.stderr)
+        if metrics is not None and args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+
+
+def _schedule(args: argparse.Namespace) -> Any:
+    from bank.accrual import Schedule, parse_tiers, validate  # NumPy is loaded only for this run
+    from bank.money import parse
+
+    schedule = Schedule(
+        tiers=parse_tiers(args.interest) if args.interest else (),
+        fee_minor=parse(args.fee) if args.fee else 0,
+        fee_waiver_minor=parse(args.fee_waiver) if args.fee_waiver else None,
+    )
+    validate(schedule, args.accrue_days)
+    return schedule
+
+
+def _end_of_day(mgr: AccountManager, schedule: Any, days: int, charge_fees: bool) -> None:
+    start = time.perf_counter()
+    result = mgr.end_of_day(schedule, days=days, charge_fees=charge_fees)
+    print(
+        f"end of day: {result.accounts:,} accounts, interest {format_minor(result.interest_minor)} "
+        f"to {result.credited:,}, fees {format_minor(result.fees_minor)} from {result.charged:,} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
 
+def _write_report(mgr: AccountManager, report: str, dest: str, account: str | None) -> None:
+    from bank import reporting  # pandas is only loaded when a report is asked for
 
-def main() -> None:
-    mgr = AccountManager()
+    options = {"account_id": account} if report == "statement" else {}
+    if dest == "-":
+        sys.stdout.flush()
+        reporting.export(mgr, report, sys.stdout, **options)
+    else:
+        rows = reporting.export(mgr, report, dest, **options)
+        print(f"{report} report: {rows} rows written to {dest}", file=sys.stderr)
+
+
+# -- batch mode ----------------------------------------------------------------
+# op -> argument names, in CSV column order
+_BATCH_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "create": ("account_id", "owner", "initial"),
+    "deposit": ("account_id", "amount"),
+    "withdraw": ("account_id", "amount"),
+    "transfer": ("src_id", "dst_id", "amount"),
+    "delete": ("account_id",),
+}
+
+
+def _batch_amount(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return Decimal(value)
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}") from None
+    return value
+
+
+def _batch_ops(mgr: AccountManager) -> Dict[str, Callable[..., Any]]:
+    return {
+        "create": lambda account_id, owner="", initial="0": mgr.create(
+            account_id, owner, _batch_amount(initial or "0")
+        ),
+        "deposit": lambda account_id, amount: mgr.deposit(account_id, _batch_amount(amount)),
+        "withdraw": lambda account_id, amount: mgr.withdraw(account_id, _batch_amount(amount)),
+        "transfer": lambda src_id, dst_id, amount: mgr.transfer(src_id, dst_id, _batch_amount(amount)),
+        "delete": mgr.delete,
+    }
+
+
+Command = Tuple[int, str, Dict[str, Any]]  # (line number, op, keyword arguments)
+
+
+def _read_csv(stream: IO[str]) -> Iterator[Command]:
+    for lineno, row in enumerate(csv.reader(stream), 1):
+        if not row or row[0].startswith("#") or (lineno == 1 and row[0] == "op"):
+            continue
+        op = row[0].strip().lower()
+        yield lineno, op, dict(zip(_BATCH_FIELDS.get(op, ()), row[1:]))
+
+
+def _read_jsonl(stream: IO[str]) -> Iterator[Command]:
+    import json  # only JSONL batches pay for it
+
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            op = str(record.pop("op")).lower()
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            yield lineno, "", {"error": f"malformed JSON command: {e}"}
+            continue
+        yield lineno, op, record
+
+
+def _run_batch(mgr: AccountManager, commands: Iterator[Command], errors: IO[str]) -> Tuple[int, int]:
+    """Apply ``(lineno, op, kwargs)`` commands; return ``(ok, failed)`` counts.
+
+    Failures are written to ``errors`` (buffered) as ``line N: Type: message``.
+    """
+    ops = _batch_ops(mgr)
+    ok = failed = 0
+    pending: List[str] = []
+    for lineno, op, kwargs in commands:
+        fn = ops.get(op)
+        try:
+            if fn is None:
+                raise ValueError(kwargs["error"] if not op else f"unknown command {op!r}")
+            fn(**kwargs)
+            ok += 1
+        except Exception as e:  # any row-level failure is reported and the batch continues
+            failed += 1
+            pending.append(f"line {lineno}: {type(e).__name__}: {e}\n")
+            if len(pending) >= 1024:
+                errors.write("".join(pending))
+                pending.clear()
+    errors.write("".join(pending))
+    return ok, failed
+
+
+def _batch_main(mgr: AccountManager, source: str, fmt: str | None) -> int:
+    if fmt is None:
+        fmt = "jsonl" if source.endswith((".jsonl", ".json", ".ndjson")) else "csv"
+    stream = sys.stdin if source == "-" else open(source, newline="", encoding="utf-8", buffering=1 << 20)
+    errors = sys.stderr
+    reader = _read_jsonl if fmt == "jsonl" else _read_csv
+    start = time.perf_counter()
+    try:
+        ok, failed = _run_batch(mgr, reader(stream), errors)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        errors.flush()
+    elapsed = time.perf_counter() - start
+    total = ok + failed
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    print(f"{total} commands: {ok} ok, {failed} failed in {elapsed:.2f}s ({rate:,.0f} commands/s)")
+    return 1 if failed else 0
+
+
+def _interactive(mgr: AccountManager) -> None:
     while True:
-        print("\n1) Create  2) Balance  3) Deposit  4) Withdraw  5) Transfer  6) List  0) Quit")
+        print("\n1) Create  2) Balance  3) Deposit  4) Withdraw  5) Transfer  6) List  7) Metrics  0) Quit")
         cmd = input("Choose: ").strip()
         try:
             if cmd == "0":
@@ -50,47 +372,49 @@ def main() -> None:
             if cmd == "1":
                 aid = input("Account id: ").strip()
                 owner = input("Owner (optional): ").strip()
-                initial = _float_input("Initial (default 0): ", 0.0)
+                initial = _amount_input("Initial (default 0): ", Decimal(0))
                 if initial < 0:
                     print("Initial balance cannot be negative.")
                     continue
                 acct = mgr.create(aid, owner, initial)
-                print(f"Created {acct.name} with balance {acct.balance}")
+                print(f"Created {acct.name} with balance {format_minor(acct.balance_minor)}")
             elif cmd == "2":
                 aid = input("Account id: ").strip()
                 a = mgr.get(aid)
                 if a:
-                    print(f"Balance: {a.balance}")
+                    print(f"Balance: {format_minor(a.balance_minor)}")
                 else:
                     print("Account not found")
             elif cmd == "3":
                 aid = input("Account id: ").strip()
-                amt = _float_input("Amount: ")
+                amt = _amount_input("Amount: ")
                 if amt <= 0:
                     print("Amount must be positive.")
                     continue
                 a = mgr.get(aid)
-                if not a:
+                if a is None:
                     print("Account not found")
                 else:
-                    a.deposit(amt)
-                    print(f"New balance: {a.balance}")
+                    mgr.deposit(aid, amt)
+                    a = mgr.get(aid) or a
+                    print(f"New balance: {format_minor(a.balance_minor)}")
             elif cmd == "4":
                 aid = input("Account id: ").strip()
-                amt = _float_input("Amount: ")
+                amt = _amount_input("Amount: ")
                 if amt <= 0:
                     print("Amount must be positive.")
                     continue
                 a = mgr.get(aid)
-                if not a:
+                if a is None:
                     print("Account not found")
                 else:
-                    a.withdraw(amt)
-                    print(f"New balance: {a.balance}")
+                    mgr.withdraw(aid, amt)
+                    a = mgr.get(aid) or a
+                    print(f"New balance: {format_minor(a.balance_minor)}")
             elif cmd == "5":
                 src = input("From id: ").strip()
                 dst = input("To id: ").strip()
-                amt = _float_input("Amount: ")
+                amt = _amount_input("Amount: ")
                 if amt <= 0:
                     print("Amount must be positive.")
                     continue
@@ -99,7 +423,12 @@ def main() -> None:
             elif cmd == "6":
                 for a in mgr.list_accounts():
                     owner = getattr(a, "owner", "")
-                    print(f"{a.name}: {a.balance} {('- ' + owner) if owner else ''}")
+                    print(f"{a.name}: {format_minor(a.balance_minor)} {('- ' + owner) if owner else ''}")
+            elif cmd == "7":
+                if mgr.metrics is None:
+                    print("Metrics are disabled.")
+                else:
+                    print(mgr.metrics.to_prometheus(), end="")
             else:
                 print("Unknown command")
         except Exception as e:  # broad catch to keep CLI interactive
@@ -111,4 +440,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,20 +1,24 @@
 from pathlib import Path
+import os
 import sys
 from typing import List, Dict
 
-# ensure src is importable when running Streamlit from project root
+# one import path, as in src/cli.py: ``bank`` always comes from ./src
 PROJECT_ROOT = Path(__file__).resolve().parent
 SRC = PROJECT_ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
-try:
-    from bank.manager import AccountManager  # type: ignore
-except Exception:  # pragma: no cover - fallback for direct execution without editable install
-    # attempt to append src again in edge cases
-    if str(SRC) not in sys.path:
-        sys.path.insert(0, str(SRC))
-    from bank.manager import AccountManager  # type: ignore
+from bank.aggregates import AggregateIndex  # noqa: E402
+from bank.concurrent import ConcurrentAccountManager  # noqa: E402
+from bank.ledger import Ledger  # noqa: E402
+from bank.manager import AccountManager  # noqa: E402
+from bank.metrics import Metrics, Profiler  # noqa: E402
+from bank.money import format_minor  # noqa: E402
+
+HISTORY_CAPACITY = 10_000  # ledger entries retained per manager
+PAGE_SIZES = [25, 50, 100]  # account table rows per page
+LOOKUP_LIMIT = 20  # matching ids offered by an account search box
 
 
 def fmt(amount: float) -> str:
@@ -25,15 +29,63 @@ def run_app():
     # Import Streamlit only when running the app to avoid import-time side effects
     import streamlit as st
 
+    data_dir = os.environ.get("BANK_DATA_DIR")
+    db_path = os.environ.get("BANK_DB")
+
+    @st.cache_resource
+    def shared_manager(directory: str) -> AccountManager:
+        # one journaled manager per process, shared (thread-safely) by every session
+        return ConcurrentAccountManager.open(
+            directory, ledger=Ledger(HISTORY_CAPACITY), aggregates=AggregateIndex(), metrics=Metrics()
+        )
+
+    @st.cache_resource
+    def shared_db_manager(path: str) -> AccountManager:
+        from bank.sqlite_storage import SQLiteStorage
+
+        # the CLI may change the same book, so totals, rankings and table pages are read
+        # from the database (one query per page) rather than kept in an in-process AggregateIndex
+        return ConcurrentAccountManager(
+            ledger=Ledger(HISTORY_CAPACITY), metrics=Metrics(), storage=SQLiteStorage(path)
+        )
+
     def ensure_session_state():
         if "mgr" not in st.session_state:
-            st.session_state.mgr = AccountManager()
-        if "tx_history" not in st.session_state:
-            st.session_state.tx_history = []
+            st.session_state.mgr = (
+                shared_db_manager(db_path)
+                if db_path
+                else shared_manager(data_dir)
+                if data_dir
+                else AccountManager(
+                    ledger=Ledger(HISTORY_CAPACITY), aggregates=AggregateIndex(), metrics=Metrics()
+                )
+            )
 
     ensure_session_state()
     mgr: AccountManager = st.session_state.mgr
 
+    # profile the whole rerun when asked; the report is shown on the next one
+    profiler = Profiler()
+    if st.session_state.get("profile_reruns"):
+        profiler.start()
+
+    def account_lookup(label: str, key: str) -> str | None:
+        # search by id prefix; only the first LOOKUP_LIMIT matches are fetched
+        query = st.text_input(label, key=f"{key}_query", placeholder="Account id or prefix").strip()
+        if not query:
+            return None
+        total, matches = mgr.page_accounts(0, LOOKUP_LIMIT, prefix=query)
+        if not matches:
+            st.caption("No matching accounts.")
+            return None
+        # ids sort after their prefixes, so an exact match is always first
+        return st.selectbox(
+            f"{label} ({total:,} matching)", [a.name for a in matches], key=f"{key}_pick"
+        )
+
+    def reset_page():
+        st.session_state.table_page = 1
+
     # Page config and branding
     st.set_page_config(page_title="Aurora Nexus Bank — Online Banking", layout="wide")
 
@@ -82,22 +134,106 @@ def run_app():
 
         with left:
             st.subheader("Accounts")
-            accounts = mgr.list_accounts()
+            search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+            prefix = search_col.text_input(
+                "Search by id prefix", key="table_prefix", on_change=reset_page
+            ).strip()
+            sort = sort_col.selectbox("Sort by", ["id", "balance"], key="table_sort", on_change=reset_page)
+            descending = order_col.checkbox("Descending", key="table_desc", on_change=reset_page)
+            page_size = size_col.selectbox("Rows", PAGE_SIZES, key="table_size", on_change=reset_page)
+
+            # only the visible page is fetched and formatted
+            page = st.session_state.get("table_page", 1)
+            total, accounts = mgr.page_accounts((page - 1) * page_size, page_size, prefix, sort, descending)
+            pages = max(1, -(-total // page_size))
+            if page > pages:  # the book shrank under us: show the last page instead
+                page = pages
+                st.session_state.table_page = page
+                total, accounts = mgr.page_accounts((page - 1) * page_size, page_size, prefix, sort, descending)
             if accounts:
-                # build a simple table with formatted balances
-                rows = [{"id": a.name, "balance": fmt(a.balance), "owner": getattr(a, "owner", "")} for a in accounts]
+                rows = [
+                    {"id": a.name, "balance": format_minor(a.balance_minor), "owner": getattr(a, "owner", "")}
+                    for a in accounts
+                ]
                 st.table(rows)
+                first = (page - 1) * page_size + 1
+                nav_col, info_col = st.columns([1, 3])
+                nav_col.number_input("Page", min_value=1, max_value=pages, step=1, key="table_page")
+                info_col.caption(f"Accounts {first:,}–{first + len(accounts) - 1:,} of {total:,}")
+            elif prefix:
+                st.info(f"No accounts match '{prefix}'.")
             else:
                 st.info("No accounts yet. Use the Actions panel to create one.")
 
             # transaction history expander
             with st.expander("Transaction history"):
-                if st.session_state.tx_history:
-                    for tx in reversed(st.session_state.tx_history[-50:]):
-                        st.write(f"- [{tx['time']}] {tx['message']}")
+                account_filter = st.text_input("Filter by account id", key="history_filter").strip()
+                entries = mgr.ledger.last(50, account_id=account_filter or None) if mgr.ledger is not None else []
+                if entries:
+                    st.table(
+                        [
+                            {
+                                "time": e.when.astimezone().isoformat(timespec="seconds"),
+                                "kind": e.kind,
+                                "from": e.src or "",
+                                "to": e.dst or "",
+                                "amount": format_minor(e.amount_minor),
+                            }
+                            for e in entries
+                        ]
+                    )
                 else:
                     st.write("No transactions yet.")
 
+            with st.expander("Metrics"):
+                if mgr.metrics is not None:
+                    ops = mgr.metrics.snapshot()["ops"]
+                    if ops:
+                        st.table(
+                            [
+                                {
+                                    "op": op,
+                                    "calls": m["count"],
+                                    "errors": sum(m["errors"].values()),
+                                    "p50 µs": f"{m['p50_us']:.1f}",
+                                    "p99 µs": f"{m['p99_us']:.1f}",
+                                }
+                                for op, m in ops.items()
+                            ]
+                        )
+                    st.download_button(
+                        "Download Prometheus metrics",
+                        mgr.metrics.to_prometheus(),
+                        file_name="bank.prom",
+                        mime="text/plain",
+                    )
+                st.checkbox("Profile reruns", key="profile_reruns")
+                if st.session_state.get("profile_report"):
+                    st.code(st.session_state.profile_report, language=None)
+
+            with st.expander("Reports"):
+                report = st.selectbox("Report", ["accounts", "owners", "ledger", "statement", "daily"])
+                report_account = (
+                    st.text_input("Account id", key="report_account").strip() if report == "statement" else ""
+                )
+                fmt_choice = st.radio("Format", ["csv", "parquet"], horizontal=True)
+                if st.button("Build report", disabled=report == "statement" and not report_account):
+                    import io
+
+                    from bank import reporting  # pandas is loaded on first use only
+
+                    buffer = io.BytesIO() if fmt_choice == "parquet" else io.StringIO()
+                    options = {"account_id": report_account} if report == "statement" else {}
+                    reporting.export(mgr, report, buffer, fmt=fmt_choice, **options)
+                    data = buffer.getvalue()
+                    st.session_state.report_file = (
+                        f"{report}.{fmt_choice}",
+                        data.encode("utf-8") if isinstance(data, str) else data,
+                    )
+                if st.session_state.get("report_file"):
+                    name, data = st.session_state.report_file
+                    st.download_button(f"Download {name}", data, file_name=name)
+
         with right:
             st.subheader("Actions")
 
@@ -117,66 +253,63 @@ def run_app():
                         try:
                             mgr.create(aid.strip(), owner.strip(), float(initial))
                             st.success(f"Created account {aid}")
-                            st.session_state.tx_history.append({"time": __import__("datetime").datetime.now().isoformat(timespec='seconds'), "message": f"Created {aid} (owner={owner}) initial={fmt(initial)}"})
                         except Exception as e:
                             st.error(str(e))
 
             elif action in ("Deposit", "Withdraw"):
-                ids = [a.name for a in mgr.list_accounts()]
-                if not ids:
-                    st.warning("No accounts available")
-                else:
+                aid = account_lookup("Account", action.lower())
+                if aid is not None:
                     with st.form(f"{action.lower()}_form"):
-                        aid = st.selectbox("Account", ids)
                         amt = st.number_input("Amount", value=0.0, step=1.0)
                         submitted = st.form_submit_button(action)
                     if submitted:
-                        a = mgr.get(aid)
                         try:
                             if action == "Deposit":
-                                a.deposit(float(amt))
+                                mgr.deposit(aid, float(amt))
                                 st.success(f"Deposited {fmt(amt)} to {aid}")
-                                st.session_state.tx_history.append({"time": __import__("datetime").datetime.now().isoformat(timespec='seconds'), "message": f"Deposit {fmt(amt)} to {aid}"})
                             else:
-                                a.withdraw(float(amt))
+                                mgr.withdraw(aid, float(amt))
                                 st.success(f"Withdrew {fmt(amt)} from {aid}")
-                                st.session_state.tx_history.append({"time": __import__("datetime").datetime.now().isoformat(timespec='seconds'), "message": f"Withdraw {fmt(amt)} from {aid}"})
                         except Exception as e:
                             st.error(str(e))
 
             elif action == "Transfer":
-                ids = [a.name for a in mgr.list_accounts()]
-                if len(ids) < 2:
-                    st.warning("Need at least two accounts")
-                else:
+                src = account_lookup("From", "transfer_src")
+                dst = account_lookup("To", "transfer_dst")
+                if src is not None and dst is not None:
                     with st.form("transfer_form"):
-                        src = st.selectbox("From", ids, index=0)
-                        dst = st.selectbox("To", ids, index=1)
                         amt = st.number_input("Amount", value=0.0, step=1.0)
                         submitted = st.form_submit_button("Transfer")
                     if submitted:
                         try:
                             mgr.transfer(src, dst, float(amt))
                             st.success(f"Transferred {fmt(amt)} from {src} to {dst}")
-                            st.session_state.tx_history.append({"time": __import__("datetime").datetime.now().isoformat(timespec='seconds'), "message": f"Transfer {fmt(amt)} {src} -> {dst}"})
                         except Exception as e:
                             st.error(str(e))
 
             elif action == "Delete":
-                ids = [a.name for a in mgr.list_accounts()]
-                if not ids:
-                    st.warning("No accounts available")
-                else:
+                aid = account_lookup("Account to delete", "delete")
+                if aid is not None:
                     with st.form("delete_form"):
-                        aid = st.selectbox("Account to delete", ids)
                         submitted = st.form_submit_button("Delete")
                     if submitted:
                         mgr.delete(aid)
                         st.success(f"Deleted {aid}")
-                        st.session_state.tx_history.append({"time": __import__("datetime").datetime.now().isoformat(timespec='seconds'), "message": f"Deleted {aid}"})
 
     st.markdown("---")
-    st.caption("Data in memory only — restart app to reset.")
+    if db_path:
+        st.caption(f"Data stored in SQLite database {db_path} (shared with the CLI's --db).")
+    elif data_dir:
+        mgr.sync()
+        st.caption(f"Data journaled to {data_dir}.")
+    else:
+        st.caption(
+            "Data in memory only — restart app to reset (set BANK_DATA_DIR or BANK_DB to persist)."
+        )
+
+    if profiler.running:
+        profiler.stop()
+        st.session_state.profile_report = profiler.report(20)
 
 
 if __name__ == "__main__":
@@ -38,4 +38,19 @@ def test_transfer(account: BankAccount):
 def test_transfer_insufficient_funds(account: BankAccount):
     target = BankAccount("Target Account", 500)
     with pytest.raises(exc.InsufficientFundsError):
-        account.transfer(target, 1200)
\ No newline at end of file
+        account.transfer(target, 1200)
+
+
+def test_balance_is_exact_in_minor_units():
+    acct = BankAccount("Exact", 0)
+    for _ in range(10):
+        acct.deposit(0.1)
+    assert acct.balance_minor == 100
+    assert acct.balance == 1.0
+
+
+def test_minor_unit_hot_path(account: BankAccount):
+    assert account.deposit_minor(150) == 100150
+    assert account.withdraw_minor(50) == 100100
+    with pytest.raises(exc.NegativeAmountError):
+        account.deposit_minor(0)
@@ -0,0 +1,119 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+try:
+    import cli  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+
+try:
+    from bank.accrual import Schedule, Tier, parse_tiers, postings  # type: ignore
+    from bank.aggregates import AggregateIndex  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.ledger import Ledger  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.accrual import Schedule, Tier, parse_tiers, postings  # type: ignore
+    from src.bank.aggregates import AggregateIndex  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.ledger import Ledger  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+
+
+def reference(balance: int, tiers, days: int, day_count: int = 365) -> int:
+    """Marginal tiered interest, rounded half to even, with exact fractions."""
+    tiers = sorted((floor, Fraction(rate)) for floor, rate in tiers)
+    total = Fraction(0)
+    for i, (floor, rate) in enumerate(tiers):
+        top = tiers[i + 1][0] if i + 1 < len(tiers) else None
+        portion = max(0, (balance if top is None else min(balance, top)) - floor)
+        total += portion * rate * days / day_count
+    return round(total)  # Python rounds Fractions half to even
+
+
+def test_interest_is_exact_on_random_balances():
+    rng = np.random.default_rng(7)
+    balances = rng.integers(-10**6, 10**13, size=2000, dtype=np.int64)
+    tiers = [(0, "0.0125"), (1_000_000, "0.0375"), (50_000_000, "0.051234")]
+    schedule = Schedule(tiers=[Tier(f, r) for f, r in tiers], day_count=360)
+    for days in (1, 30, 366):
+        interest, fees = postings(balances, schedule, days)
+        assert interest.tolist() == [reference(b, tiers, days, 360) for b in balances.tolist()]
+        assert not fees.any()
+
+
+def test_ties_round_half_to_even():
+    schedule = Schedule(tiers=[Tier(0, "0.5")])
+    # 365 * 0.5 / 365 = 0.5 -> 0; 1095 * 0.5 / 365 = 1.5 -> 2
+    interest, _ = postings(np.array([365, 1095, 0, -500], dtype=np.int64), schedule)
+    assert interest.tolist() == [0, 2, 0, 0]
+
+
+def test_fee_waiver_and_cap():
+    schedule = Schedule(fee_minor=500, fee_waiver_minor=100_000)
+    balances = np.array([100_000, 99_999, 300, 0, -20], dtype=np.int64)
+    assert postings(balances, schedule)[1].tolist() == [0, 0, 0, 0, 0]
+    assert postings(balances, schedule, charge_fees=True)[1].tolist() == [0, 500, 300, 0, 0]
+
+
+def test_schedule_validation():
+    for bad in (Schedule(tiers=[Tier(0, "1.5")]), Schedule(tiers=[Tier(0, "0.0000001")]),
+                Schedule(tiers=[Tier(0, "x")]), Schedule(tiers=[Tier(0, 0.01), Tier(0, 0.02)]),
+                Schedule(day_count=364), Schedule(fee_minor=-1)):
+        with pytest.raises(ValueError):
+            postings(np.zeros(1, dtype=np.int64), bad)
+    with pytest.raises(ValueError):
+        AccountManager().end_of_day(Schedule(), days=0)  # rejected even with no accounts
+    assert parse_tiers("0.01, 1000:0.02") == (Tier(0, "0.01"), Tier(100_000, "0.02"))
+
+
+def test_end_of_day_is_chunk_independent_and_logs_net_changes():
+    schedule = Schedule(tiers=[Tier(0, "0.05")], fee_minor=100, fee_waiver_minor=1_000_000)
+    results = []
+    for chunk_size in (1, 3, 1000):
+        mgr = AccountManager(ledger=Ledger(capacity=100), aggregates=AggregateIndex())
+        for i, amount in enumerate((0, 0.5, 20_000, 3650, 1)):
+            mgr.create(f"A{i}", "", amount)
+        result = mgr.end_of_day(schedule, days=30, charge_fees=True, chunk_size=chunk_size)
+        results.append((result, [a.balance_minor for a in mgr.list_accounts()]))
+    assert results[0] == results[1] == results[2]
+    result, balances = results[0]
+    assert result.accounts == 5 and result.charged == 3 and result.credited == 2
+    # 20,000.00 at 5% for 30/365 days = 8219.18 -> 8219; 3,650.00 -> 1500 interest, 100 fee
+    assert balances == [0, 0, 2_000_000 + 8219, 365_000 + 1400, 0]
+    assert mgr.top_balances(2) == [("A2", 2_008_219), ("A3", 366_400)]
+    entries = [(e.kind, e.amount_minor) for e in mgr._ledger.last(account_id="A3")]
+    assert entries == [("deposit", 1400), ("create", 365_000)]  # one net entry, not interest + fee
+
+
+def test_end_of_day_is_journaled(tmp_path):
+    schedule = Schedule(tiers=[Tier(0, "0.10")], fee_minor=1000)
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        mgr.create("A1", "", 100)
+        mgr.create("A2", "", 5)
+        mgr.end_of_day(schedule, days=365, charge_fees=True)
+        assert [a.balance_minor for a in mgr.list_accounts()] == [10_000, 0]
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert [a.balance_minor for a in mgr.list_accounts()] == [10_000, 0]
+
+
+def test_concurrent_end_of_day():
+    mgr = ConcurrentAccountManager(stripes=4)
+    for i in range(10):
+        mgr.create(f"A{i}", "", 365)
+    result = mgr.end_of_day(Schedule(tiers=[Tier(0, "0.01")]), days=10)
+    assert result.interest_minor == 10 * 10
+    assert {a.balance_minor for a in mgr.list_accounts()} == {36_510}
+
+
+def test_cli_end_of_day(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,3650\ncreate,A2,Bob,10\n")
+    argv = ["--data-dir", str(tmp_path), "--batch", str(commands)]
+    assert cli.main(argv + ["--interest", "0.01,1000:0.02", "--accrue-days", "10", "--fee", "1",
+                            "--fee-waiver", "100"]) == 0
+    assert "end of day: 2 accounts, interest 1.73 to 1, fees 1.00 from 1" in capsys.readouterr().out
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert [a.balance_minor for a in mgr.list_accounts()] == [365_173, 900]
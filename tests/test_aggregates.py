@@ -0,0 +1,187 @@
+import random
+import threading
+
+import pytest
+
+try:
+    from bank.aggregates import AggregateIndex  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.sortedlist import SortedList  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.aggregates import AggregateIndex  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.sortedlist import SortedList  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+
+@pytest.fixture()
+def mgr() -> AccountManager:
+    mgr = AccountManager(aggregates=AggregateIndex())
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Alice", 20.0)
+    mgr.create("B1", "Bob", 50.0)
+    mgr.create("N1", "", 5.0)
+    return mgr
+
+
+def test_queries_follow_mutations(mgr: AccountManager):
+    assert mgr.total_balance_minor() == 17500
+    assert mgr.owner_total_minor("Alice") == 12000
+    assert mgr.top_balances(2) == [("A1", 10000), ("B1", 5000)]
+    assert mgr.bottom_balances(1) == [("N1", 500)]
+
+    mgr.transfer("A1", "B1", 80.0)
+    mgr.withdraw("A2", 20.0)
+    mgr.delete("N1")
+    assert mgr.total_balance_minor() == 15000
+    assert mgr.owner_total_minor("Alice") == 2000
+    assert mgr.owner_total_minor("Bob") == 13000
+    assert mgr.owner_total_minor("") == 0
+    assert mgr.top_balances(2) == [("B1", 13000), ("A1", 2000)]
+    assert mgr.bottom_balances(1) == [("A2", 0)]
+    assert mgr.aggregates.accounts_of("Alice") == ["A1", "A2"]
+    assert mgr.aggregates.verify(mgr.list_accounts()) == []
+
+
+def test_failed_operations_leave_index_untouched(mgr: AccountManager):
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.transfer("N1", "A1", 10.0)
+    with pytest.raises(exc.BatchError):
+        mgr.apply_batch([("A1", "B1", 10.0), ("N1", "A1", 99.0)], atomic=True)
+    assert mgr.total_balance_minor() == 17500
+    assert mgr.aggregates.verify(mgr.list_accounts()) == []
+
+
+def test_index_matches_full_pass_after_random_workload():
+    indexed = AccountManager(aggregates=AggregateIndex())
+    plain = AccountManager()
+    rng = random.Random(7)
+    for m in (indexed, plain):
+        for i in range(50):
+            m.create(f"A{i}", f"owner{i % 7}", 100.0)
+    for _ in range(2_000):
+        src, dst = f"A{rng.randrange(50)}", f"A{rng.randrange(50)}"
+        amount = rng.randint(1, 5000) / 100
+        for m in (indexed, plain):
+            try:
+                m.transfer(src, dst, amount)
+            except exc.BankingError:
+                pass
+    postings = [(f"A{rng.randrange(50)}", f"A{rng.randrange(50)}", 1.0) for _ in range(500)]
+    for m in (indexed, plain):
+        m.apply_batch(postings)
+
+    assert indexed.aggregates.verify(indexed.list_accounts()) == []
+    assert indexed.total_balance_minor() == plain.total_balance_minor() == 500000
+    # ties may come back in a different order, so compare the balances
+    assert [b for _, b in indexed.top_balances(5)] == [b for _, b in plain.top_balances(5)]
+    assert [b for _, b in indexed.bottom_balances(5)] == [b for _, b in plain.bottom_balances(5)]
+    for i in range(7):
+        assert indexed.owner_total_minor(f"owner{i}") == plain.owner_total_minor(f"owner{i}")
+
+
+def test_verify_reports_drift(mgr: AccountManager):
+    mgr.get("A1").balance_minor += 1  # bypasses the manager
+    problems = mgr.aggregates.verify(mgr.list_accounts())
+    assert any(p.startswith("total") for p in problems)
+
+
+def test_open_rebuilds_index(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as m:
+        m.create("A1", "Alice", 10.0)
+        m.create("A2", "Bob", 3.0)
+        m.transfer("A1", "A2", 4.0)
+    with AccountManager.open(tmp_path, aggregates=AggregateIndex(), fsync=False) as m:
+        assert m.total_balance_minor() == 1300
+        assert m.top_balances(1) == [("A2", 700)]
+        m.deposit("A1", 1.0)
+        assert m.aggregates.verify(m.list_accounts()) == []
+
+
+def test_concurrent_manager_keeps_index_consistent():
+    mgr = ConcurrentAccountManager(aggregates=AggregateIndex(), stripes=4)
+    ids = [f"A{i}" for i in range(20)]
+    for account_id in ids:
+        mgr.create(account_id, "", 100.0)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(2_000):
+            try:
+                mgr.transfer(rng.choice(ids), rng.choice(ids), rng.randint(1, 3000) / 100)
+            except exc.BankingError:
+                pass
+            mgr.top_balances(3)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    assert mgr.total_balance_minor() == 200000
+    assert mgr.aggregates.verify(mgr.list_accounts()) == []
+
+
+def test_sorted_list_matches_sorted():
+    rng = random.Random(3)
+    values = SortedList(load=4)
+    reference = []
+    for _ in range(2_000):
+        if reference and rng.random() < 0.4:
+            v = rng.choice(reference)
+            reference.remove(v)
+            values.remove(v)
+        else:
+            v = rng.randint(0, 100)
+            reference.append(v)
+            values.add(v)
+    reference.sort()
+    assert list(values) == reference
+    assert list(values.islice(10, 20)) == reference[10:20]
+    assert list(values.islice(10, 20, reverse=True)) == reference[::-1][10:20]
+    assert list(values.irange_from(50)) == [v for v in reference if v >= 50]
+    assert values.bisect_left(50) == sum(v < 50 for v in reference)
+    assert values.bisect_right(50) == sum(v <= 50 for v in reference)
+    with pytest.raises(ValueError):
+        values.remove(1_000)
+
+
+@pytest.mark.parametrize("sort", ["id", "balance"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("prefix", ["", "A1", "B", "Z"])
+def test_page_matches_full_sort(sort, descending, prefix):
+    indexed = AccountManager(aggregates=AggregateIndex())
+    plain = AccountManager()
+    for m in (indexed, plain):
+        for i in range(300):
+            m.create(f"{'AB'[i % 2]}{i}", "", i * 7 % 101)
+        m.delete("A10")
+    for offset in (0, 7, 45, 500):
+        total, page = indexed.page_accounts(offset, 10, prefix, sort, descending)
+        expected_total, expected = plain.page_accounts(offset, 10, prefix, sort, descending)
+        assert total == expected_total
+        if sort == "id":
+            assert [a.name for a in page] == [a.name for a in expected]
+        else:  # equal balances may tie-break differently
+            assert [a.balance_minor for a in page] == [a.balance_minor for a in expected]
+            assert all(a.name.startswith(prefix) for a in page)
+
+
+def test_page_prefix_ending_in_max_code_point():
+    mgr = AccountManager(aggregates=AggregateIndex())
+    top = "\U0010ffff"
+    for account_id in ("A", "A1", f"A{top}", f"A{top}1", f"A{top}x", "B"):
+        mgr.create(account_id)
+    total, page = mgr.page_accounts(prefix=f"A{top}")
+    assert (total, [a.name for a in page]) == (3, [f"A{top}", f"A{top}1", f"A{top}x"])
+    total, page = mgr.page_accounts(prefix="A")
+    assert total == 5 and [a.name for a in page] == sorted(a.name for a in mgr.list_accounts() if a.name.startswith("A"))
+    assert mgr.page_accounts(prefix=top) == (0, [])
+
+
+def test_page_rejects_unknown_sort(mgr: AccountManager):
+    with pytest.raises(ValueError):
+        mgr.page_accounts(sort="owner")
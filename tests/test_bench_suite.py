@@ -0,0 +1,30 @@
+import importlib.util
+from pathlib import Path
+
+SUITE = Path(__file__).resolve().parents[1] / "benchmarks" / "suite.py"
+spec = importlib.util.spec_from_file_location("bench_suite", SUITE)
+suite = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(suite)
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "op.latency": suite._metric(100.0, "ns/op"),
+        "op.rate": suite._metric(1000.0, "ops/s", "higher"),
+        "op.removed": suite._metric(1.0, "ms"),
+    }
+    results = {
+        "op.latency": suite._metric(120.0, "ns/op"),  # 20% slower: within 25%
+        "op.rate": suite._metric(700.0, "ops/s", "higher"),  # 30% fewer ops
+        "op.new": suite._metric(5.0, "ms"),  # no baseline yet
+    }
+    regressions = suite.compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("op.rate")
+    assert suite.compare(results, baseline, tolerance=0.5) == []
+
+
+def test_quick_run_writes_json_and_gates(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    argv = ["--only", "memory", "--quick", "--repeat", "1"]
+    assert suite.main(argv + ["--save-baseline", str(baseline)]) == 0
+    assert suite.main(argv + ["--baseline", str(baseline), "--tolerance", "0.5"]) == 0
@@ -0,0 +1,71 @@
+import json
+
+try:  # same import path as ``python src/cli.py`` so exception classes match
+    import cli  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+
+try:
+    from bank.manager import AccountManager  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.manager import AccountManager  # type: ignore
+
+
+def test_batch_csv_reports_errors_and_continues(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text(
+        "op,a,b,c\n"
+        "create,A1,Alice,100.00\n"
+        "create,A2,,\n"
+        "transfer,A1,A2,30.10\n"
+        "withdraw,A2,500\n"
+        "bogus,A1\n"
+        "\n"
+        "deposit,A2,0.05\n"
+    )
+    data = tmp_path / "data"
+    assert cli.main(["--data-dir", str(data), "--batch", str(commands)]) == 1
+    out, err = capsys.readouterr()
+    assert "6 commands: 4 ok, 2 failed" in out
+    assert "line 5: InsufficientFundsError" in err
+    assert "line 6: ValueError: unknown command 'bogus'" in err
+    with AccountManager.open(data) as mgr:
+        assert mgr.get("A1").balance_minor == 6990
+        assert mgr.get("A2").balance_minor == 3015
+
+
+def test_batch_csv_out_of_range_rows_fail_per_line(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text(
+        "create,A1,,1\n"
+        "deposit,A1,1e20\n"
+        "deposit,A1,90000000000000000\n"
+        "deposit,A1,90000000000000000\n"
+        "deposit,A1,1\n"
+    )
+    data = tmp_path / "data"
+    assert cli.main(["--data-dir", str(data), "--batch", str(commands)]) == 1
+    out, err = capsys.readouterr()
+    assert "5 commands: 3 ok, 2 failed" in out
+    assert "line 2: ValueError" in err and "line 4: ValueError" in err
+    with AccountManager.open(data) as mgr:
+        assert mgr.get("A1").balance_minor == 9 * 10**18 + 200
+
+
+def test_batch_jsonl(tmp_path, capsys):
+    commands = tmp_path / "cmds.jsonl"
+    rows = [
+        {"op": "create", "account_id": "A1", "initial": "10"},
+        {"op": "create", "account_id": "A2", "owner": "Bob"},
+        {"op": "transfer", "src_id": "A1", "dst_id": "A2", "amount": 2.5},
+        {"op": "delete", "account_id": "A1"},
+    ]
+    commands.write_text("\n".join(json.dumps(r) for r in rows) + "\nnot json\n")
+    data = tmp_path / "data"
+    assert cli.main(["--data-dir", str(data), "--batch", str(commands)]) == 1
+    out, err = capsys.readouterr()
+    assert "5 commands: 4 ok, 1 failed" in out
+    assert "line 5: ValueError: malformed JSON command" in err
+    with AccountManager.open(data) as mgr:
+        assert mgr.get("A1") is None
+        assert mgr.get("A2").balance_minor == 250
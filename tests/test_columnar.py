@@ -0,0 +1,91 @@
+import pytest
+
+try:
+    from bank.columnar import ColumnarAccountManager  # type: ignore
+    from bank.account import BankAccount  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.columnar import ColumnarAccountManager  # type: ignore
+    from src.bank.account import BankAccount  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+
+@pytest.fixture()
+def book() -> ColumnarAccountManager:
+    mgr = ColumnarAccountManager()
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 50.0)
+    return mgr
+
+
+def test_views_behave_like_accounts(book: ColumnarAccountManager):
+    a1 = book.get("A1")
+    assert isinstance(a1, BankAccount)
+    assert (a1.name, a1.owner, a1.balance) == ("A1", "Alice", 100.0)
+    a1.deposit(0.1)
+    a1.deposit(0.2)
+    assert a1.balance_minor == 10030
+    a1.transfer(book.get("A2"), 30.3)
+    assert book.get("A2").balance == 80.3
+    with pytest.raises(exc.InsufficientFundsError):
+        a1.withdraw(1000)
+
+
+def test_manager_api(book: ColumnarAccountManager):
+    book.transfer("A1", "A2", 25.0)
+    assert book.withdraw("A2", 5.0) == 70.0
+    with pytest.raises(exc.DuplicateAccountError):
+        book.create("A1")
+    with pytest.raises(exc.AccountNotFoundError):
+        book.transfer("A1", "X", 1.0)
+    with pytest.raises(exc.NegativeAmountError):
+        book.deposit("A1", -1)
+    book.delete("A1")
+    assert book.get("A1") is None
+    assert [a.name for a in book.list_accounts()] == ["A2"]
+    assert len(book) == 1
+
+
+def test_aggregates(book: ColumnarAccountManager):
+    book.create("A3", "", -20.0)
+    assert book.total_balance() == 130.0
+    assert book.negative_balance_ids() == ["A3"]
+    book.delete("A3")
+    assert book.negative_balance_ids() == []
+    assert book.total_balance_minor() == 15000
+
+
+def test_view_of_deleted_account_refuses_writes(book: ColumnarAccountManager):
+    stale = book.get("A1")
+    book.delete("A1")
+    with pytest.raises(exc.AccountNotFoundError):
+        stale.deposit(5.0)
+    with pytest.raises(exc.AccountNotFoundError):
+        book.get("A2").transfer(stale, 1.0)
+    assert book.total_balance_minor() == book.get("A2").balance_minor == 5000
+
+
+def test_apply_batch_atomic(book: ColumnarAccountManager):
+    assert book.apply_batch([("A1", "A2", 10.0), ("A2", "A1", 500.0)])[1].__class__ is exc.InsufficientFundsError
+    with pytest.raises(exc.BatchError):
+        book.apply_batch([("A1", "A2", 10.0), ("A1", "A2", 500.0)], atomic=True)
+    assert (book.get("A1").balance, book.get("A2").balance) == (90.0, 60.0)
+
+
+def test_balances_past_int64_are_refused(book: ColumnarAccountManager):
+    top = (1 << 63) - 1
+    rich = book.create("R")
+    rich.balance_minor = top
+    with pytest.raises(ValueError):
+        book.deposit("R", 1)
+    with pytest.raises(ValueError):
+        book.transfer("A1", "R", 1)
+    with pytest.raises(ValueError):
+        rich.deposit(1)
+    with pytest.raises(ValueError):
+        rich.balance_minor = top + 1
+    assert [type(e) for e in book.apply_batch([("A1", "R", 1), ("R", "R", 1)])] == [ValueError, type(None)]
+    with pytest.raises(exc.BatchError):
+        book.apply_batch([("A1", "A2", 1), ("A1", "R", 1)], atomic=True)
+    assert book.get("R").balance_minor == top
+    assert book.get("A1").balance_minor == 10_000
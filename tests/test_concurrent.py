@@ -0,0 +1,135 @@
+import random
+import sys
+import threading
+
+import pytest
+
+try:
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+THREADS = 8
+OPS_PER_THREAD = 5_000
+
+
+def _run(workers):
+    threads = [threading.Thread(target=w) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+        assert not t.is_alive(), "worker did not finish (deadlock?)"
+
+
+def test_transfers_conserve_money():
+    mgr = ConcurrentAccountManager(stripes=8)
+    ids = [f"A{i}" for i in range(20)]
+    for account_id in ids:
+        mgr.create(account_id, "", 100.0)
+    total = sum(a.balance_minor for a in mgr.list_accounts())
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(OPS_PER_THREAD):
+            src, dst = rng.sample(ids, 2)
+            try:
+                if rng.random() < 0.1:
+                    mgr.apply_batch([(src, dst, 1.0), (dst, src, 2.0)], atomic=True)
+                else:
+                    mgr.transfer(src, dst, rng.randint(1, 50))
+            except (exc.InsufficientFundsError, exc.BatchError):
+                pass
+
+    _run([lambda s=s: worker(s) for s in range(THREADS)])
+    balances = [a.balance_minor for a in mgr.list_accounts()]
+    assert sum(balances) == total
+    assert min(balances) >= 0
+
+
+def test_opposing_transfers_do_not_deadlock():
+    mgr = ConcurrentAccountManager(stripes=2)
+    mgr.create("A", "", 1_000_000.0)
+    mgr.create("B", "", 1_000_000.0)
+
+    def ab():
+        for _ in range(OPS_PER_THREAD):
+            mgr.transfer("A", "B", 1.0)
+
+    def ba():
+        for _ in range(OPS_PER_THREAD):
+            mgr.transfer("B", "A", 1.0)
+
+    _run([ab, ba, ab, ba])
+    assert mgr.get("A").balance == mgr.get("B").balance == 1_000_000.0
+
+
+def test_concurrent_create_rejects_duplicates():
+    mgr = ConcurrentAccountManager()
+    created = []
+
+    def worker():
+        try:
+            created.append(mgr.create("SAME", "", 1.0))
+        except exc.DuplicateAccountError:
+            pass
+
+    _run([worker for _ in range(THREADS)])
+    assert len(created) == 1
+
+
+def test_journaled_concurrent_book_recovers(tmp_path):
+    mgr = ConcurrentAccountManager.open(tmp_path, fsync=False, snapshot_every=500)
+    ids = [f"A{i}" for i in range(10)]
+    for account_id in ids:
+        mgr.create(account_id, "", 100.0)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(500):
+            src, dst = rng.sample(ids, 2)
+            try:
+                mgr.transfer(src, dst, rng.randint(1, 20))
+            except exc.InsufficientFundsError:
+                pass
+
+    _run([lambda s=s: worker(s) for s in range(4)])
+    expected = {a.name: a.balance_minor for a in mgr.list_accounts()}
+    mgr.close()
+    recovered = ConcurrentAccountManager.open(tmp_path, fsync=False)
+    assert {a.name: a.balance_minor for a in recovered.list_accounts()} == expected
+    recovered.close()
+
+
+def test_aggregate_reads_run_alongside_creates():
+    mgr = ConcurrentAccountManager(stripes=8)
+    mgr.create_many([(f"S{i}", "Alice", 1.0) for i in range(2_000)])
+    done = threading.Event()
+    errors = []
+
+    def writer(n):
+        for i in range(10_000):
+            mgr.create(f"W{n}-{i}", "Alice", 1.0)
+        done.set()
+
+    def reader():
+        try:
+            while not done.is_set():
+                assert mgr.total_balance_minor() >= 200_000
+                assert mgr.owner_total_minor("Alice") >= 200_000
+                mgr.top_balances(3)
+                mgr.bottom_balances(3)
+                mgr.page_accounts(limit=5, prefix="W")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to hit a read mid-walk
+    try:
+        _run([lambda: writer(0), lambda: writer(1), reader, reader])
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert mgr.total_balance_minor() == 22_000 * 100
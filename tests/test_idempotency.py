@@ -0,0 +1,176 @@
+import asyncio
+import threading
+
+import pytest
+
+try:
+    from bank import exceptions as exc  # type: ignore
+    from bank.client import BankClient  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.idempotency import IdempotencyCache  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.metrics import Metrics  # type: ignore
+    from bank.server import BankServer  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank import exceptions as exc  # type: ignore
+    from src.bank.client import BankClient  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.idempotency import IdempotencyCache  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.metrics import Metrics  # type: ignore
+    from src.bank.server import BankServer  # type: ignore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_replayed_mutations_apply_once():
+    mgr = AccountManager(idempotency=IdempotencyCache())
+    acct = mgr.create("A1", "Alice", 10, idempotency_key="c1")
+    assert mgr.create("A1", "Alice", 10, idempotency_key="c1") is acct
+    mgr.create("A2")
+    assert mgr.deposit("A1", 5, idempotency_key="d1") == 15.0
+    assert mgr.deposit("A1", 5, idempotency_key="d1") == 15.0
+    mgr.transfer("A1", "A2", 3, idempotency_key="t1")
+    mgr.transfer("A1", "A2", 3, idempotency_key="t1")
+    assert mgr.withdraw("A2", 1, idempotency_key="w1") == mgr.withdraw("A2", 1, idempotency_key="w1") == 2.0
+    results = mgr.apply_batch([("A1", "A2", 1), ("A2", "A1", 99)], idempotency_key="b1")
+    assert mgr.apply_batch([("A1", "A2", 1), ("A2", "A1", 99)], idempotency_key="b1") is results
+    assert mgr.get("A1").balance_minor == 1100
+    assert mgr.get("A2").balance_minor == 300
+    assert mgr.idempotency.stats()["hits"] == 5
+
+
+def test_failed_call_is_not_remembered():
+    mgr = AccountManager(idempotency=IdempotencyCache())
+    mgr.create("A1")
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.withdraw("A1", 5, idempotency_key="w1")
+    mgr.deposit("A1", 10)
+    assert mgr.withdraw("A1", 5, idempotency_key="w1") == 5.0
+
+
+def test_key_reused_for_different_request_is_rejected():
+    mgr = AccountManager(idempotency=IdempotencyCache())
+    mgr.create("A1")
+    mgr.deposit("A1", 5, idempotency_key="k")
+    with pytest.raises(exc.IdempotencyConflictError):
+        mgr.deposit("A1", 6, idempotency_key="k")
+    with pytest.raises(exc.IdempotencyConflictError):
+        mgr.withdraw("A1", 5, idempotency_key="k")
+    assert mgr.get("A1").balance_minor == 500
+
+
+def test_key_requires_cache():
+    mgr = AccountManager()
+    mgr.create("A1")
+    with pytest.raises(ValueError):
+        mgr.deposit("A1", 1, idempotency_key="k")
+    assert mgr.get("A1").balance_minor == 0
+
+
+def test_cache_ttl_lru_and_counters():
+    clock = FakeClock()
+    cache = IdempotencyCache(capacity=2, ttl=10, clock=clock)
+    for key in ("a", "b"):
+        assert cache.begin(key, key) == (False, None)
+        cache.finish(key, key.upper())
+    assert cache.begin("a", "a") == (True, "A")  # "b" is now least recently used
+    cache.begin("c", "c")
+    cache.finish("c", "C")
+    assert len(cache) == 2 and cache.evictions == 1
+    clock.now = 11
+    assert cache.begin("a", "a") == (False, None)  # expired: runs again
+    cache.release("a")
+    assert cache.stats() == {
+        "size": 1,
+        "capacity": 2,
+        "hits": 1,
+        "misses": 4,
+        "evictions": 1,
+        "expirations": 1,
+    }
+
+
+def test_in_flight_replay_conflicts():
+    cache = IdempotencyCache()
+    cache.begin("k", 1)
+    with pytest.raises(exc.IdempotencyConflictError):
+        cache.begin("k", 1)
+    cache.finish("k", "done")
+    assert cache.begin("k", 1) == (True, "done")
+
+
+def test_concurrent_retries_post_once():
+    mgr = ConcurrentAccountManager(idempotency=IdempotencyCache(), metrics=Metrics(), stripes=4)
+    mgr.create("A1")
+    errors = []
+
+    def retry():
+        for attempt in range(200):
+            try:
+                mgr.deposit("A1", 1, idempotency_key=f"d{attempt}")
+            except exc.IdempotencyConflictError as e:  # a twin attempt is still running
+                errors.append(e)
+
+    threads = [threading.Thread(target=retry) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert mgr.get("A1").balance_minor == 200 * 100
+    assert mgr.metrics.histogram("deposit").count == 4 * 200
+
+
+def test_server_replays_responses():
+    async def main():
+        server = BankServer(AccountManager(idempotency=IdempotencyCache()))
+        await server.start()
+        host, port = server.address[:2]
+        try:
+            async with await BankClient.connect(host, port) as client:
+                await client.create("A1", "", "10.00", idempotency_key="c")
+                first = await client.deposit("A1", "2.50", idempotency_key="d")
+                assert first == await client.deposit("A1", "2.50", idempotency_key="d") == 1250
+                await client.deposit("A1", "1.00")
+                # the replay answers as the first attempt did, not with the current balance
+                assert await client.deposit("A1", "2.50", idempotency_key="d") == 1250
+                with pytest.raises(exc.IdempotencyConflictError):
+                    await client.withdraw("A1", "2.50", idempotency_key="d")
+                return (await client.get("A1"))["balance_minor"]
+        finally:
+            await server.close()
+
+    assert asyncio.run(main()) == 1350
+
+
+def test_eviction_skips_calls_in_flight():
+    cache = IdempotencyCache(capacity=1)
+    cache.begin("slow", 1)
+    cache.begin("fast", 2)
+    cache.finish("fast", "F")
+    assert len(cache) == 2 and cache.evictions == 0  # "slow" is still running
+    cache.finish("slow", "S")
+    assert cache.begin("slow", 1) == (True, "S")
+    cache.begin("next", 3)  # back under capacity: only the call in flight stays
+    assert len(cache) == 1 and cache.evictions == 2
+    with pytest.raises(exc.IdempotencyConflictError):
+        cache.begin("next", 3)
+
+
+def test_batch_fingerprint_does_not_grow_with_the_batch():
+    cache = IdempotencyCache()
+    mgr = AccountManager(idempotency=cache)
+    mgr.create_many([("A1", "", 100), ("A2", "", 0)], idempotency_key="c")
+    rows = [("A1", "A2", 1)] * 10_000
+    mgr.apply_batch(rows, minor_units=True, idempotency_key="b")
+    assert mgr.apply_batch(list(rows), minor_units=True, idempotency_key="b")[0] is None
+    with pytest.raises(exc.IdempotencyConflictError):
+        mgr.apply_batch(rows[:-1], minor_units=True, idempotency_key="b")
+    assert mgr.get("A2").balance_minor == 10_000
+    assert all(len(repr(entry[1])) < 100 for entry in cache._entries.values())
@@ -0,0 +1,129 @@
+import pytest
+
+try:
+    from bank.manager import AccountManager  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+    from bank import journal  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+    from src.bank import journal  # type: ignore
+
+
+def _populate(mgr: AccountManager) -> None:
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 50.0)
+    mgr.create("A3", "", 0.0)
+    mgr.deposit("A1", 25.0)
+    mgr.withdraw("A2", 10.0)
+    mgr.transfer("A1", "A2", 40.0)
+    mgr.delete("A3")
+
+
+def _state(mgr: AccountManager):
+    return {a.name: (a.balance, getattr(a, "owner", "")) for a in mgr.list_accounts()}
+
+
+def test_replay_restores_book(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        _populate(mgr)
+        expected = _state(mgr)
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == expected
+        assert expected == {"A1": (85.0, "Alice"), "A2": (80.0, "Bob")}
+
+
+def test_snapshot_then_tail_replay(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        _populate(mgr)
+        mgr.checkpoint()
+        mgr.deposit("A2", 5.0)
+    assert len(list(tmp_path.glob("journal.*.log"))) == 1
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == {"A1": (85.0, "Alice"), "A2": (85.0, "Bob")}
+
+
+def test_automatic_snapshot(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False, snapshot_every=3) as mgr:
+        _populate(mgr)
+    assert (tmp_path / "snapshot.bin").exists()
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == {"A1": (85.0, "Alice"), "A2": (80.0, "Bob")}
+
+
+def test_torn_tail_is_discarded(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        _populate(mgr)
+    (segment,) = tmp_path.glob("journal.*.log")
+    data = segment.read_bytes()
+    segment.write_bytes(data[:-3])  # tear the final (delete) record
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert mgr.get("A3") is not None
+        mgr.delete("A3")
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert mgr.get("A3") is None
+
+
+def test_damaged_older_segment_raises(tmp_path, monkeypatch):
+    def crash(src, dst):
+        raise OSError("crash before the snapshot was renamed")
+
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        _populate(mgr)
+        with monkeypatch.context() as m:
+            m.setattr(journal.os, "replace", crash)
+            with pytest.raises(OSError):
+                mgr.checkpoint()  # leaves the old segment and a new one after it
+        mgr.deposit("A2", 5.0)
+    older, newer = sorted(tmp_path.glob("journal.*.log"))
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == {"A1": (85.0, "Alice"), "A2": (85.0, "Bob")}
+    data = bytearray(older.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    older.write_bytes(bytes(data))
+    with pytest.raises(exc.StorageError):
+        AccountManager.open(tmp_path, fsync=False)
+    assert newer.stat().st_size > 0
+
+
+def test_failed_mutation_is_not_journaled(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        mgr.create("A1", "Alice", 10.0)
+        with pytest.raises(exc.InsufficientFundsError):
+            mgr.withdraw("A1", 50.0)
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert mgr.get("A1").balance == 10.0
+
+
+def test_bad_snapshot_raises(tmp_path):
+    (tmp_path / "snapshot.bin").write_bytes(b"not a snapshot at all")
+    with pytest.raises(exc.StorageError):
+        AccountManager.open(tmp_path)
+
+
+def test_batch_is_journaled(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        _populate(mgr)
+        mgr.apply_batch([("A1", "A2", 5.0), ("A2", "A1", 1000.0)])
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == {"A1": (80.0, "Alice"), "A2": (85.0, "Bob")}
+
+
+def test_unjournalable_mutation_changes_nothing(tmp_path):
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        mgr.create("A1", "Alice", 10.0)
+        with pytest.raises(TypeError):
+            mgr.create(5, "", 1.0)  # type: ignore[arg-type]
+        with pytest.raises(ValueError):
+            mgr.create("A2", "", 10**20)  # over int64 minor units
+        with pytest.raises(ValueError):
+            mgr.create_many([("A3", "", 1), ("A4", "x" * 70_000, 1)])
+        mgr.deposit("A1", 9 * 10**16)
+        with pytest.raises(ValueError):
+            mgr.deposit("A1", 9 * 10**16)  # the balance would overflow a snapshot
+        assert [a.name for a in mgr.list_accounts()] == ["A1"]
+        assert mgr.get("A1").balance_minor == 9 * 10**18 + 1000
+        mgr.checkpoint()
+        mgr.withdraw("A1", 10.0)
+    with AccountManager.open(tmp_path, fsync=False) as mgr:
+        assert _state(mgr) == {"A1": (9 * 10**16, "Alice")}
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+try:
+    from bank.ledger import Ledger  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.ledger import Ledger  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000
+
+    def __call__(self) -> int:
+        self.now += 10
+        return self.now
+
+
+@pytest.fixture()
+def mgr() -> AccountManager:
+    mgr = AccountManager(ledger=Ledger(capacity=8, clock=FakeClock()))
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 0.0)
+    mgr.transfer("A1", "A2", 25.0)
+    mgr.deposit("A2", 1.5)
+    return mgr
+
+
+def test_manager_records_structured_entries(mgr: AccountManager):
+    entries = mgr.ledger.last(10)
+    assert [(e.kind, e.src, e.dst, e.amount_minor) for e in entries] == [
+        ("deposit", None, "A2", 150),
+        ("transfer", "A1", "A2", 2500),
+        ("create", None, "A2", 0),
+        ("create", None, "A1", 10000),
+    ]
+    assert [e.kind for e in mgr.ledger.last(10, account_id="A1")] == ["transfer", "create"]
+    assert isinstance(entries[0].when, datetime)
+
+
+def test_ring_evicts_oldest_and_index_follows(mgr: AccountManager):
+    for _ in range(10):
+        mgr.withdraw("A2", 0.01)
+    ledger = mgr.ledger
+    assert len(ledger) == 8
+    assert ledger.oldest_seq == 6
+    assert [e.kind for e in ledger.last(100, account_id="A2")] == ["withdraw"] * 8
+    assert ledger.last(100, account_id="A1") == []
+
+
+def test_time_range_queries(mgr: AccountManager):
+    ledger = mgr.ledger
+    times = [e.time_ns for e in reversed(ledger.last(10))]
+    middle = ledger.between(times[1], times[3])
+    assert [e.seq for e in middle] == [1, 2]
+    assert [e.kind for e in ledger.between(times[1], times[3] + 1, account_id="A1")] == ["transfer"]
+    assert ledger.between(datetime(2000, 1, 1, tzinfo=timezone.utc), 0.0) == []
+
+
+def test_failed_and_batch_mutations():
+    ledger = Ledger(capacity=100)
+    mgr = AccountManager(ledger=ledger)
+    mgr.create("A1", "", 10.0)
+    mgr.create("A2", "", 0.0)
+    mgr.apply_batch([("A1", "A2", 1.0), ("A2", "A1", 50.0)])
+    with pytest.raises(Exception):
+        mgr.withdraw("A1", 500.0)
+    assert [e.kind for e in ledger.last()] == ["transfer", "create", "create"]
+
+
+def test_index_memory_is_bounded():
+    ledger = Ledger(capacity=16)
+    mgr = AccountManager(ledger=ledger)
+    for i in range(1000):
+        mgr.create(f"A{i}", "", 1.0)
+    assert len(ledger._by_account) <= 2 * ledger.capacity
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+try:
+    from bank import exceptions as exc  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.limits import Limit, VelocityLimits  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank import exceptions as exc  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.limits import Limit, VelocityLimits  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def make(clock: FakeClock, *limits: Limit) -> AccountManager:
+    mgr = AccountManager(limits=VelocityLimits(limits, clock=clock))
+    mgr.create("A1", "Alice", 100)
+    mgr.create("A2", "Alice", 100)
+    mgr.create("B1", "", 100)
+    return mgr
+
+
+def test_count_limit_slides_with_the_window(clock: FakeClock):
+    mgr = make(clock, Limit(60, max_count=3, buckets=6))
+    for _ in range(3):
+        mgr.withdraw("A1", 1)
+    with pytest.raises(exc.TransactionCountLimitError) as info:
+        mgr.transfer("A1", "A2", 1)
+    assert info.value.key == "A1" and info.value.limit.max_count == 3
+    assert mgr.get("A1").balance_minor == 9700  # the rejected transfer was not applied
+    mgr.withdraw("A2", 1)  # other accounts are unaffected
+
+    clock.now += 50  # the first outflows are still inside the window
+    with pytest.raises(exc.TransactionCountLimitError):
+        mgr.withdraw("A1", 1)
+    clock.now += 10
+    mgr.withdraw("A1", 1)
+
+
+def test_outflow_limit_per_owner(clock: FakeClock):
+    mgr = make(clock, Limit(86_400, max_outflow_minor=5000, scope="owner"))
+    mgr.transfer("A1", "B1", 30)
+    with pytest.raises(exc.OutflowLimitError) as info:
+        mgr.withdraw("A2", 25)  # Alice's two accounts share the limit
+    assert isinstance(info.value, exc.LimitExceededError) and info.value.key == "Alice"
+    mgr.withdraw("A2", 20)
+    mgr.withdraw("B1", 100)  # accounts without an owner are exempt
+    mgr.deposit("A1", 500)  # inflows are not limited
+    assert [row[1:] for row in mgr.limits.usage("A1", "Alice")] == [(2, 5000)]
+
+
+def test_failed_outflows_are_not_counted(clock: FakeClock):
+    mgr = make(clock, Limit(60, max_count=1), Limit(60, max_outflow_minor=10_000, scope="owner"))
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.withdraw("A1", 1000)
+    mgr.withdraw("A1", 60)
+    with pytest.raises(exc.OutflowLimitError):
+        mgr.withdraw("A2", 60)
+    # neither the overdraft nor the owner-limit rejection used up A2's single outflow
+    mgr.withdraw("A2", 1)
+    assert mgr.limits.stats() == {"limits": 2, "tracked_keys": 3, "slots": 3, "rejections": 1}
+
+
+def test_batch_postings_are_limited(clock: FakeClock):
+    mgr = make(clock, Limit(60, max_count=2))
+    results = mgr.apply_batch([("A1", "B1", 1), ("A1", "B1", 1), ("A1", "B1", 1)])
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], exc.TransactionCountLimitError)
+
+    with pytest.raises(exc.BatchError) as info:
+        mgr.apply_batch([("A2", "B1", 1), ("A2", "B1", 1), ("A2", "B1", 1)], atomic=True)
+    assert isinstance(info.value.error, exc.LimitExceededError)
+    assert mgr.get("A2").balance_minor == 10000
+    # the rolled-back postings were taken back from the window
+    mgr.apply_batch([("A2", "B1", 1), ("A2", "B1", 1)], atomic=True)
+
+
+def test_idle_keys_are_swept(clock: FakeClock):
+    limits = VelocityLimits([Limit(60, max_count=10), Limit(60, max_count=10, scope="owner")], clock=clock)
+    mgr = AccountManager(limits=limits)
+    for i in range(50):
+        mgr.create(f"A{i}", f"owner{i}", 1)
+        mgr.withdraw(f"A{i}", 0.5)
+    assert limits.stats()["tracked_keys"] == 100
+    clock.now += 61
+    mgr.withdraw("A0", 0.5)  # triggers the sweep
+    assert limits.stats()["tracked_keys"] == 2
+    assert limits.stats()["slots"] == 100  # freed slots are reused, not grown
+    mgr.create("late", "owner0", 1)
+    mgr.withdraw("late", 1)
+    assert limits.stats()["slots"] == 100
+
+
+def test_limits_validate_rules():
+    with pytest.raises(ValueError):
+        VelocityLimits([Limit(60)])
+    with pytest.raises(ValueError):
+        VelocityLimits([Limit(60, max_count=1, scope="bank")])
+    with pytest.raises(ValueError):
+        VelocityLimits([Limit(0, max_count=1)])
+
+
+def test_concurrent_limits_hold_exactly():
+    mgr = ConcurrentAccountManager(limits=VelocityLimits([Limit(3600, max_count=100, scope="owner")]), stripes=4)
+    for i in range(8):
+        mgr.create(f"A{i}", "Alice", 1000)
+    rejected = []
+
+    def worker(account_id: str) -> None:
+        for _ in range(50):
+            try:
+                mgr.withdraw(account_id, 1)
+            except exc.LimitExceededError as e:
+                rejected.append(e)
+
+    threads = [threading.Thread(target=worker, args=(f"A{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(rejected) == 8 * 50 - 100
+    assert mgr.total_balance_minor() == (8 * 1000 - 100) * 100
@@ -2,27 +2,35 @@ import pytest
 
 try:
     from bank.manager import AccountManager  # type: ignore
+    from bank.sqlite_storage import SQLiteStorage  # type: ignore
     from bank import exceptions as exc  # type: ignore
 except Exception:  # pragma: no cover
     from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.sqlite_storage import SQLiteStorage  # type: ignore
     from src.bank import exceptions as exc  # type: ignore
 
-def test_create_and_get():
-    mgr = AccountManager()
+
+@pytest.fixture(params=["memory", "sqlite"])
+def mgr(request, tmp_path):
+    """The same manager tests run against every storage backend."""
+    storage = SQLiteStorage(tmp_path / "bank.db") if request.param == "sqlite" else None
+    with AccountManager(storage=storage) as mgr:  # closing the manager closes its storage
+        yield mgr
+
+
+def test_create_and_get(mgr):
     a = mgr.create("A1", "Alice", 100.0)
     assert mgr.get("A1") is a
     assert a.balance == 100.0
 
 
-def test_duplicate_create_raises():
-    mgr = AccountManager()
+def test_duplicate_create_raises(mgr):
     mgr.create("A1", "Alice", 0.0)
     with pytest.raises(exc.DuplicateAccountError):
         mgr.create("A1", "Bob", 0.0)
 
 
-def test_transfer_success():
-    mgr = AccountManager()
+def test_transfer_success(mgr):
     mgr.create("A1", "Alice", 1000.0)
     mgr.create("A2", "Bob", 500.0)
     mgr.transfer("A1", "A2", 200.0)
@@ -30,15 +38,13 @@ def test_transfer_success():
     assert pytest.approx(mgr.get("A2").balance) == 700.0
 
 
-def test_transfer_missing_account_raises():
-    mgr = AccountManager()
+def test_transfer_missing_account_raises(mgr):
     mgr.create("A1", "Alice", 100.0)
     with pytest.raises(exc.AccountNotFoundError):
         mgr.transfer("A1", "X", 50.0)
 
 
-def test_delete_and_list():
-    mgr = AccountManager()
+def test_delete_and_list(mgr):
     mgr.create("A1", "Alice", 10.0)
     mgr.create("A2", "Bob", 20.0)
     names = {a.name for a in mgr.list_accounts()}
@@ -46,3 +52,69 @@ def test_delete_and_list():
     mgr.delete("A1")
     assert mgr.get("A1") is None
 
+
+def test_apply_batch_reports_per_posting(mgr):
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 0.0)
+    results = mgr.apply_batch([("A1", "A2", 60.0), ("A1", "A2", 60.0), ("A1", "X", 1.0), ("A2", "A1", 10.0)])
+    assert results[0] is None and results[3] is None
+    assert isinstance(results[1], exc.InsufficientFundsError)
+    assert isinstance(results[2], exc.AccountNotFoundError)
+    assert pytest.approx(mgr.get("A1").balance) == 50.0
+    assert pytest.approx(mgr.get("A2").balance) == 50.0
+
+
+def test_apply_batch_atomic_rolls_back(mgr):
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 0.0)
+    with pytest.raises(exc.BatchError) as info:
+        mgr.apply_batch([("A1", "A2", 60.0), ("A2", "A1", 0.0)], atomic=True)
+    assert info.value.index == 1
+    assert isinstance(info.value.error, exc.NegativeAmountError)
+    assert mgr.get("A1").balance == 100.0
+    assert mgr.get("A2").balance == 0.0
+
+
+def test_apply_batch_accepts_columns(mgr):
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 0.0)
+    results = mgr.apply_batch(zip(["A1", "A1"], ["A2", "A2"], [10.0, 20.0]), atomic=True)
+    assert results == [None, None]
+    assert pytest.approx(mgr.get("A2").balance) == 30.0
+
+
+def test_apply_batch_accepts_numpy_minor_units(mgr):
+    np = pytest.importorskip("numpy")
+    mgr.create("A1", "Alice", 100.0)
+    mgr.create("A2", "Bob", 0.0)
+    amounts = np.array([1000, 250], dtype=np.int64)
+    assert mgr.apply_batch(zip(["A1", "A1"], ["A2", "A2"], amounts), minor_units=True) == [None, None]
+    assert mgr.get("A2").balance_minor == 1250
+    results = mgr.apply_batch([("A1", "A2", True), ("A1", "A2", 1.0)], minor_units=True)
+    assert all(isinstance(r, TypeError) for r in results)
+
+
+def test_create_many_is_all_or_nothing(mgr):
+    mgr.create("A1", "Alice", 1.0)
+    with pytest.raises(exc.DuplicateAccountError, match="'A1'"):
+        mgr.create_many([("B1", "Bob", 5), ("A1", "", 0)])
+    with pytest.raises(exc.DuplicateAccountError, match="'B2'"):
+        mgr.create_many([("B2", "Bob", 5), ("B2", "", 0)])
+    assert {a.name for a in mgr.list_accounts()} == {"A1"}
+    created = mgr.create_many([("B1", "Bob", 5), ("B2", "", 0.25)])
+    assert [(a.name, a.balance_minor) for a in created] == [("B1", 500), ("B2", 25)]
+    assert getattr(mgr.get("B1"), "owner", "") == "Bob"
+    assert mgr.total_balance_minor() == 625
+
+
+def test_withdraw_and_self_transfer(mgr):
+    mgr.create("A1", "Alice", 10.0)
+    assert mgr.withdraw("A1", 4) == 6.0
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.withdraw("A1", 7)
+    mgr.transfer("A1", "A1", 6)
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.transfer("A1", "A1", 7)
+    with pytest.raises(exc.NegativeAmountError):
+        mgr.deposit("A1", 0)
+    assert mgr.get("A1").balance_minor == 600
@@ -0,0 +1,87 @@
+import pytest
+
+try:
+    import cli  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+
+try:
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.exceptions import StorageError  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.mapped import MappedBook, write_mapped  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.exceptions import StorageError  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.mapped import MappedBook, write_mapped  # type: ignore
+
+
+@pytest.fixture()
+def book(tmp_path):
+    mgr = AccountManager()
+    for i in range(500):
+        mgr.create(f"ACC{i:04d}", "Alice" if i % 2 else "", i)
+    mgr.create("Zoë", "Zoë", 1.5)
+    path = tmp_path / "book.map"
+    assert mgr.export_mapped(path) == 501
+    with MappedBook(path) as book:
+        yield book
+
+
+def test_get_and_list_read_the_mapping(book):
+    acct = book.get("ACC0042")
+    assert (acct.name, acct.owner, acct.balance_minor, acct.balance) == ("ACC0042", "", 4200, 42.0)
+    assert book.get("Zoë").owner == "Zoë" and book.get("Zoë").balance_minor == 150
+    assert book.get("ACC9999") is None and "ACC0001" in book and "nope" not in book
+    accounts = book.list_accounts()
+    assert len(accounts) == len(book) == 501
+    assert [a.name for a in accounts[:3]] == ["ACC0000", "ACC0001", "ACC0002"]
+    assert accounts[-1].name == "Zoë" and accounts[499].owner == "Alice"
+    assert sum(a.balance_minor for a in accounts) == book.total_balance_minor() == sum(range(500)) * 100 + 150
+    with pytest.raises(AttributeError):
+        acct.deposit(1)  # read-only
+
+
+def test_page_by_prefix(book):
+    total, page = book.page_accounts(0, 3, prefix="ACC01")
+    assert total == 100
+    assert [a.name for a in page] == ["ACC0100", "ACC0101", "ACC0102"]
+    total, page = book.page_accounts(98, 5, prefix="ACC01")
+    assert [a.name for a in page] == ["ACC0198", "ACC0199"]
+    assert book.page_accounts(0, 10, prefix="X") == (0, [])
+    assert book.page_accounts(500, 10)[1][0].name == "Zoë"
+
+
+def test_empty_and_invalid_files(tmp_path):
+    path = tmp_path / "empty.map"
+    assert write_mapped(path, []) == 0
+    with MappedBook(path) as book:
+        assert len(book) == 0 and book.get("A") is None and book.page_accounts() == (0, [])
+    (tmp_path / "bad.map").write_bytes(b"not a book")
+    with pytest.raises(StorageError):
+        MappedBook(tmp_path / "bad.map")
+    with pytest.raises(ValueError):
+        write_mapped(tmp_path / "dup.map", [("A", "", 1), ("A", "", 2)])
+
+
+def test_export_is_atomic_replace_and_consistent(tmp_path):
+    mgr = ConcurrentAccountManager(stripes=4)
+    mgr.create("A1", "", 10)
+    path = tmp_path / "book.map"
+    mgr.export_mapped(path)
+    with MappedBook(path) as old:
+        mgr.deposit("A1", 5)
+        mgr.export_mapped(path)
+        assert old.get("A1").balance_minor == 1000  # the open mapping keeps the old file
+    with MappedBook(path) as new:
+        assert new.get("A1").balance_minor == 1500
+
+
+def test_cli_exports_mapped_book(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,12.34\n")
+    path = tmp_path / "book.map"
+    assert cli.main(["--batch", str(commands), "--export-mapped", str(path)]) == 0
+    with MappedBook(path) as book:
+        assert book.get("A1").balance_minor == 1234
@@ -0,0 +1,115 @@
+import signal
+
+import pytest
+
+try:
+    import cli  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.metrics import Histogram, Metrics, Profiler  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.metrics import Histogram, Metrics, Profiler  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+
+def test_histogram_percentiles_within_bucket_error():
+    hist = Histogram()
+    for ns in range(1, 100_001):
+        hist.record(ns)
+    assert hist.count == 100_000
+    for q in (50, 90, 99):
+        assert abs(hist.percentile(q) - q * 1_000) <= q * 1_000 * 0.0625
+    assert hist.percentile(100) == hist.max_ns
+    assert 100_000 <= hist.max_ns <= 100_000 * 1.0625
+    assert hist.cumulative([15, 1_000_000]) == [15, 100_000]
+
+
+def test_manager_counts_calls_and_errors():
+    metrics = Metrics()
+    mgr = AccountManager(metrics=metrics)
+    mgr.create("A1", "", 10.0)
+    mgr.create("A2")
+    mgr.transfer("A1", "A2", 4.0)
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.transfer("A2", "A1", 40.0)
+    with pytest.raises(exc.AccountNotFoundError):
+        mgr.deposit("missing", 1.0)
+    mgr.get("A1")
+
+    ops = metrics.snapshot()["ops"]
+    assert ops["create"]["count"] == 2
+    assert ops["transfer"]["count"] == 2
+    assert ops["transfer"]["errors"] == {"InsufficientFundsError": 1}
+    assert ops["deposit"]["errors"] == {"AccountNotFoundError": 1}
+    assert ops["get"]["count"] == 1  # transfer's own lookups are not counted
+    assert ops["transfer"]["p99_us"] >= ops["transfer"]["p50_us"] > 0
+
+    metrics.reset()
+    mgr.get("A1")
+    assert metrics.snapshot()["ops"]["get"]["count"] == 1
+
+
+def test_disabled_metrics_leave_class_methods_in_place():
+    mgr = AccountManager()
+    assert "transfer" not in vars(mgr)
+    assert "transfer" in vars(AccountManager(metrics=Metrics()))
+
+
+def test_concurrent_manager_counts_each_call_once():
+    metrics = Metrics()
+    mgr = ConcurrentAccountManager(metrics=metrics, stripes=2)
+    mgr.create("A1", "", 5.0)
+    mgr.withdraw("A1", 1.0)
+    assert metrics.snapshot()["ops"]["withdraw"]["count"] == 1
+
+
+def test_prometheus_text(tmp_path):
+    metrics = Metrics()
+    mgr = AccountManager(metrics=metrics)
+    mgr.create("A1")
+    with pytest.raises(exc.DuplicateAccountError):
+        mgr.create("A1")
+    text = metrics.to_prometheus()
+    assert "# TYPE bank_operation_duration_seconds histogram" in text
+    assert 'bank_operations_total{op="create"} 2' in text
+    assert 'bank_operation_errors_total{op="create",error="DuplicateAccountError"} 1' in text
+    assert 'bank_operation_duration_seconds_bucket{op="create",le="+Inf"} 2' in text
+    path = tmp_path / "bank.prom"
+    metrics.write_prometheus(path)
+    assert path.read_text() == text
+
+
+def test_profiler_reports_hot_paths():
+    profiler = Profiler()
+    profiler.start()
+    mgr = AccountManager()
+    for i in range(100):
+        mgr.create(f"A{i}")
+    profiler.stop()
+    report = profiler.report(10)
+    assert "cumulative" in report and "create" in report
+
+
+def test_cli_writes_metrics_file(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,,1\nwithdraw,A1,5\n")
+    prom = tmp_path / "bank.prom"
+    assert cli.main(["--batch", str(commands), "--metrics-file", str(prom), "--profile"]) == 1
+    assert 'bank_operation_errors_total{op="withdraw",error="InsufficientFundsError"} 1' in prom.read_text()
+    assert "cumulative" in capsys.readouterr().err
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="POSIX only")
+def test_plain_batch_leaves_sigusr1_alone(tmp_path):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,,1\n")
+    previous = signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    try:
+        assert cli.main(["--batch", str(commands)]) == 0
+        assert signal.getsignal(signal.SIGUSR1) is signal.SIG_DFL
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
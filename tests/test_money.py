@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+
+try:
+    from bank import money  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank import money  # type: ignore
+
+
+@pytest.mark.parametrize(
+    "amount, minor",
+    [
+        (0, 0),
+        (12, 1200),
+        (0.1, 10),
+        (19.99, 1999),
+        (1.005, 100),  # tie -> even
+        (1.015, 102),  # tie -> even
+        (0.125, 12),
+        (0.135, 14),
+        (-2.5, -250),
+        (Decimal("1234.565"), 123456),
+        (True, 100),
+    ],
+)
+def test_to_minor_rounding(amount, minor):
+    assert money.to_minor(amount) == minor
+
+
+def test_to_minor_rejects_bad_input():
+    with pytest.raises(TypeError):
+        money.to_minor("1.00")
+    with pytest.raises(ValueError):
+        money.to_minor(float("nan"))
+    with pytest.raises(ValueError):
+        money.to_minor(float("inf"))
+    for huge in (1e17, 10**17, Decimal("-1e17")):
+        with pytest.raises(ValueError):
+            money.to_minor(huge)  # minor units beyond int64
+    with pytest.raises(ValueError):
+        money.parse("100000000000000000")
+    assert money.to_minor(92233720368547758) == 9223372036854775800
+
+
+def test_parse_and_format_roundtrip():
+    assert money.parse("1,234.56") == 123456
+    assert money.format_minor(123456) == "1,234.56"
+    assert money.format_minor(-5) == "-0.05"
+    assert money.format_minor(123456, thousands=False) == "1234.56"
+    with pytest.raises(ValueError):
+        money.parse("abc")
+
+
+def test_as_minor_accepts_integer_types_only():
+    np = pytest.importorskip("numpy")
+    assert money.as_minor(5) == 5
+    value = money.as_minor(np.int64(7))
+    assert value == 7 and type(value) is int
+    for bad in (True, 1.0, Decimal(1), "1"):
+        with pytest.raises(TypeError):
+            money.as_minor(bad)
@@ -0,0 +1,124 @@
+import gc
+import threading
+
+import pytest
+
+try:
+    from bank.accrual import Schedule, Tier  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.sqlite_storage import SQLiteStorage  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.accrual import Schedule, Tier  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.sqlite_storage import SQLiteStorage  # type: ignore
+
+
+def book(snap):
+    return {account_id: (owner, balance) for account_id, owner, balance in snap.rows()}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def mgr(request, tmp_path):
+    storage = SQLiteStorage(tmp_path / "bank.db") if request.param == "sqlite" else None
+    m = AccountManager(storage=storage)
+    yield m
+    m.close()
+
+
+def test_snapshot_is_isolated_from_every_kind_of_write(mgr):
+    mgr.create("A1", "Alice", 100)
+    mgr.create("A2", "Bob", 50)
+    mgr.create("A3", "", 10)
+    with mgr.snapshot() as snap:
+        before = {"A1": ("Alice", 10_000), "A2": ("Bob", 5000), "A3": ("", 1000)}
+        mgr.deposit("A1", 1)
+        mgr.withdraw("A2", 2)
+        mgr.transfer("A1", "A2", 3)
+        mgr.apply_batch([("A2", "A1", 500), ("A3", "A1", 100)], minor_units=True)
+        mgr.end_of_day(Schedule(tiers=[Tier(0, "0.365")]))
+        mgr.delete("A3")
+        mgr.create("A4", "Dan", 7)
+        mgr.create_many([("A5", "", 1)])
+        assert book(snap) == before
+        assert snap.get("A1") == 10_000 and snap.get("A4") is None and "A3" in snap
+        assert (len(snap), snap.total_minor()) == (3, 16_000)
+        with mgr.snapshot() as later:
+            assert set(book(later)) == {"A1", "A2", "A4", "A5"}
+            assert later.version > snap.version
+            assert later.total_minor() == mgr.total_balance_minor()
+    with pytest.raises(ValueError):
+        snap.get("A1")
+
+
+def test_saved_states_are_reclaimed():
+    mgr = AccountManager()
+    mgr.create_many([("A1", "", 100), ("A2", "", 0)])
+    mgr.transfer("A1", "A2", 1)  # no snapshot open: nothing is saved
+    assert mgr._versions is None
+    old = mgr.snapshot()
+    mgr.transfer("A1", "A2", 1)
+    mgr.transfer("A1", "A2", 1)  # same version: the first state is the one kept
+    assert mgr._versions.saved == {"A1": ((1, 9900, ""),), "A2": ((1, 100, ""),)}
+    new = mgr.snapshot()
+    mgr.deposit("A1", 1)
+    assert len(mgr._versions.saved["A1"]) == 2
+    old.close()
+    newest = mgr.snapshot()
+    mgr.deposit("A1", 1)  # ``old`` is closed: the state only it could read is pruned
+    assert [stamp for stamp, _, _ in mgr._versions.saved["A1"]] == [2, 3]
+    assert (new.get("A1"), new.get("A2")) == (9700, 300)
+    assert newest.get("A1") == 9800
+    del new, newest
+    gc.collect()
+    assert mgr._versions.live == 0 and mgr._versions.saved == {}
+    mgr.deposit("A2", 1)
+    assert mgr._versions.saved == {}
+
+
+def test_readers_see_exact_totals_while_threads_transfer():
+    mgr = ConcurrentAccountManager(stripes=8)
+    mgr.create_many([(f"A{i}", "", 100) for i in range(32)])
+    total = 32 * 10_000
+    done = threading.Event()
+    errors = []
+
+    def writer(seed: int) -> None:
+        try:
+            n = 0
+            while not done.is_set():
+                mgr.transfer(f"A{(seed + n) % 32}", f"A{(seed * 7 + n + 1) % 32}", 0.01)
+                n += 1
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    try:
+        for _ in range(200):
+            with mgr.snapshot() as snap:
+                assert snap.total_minor() == total
+                assert len(snap) == 32
+    finally:
+        done.set()
+        for t in threads:
+            t.join()
+    assert errors == []
+    assert mgr._versions.saved == {}
+
+
+def test_sqlite_snapshot_does_not_block_writers(tmp_path):
+    db = tmp_path / "bank.db"
+    with AccountManager(storage=SQLiteStorage(db, timeout=0.5)) as mgr:
+        mgr.create_many([("A1", "", 100), ("A2", "", 0)])
+        snap = mgr.snapshot()
+        with AccountManager(storage=SQLiteStorage(db, timeout=0.5)) as other:
+            other.transfer("A1", "A2", 40)  # another process commits while the snapshot is open
+            other.create("A3", "", 1)
+        assert book(snap) == {"A1": ("", 10_000), "A2": ("", 0)}
+        assert mgr.get("A2").balance_minor == 4000
+        snap.close()
+        with mgr.snapshot() as snap:
+            assert snap.total_minor() == 10_100
@@ -0,0 +1,149 @@
+import io
+
+import pandas as pd
+import pytest
+
+try:
+    import cli  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+
+try:
+    from bank import reporting  # type: ignore
+    from bank.ledger import Ledger  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank import reporting  # type: ignore
+    from src.bank.ledger import Ledger  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+
+DAY = 86_400 * 1_000_000_000
+
+
+class DayClock:
+    """Nanosecond clock the test moves from day to day."""
+
+    def __init__(self) -> None:
+        self.now = DAY
+
+    def __call__(self) -> int:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> DayClock:
+    return DayClock()
+
+
+@pytest.fixture()
+def mgr(clock: DayClock) -> AccountManager:
+    mgr = AccountManager(ledger=Ledger(capacity=100, clock=clock))
+    mgr.create("A1", "Alice", 10)
+    mgr.create("A2", "Bob", 0)
+    mgr.create("A3", "Alice", 1)
+    clock.now = 2 * DAY
+    mgr.deposit("A1", 5)
+    mgr.transfer("A1", "A2", 3)
+    clock.now = 4 * DAY
+    mgr.withdraw("A2", 1)
+    mgr.transfer("A1", "A1", 1)
+    return mgr
+
+
+def test_statement_running_balance(mgr: AccountManager):
+    frame = reporting.statement(mgr, "A1")
+    assert list(frame["kind"]) == ["create", "deposit", "transfer", "transfer"]
+    assert list(frame["amount_minor"]) == [1000, 500, -300, 0]  # a self-transfer nets to 0
+    assert list(frame["balance_minor"]) == [1000, 1500, 1200, 1200]
+    assert frame["counterparty"].iloc[2] == "A2"
+
+    window = reporting.statement(mgr, "A1", start=2 * DAY, end=3 * DAY)
+    assert list(window["amount_minor"]) == [500, -300]
+    assert window.attrs == {"opening_minor": 1000, "closing_minor": 1200}
+
+
+def test_deleted_account_history(mgr: AccountManager, clock: DayClock):
+    clock.now = 6 * DAY
+    mgr.delete("A1")
+    frame = reporting.statement(mgr, "A1")
+    assert list(frame["kind"]) == ["create", "deposit", "transfer", "transfer", "delete"]
+    assert list(frame["balance_minor"]) == [1000, 1500, 1200, 1200, 0]
+    assert frame.attrs == {"opening_minor": 0, "closing_minor": 0}
+    daily = reporting.daily_balances(mgr)
+    assert daily[daily["account_id"] == "A1"][["net_minor", "closing_minor"]].values.tolist() == [
+        [1000, 1000],
+        [200, 1200],
+        [0, 1200],
+        [-1200, 0],
+    ]
+
+
+def test_daily_balances_are_chunk_size_independent(mgr: AccountManager):
+    daily = reporting.daily_balances(mgr)
+    assert daily[daily["account_id"] == "A2"][["net_minor", "closing_minor"]].values.tolist() == [
+        [0, 0],
+        [300, 300],
+        [-100, 200],
+    ]
+    assert [str(d) for d in daily["date"].unique()] == ["1970-01-02", "1970-01-03", "1970-01-05"]
+    for rows in (1, 2, 3, 5):
+        chunks = list(reporting.daily_balance_chunks(mgr, chunk_rows=rows))
+        assert pd.concat(chunks[::-1], ignore_index=True).equals(daily)
+
+
+def test_daily_balances_window(mgr: AccountManager):
+    daily = reporting.daily_balances(mgr, start=2 * DAY, end=3 * DAY)
+    assert daily[["account_id", "net_minor", "closing_minor"]].values.tolist() == [
+        ["A1", 200, 1200],
+        ["A2", 300, 300],
+    ]
+
+
+def test_owner_summary(mgr: AccountManager):
+    summary = reporting.owner_summary(mgr).set_index("owner")
+    assert summary.loc["Alice"].to_dict() == {
+        "accounts": 2,
+        "total_minor": 1300,
+        "mean_minor": 650,
+        "min_minor": 100,
+        "max_minor": 1200,
+    }
+    assert summary.loc["Bob", "total_minor"] == 200
+
+
+def test_chunked_exports(mgr: AccountManager, tmp_path):
+    out = io.StringIO()
+    assert reporting.write_csv(reporting.ledger_chunks(mgr, chunk_rows=2), out) == 7
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "seq,time,kind,src,dst,amount_minor"
+    assert len(lines) == 8  # the header is written once
+
+    path = tmp_path / "ledger.parquet"
+    assert reporting.export(mgr, "ledger", path) == 7
+    frame = pd.read_parquet(path)
+    assert list(frame["amount_minor"]) == [1000, 0, 100, 500, 300, 100, 100]
+    assert frame["src"].isna().sum() == 4
+
+
+def test_reports_need_a_ledger():
+    mgr = AccountManager()
+    mgr.create("A1", "Alice", 1)
+    assert len(reporting.accounts_frame(mgr)) == 1
+    with pytest.raises(ValueError):
+        reporting.statement(mgr, "A1")
+    with pytest.raises(ValueError):
+        reporting.export(mgr, "nope", io.StringIO())
+
+
+def test_cli_report(tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,10\ncreate,A2,Bob,0\ntransfer,A1,A2,2.50\n")
+    assert cli.main(["--batch", str(commands), "--report", "statement", "--account", "A1"]) == 0
+    out = capsys.readouterr().out
+    assert "time,kind,counterparty,amount_minor,balance_minor" in out
+    assert out.rstrip().endswith(",transfer,A2,-250,750")
+
+    dest = tmp_path / "owners.parquet"
+    assert cli.main(["--batch", str(commands), "--report", "owners", "--report-out", str(dest)]) == 0
+    assert pd.read_parquet(dest)["total_minor"].tolist() == [750, 250]
@@ -0,0 +1,187 @@
+import asyncio
+import collections
+import json
+
+import pytest
+
+try:
+    from bank.client import BankClient  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.server import BankServer  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.client import BankClient  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.server import BankServer  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+
+def _with_server(scenario, manager=None):
+    async def main():
+        server = BankServer(manager or AccountManager())
+        await server.start()
+        host, port = server.address[:2]
+        try:
+            return await scenario(server, host, port)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_client_roundtrip_and_errors():
+    async def scenario(server, host, port):
+        async with await BankClient.connect(host, port) as client:
+            created = await client.create("A1", "Alice", "100.10")
+            assert created == {"id": "A1", "owner": "Alice", "balance_minor": 10010}
+            await client.create("A2")
+            assert await client.deposit("A2", 5) == 500
+            await client.transfer("A1", "A2", "0.10")
+            with pytest.raises(exc.InsufficientFundsError):
+                await client.withdraw("A2", 1000)
+            with pytest.raises(exc.AccountNotFoundError):
+                await client.transfer("A1", "X", 1)
+            assert await client.apply_batch([("A1", "A2", 1), ("A2", "A1", 10_000)]) == [
+                None,
+                "InsufficientFundsError",
+            ]
+            assert (await client.get("A2"))["balance_minor"] == 610
+            await client.delete("A2")
+            assert await client.get("A2") is None
+
+    _with_server(scenario)
+
+
+def test_pipelined_clients_conserve_money():
+    async def scenario(server, host, port):
+        clients = [await BankClient.connect(host, port) for _ in range(20)]
+        await clients[0].create("A", "", 1000)
+        await clients[0].create("B", "", 1000)
+        calls = []
+        for i, client in enumerate(clients):
+            for _ in range(50):
+                src, dst = ("A", "B") if i % 2 else ("B", "A")
+                calls.append(client.transfer(src, dst, 1))
+        await asyncio.gather(*calls)
+        a = await clients[0].get("A")
+        b = await clients[0].get("B")
+        for client in clients:
+            await client.close()
+        return a["balance_minor"] + b["balance_minor"]
+
+    assert _with_server(scenario) == 200_000
+
+
+def test_protocol_errors_keep_connection_usable():
+    async def scenario(server, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"not json\n")
+        writer.write(json.dumps({"id": 1, "op": "nope"}).encode() + b"\n")
+        writer.write(json.dumps({"id": 2, "op": "get", "args": {"account_id": "A"}}).encode() + b"\n")
+        responses = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.close()
+        return responses
+
+    first, second, third = _with_server(scenario)
+    assert first["error"] == second["error"] == "ProtocolError"
+    assert third == {"id": 2, "ok": True, "result": None}
+
+
+def test_acknowledged_mutations_are_journaled(tmp_path):
+    async def scenario(server, host, port):
+        async with await BankClient.connect(host, port) as client:
+            await client.create("A1", "", "10.00")
+            await client.deposit("A1", "2.50")
+
+    _with_server(scenario, AccountManager.open(tmp_path, fsync=False, group_size=10**6, group_interval=3600))
+    with AccountManager.open(tmp_path) as mgr:
+        assert mgr.get("A1").balance_minor == 1250
+
+
+def test_malformed_requests_do_not_stop_the_server(tmp_path):
+    bad = [
+        {"id": 1, "op": ["x"]},
+        {"id": 2, "op": "create", "args": {"account_id": "A2", "initial": 10**20}},
+        {"id": 3, "op": "create", "args": {"account_id": 5}},
+        {"id": 4, "op": "create", "args": ["A3"]},
+        {"id": 5, "op": "batch", "args": {"postings": [[1, "A1", 1]]}},
+        {"id": 6, "op": "boom"},
+    ]
+
+    def boom():
+        raise RuntimeError("bug")
+
+    async def scenario(server, host, port):
+        server._ops["boom"] = boom
+        reader, writer = await asyncio.open_connection(host, port)
+        for request in bad + [{"id": 7, "op": "create", "args": {"account_id": "A1", "initial": 1}}]:
+            writer.write(json.dumps(request).encode() + b"\n")
+        responses = [json.loads(await reader.readline()) for _ in range(len(bad) + 1)]
+        writer.close()
+        return responses
+
+    responses = _with_server(scenario, AccountManager.open(tmp_path, fsync=False))
+    assert [r["error"] for r in responses[:-1]] == [
+        "ProtocolError",
+        "ValueError",
+        "TypeError",
+        "TypeError",
+        "TypeError",
+        "InternalError",
+    ]
+    assert responses[-1] == {"id": 7, "ok": True, "result": {"id": "A1", "owner": "", "balance_minor": 100}}
+    with AccountManager.open(tmp_path) as mgr:
+        assert [a.name for a in mgr.list_accounts()] == ["A1"]
+
+
+def test_balances_stay_exact_and_lists_are_paged():
+    async def scenario(server, host, port):
+        async with await BankClient.connect(host, port) as client:
+            await client.create("B", "", "123456789012345.67")
+            await client.create("A")
+            assert await client.deposit("B", "0.01") == 12345678901234568
+            assert await client.withdraw("B", "0.02") == 12345678901234566
+            assert [a["id"] for a in await client.list_accounts(offset=1, limit=5)] == ["B"]
+
+    _with_server(scenario)
+
+
+class _TrackedQueue(collections.deque):
+    longest = 0
+
+    def append(self, item):
+        super().append(item)
+        self.longest = max(self.longest, len(self))
+
+
+def test_connection_queue_is_bounded_and_sync_errors_are_reported():
+    manager = AccountManager()
+    failures = [OSError("disk full")]
+
+    def sync():
+        if failures:
+            raise failures.pop()
+
+    manager.sync = sync
+
+    async def main():
+        server = BankServer(manager, max_pending=2)
+        server._queue = queue = _TrackedQueue()
+        await server.start()
+        host, port = server.address[:2]
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            for i in range(20):
+                request = {"id": i, "op": "create", "args": {"account_id": f"A{i}"}}
+                writer.write(json.dumps(request).encode() + b"\n")
+            responses = [json.loads(await reader.readline()) for _ in range(20)]
+            writer.close()
+            return queue.longest, responses
+        finally:
+            await server.close()
+
+    longest, responses = asyncio.run(main())
+    assert longest <= 2
+    assert [r["id"] for r in responses] == list(range(20))
+    assert responses[0]["error"] == "OSError"
+    assert all(r["ok"] for r in responses[-5:])
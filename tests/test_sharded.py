@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+try:
+    from bank.sharded import ShardedAccountManager, shard_of  # type: ignore
+    from bank import exceptions as exc  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank.sharded import ShardedAccountManager, shard_of  # type: ignore
+    from src.bank import exceptions as exc  # type: ignore
+
+
+@pytest.fixture()
+def mgr():
+    with ShardedAccountManager(shards=3) as mgr:
+        yield mgr
+
+
+def _cross_shard_pair(shards: int):
+    ids = [f"A{i}" for i in range(100)]
+    src = ids[0]
+    dst = next(a for a in ids if shard_of(a, shards) != shard_of(src, shards))
+    return src, dst
+
+
+def test_single_account_operations(mgr):
+    acct = mgr.create("A1", "Alice", 10.0)
+    assert (acct.name, acct.owner, acct.balance_minor) == ("A1", "Alice", 1000)
+    assert mgr.deposit("A1", 2.5) == 12.5
+    assert mgr.withdraw("A1", 0.5) == 12.0
+    with pytest.raises(exc.DuplicateAccountError):
+        mgr.create("A1")
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.withdraw("A1", 100)
+    mgr.delete("A1")
+    assert mgr.get("A1") is None
+
+
+def test_cross_shard_transfer_commits_and_aborts(mgr):
+    src, dst = _cross_shard_pair(3)
+    mgr.create(src, "", 50.0)
+    mgr.create(dst, "", 0.0)
+    mgr.transfer(src, dst, 20.0)
+    assert (mgr.get(src).balance_minor, mgr.get(dst).balance_minor) == (3000, 2000)
+
+    with pytest.raises(exc.InsufficientFundsError):
+        mgr.transfer(src, dst, 31.0)
+    mgr.delete(dst)
+    with pytest.raises(exc.AccountNotFoundError):
+        mgr.transfer(src, dst, 5.0)  # source was debited in phase one, then refunded
+    assert mgr.get(src).balance_minor == 3000
+    assert mgr.total_balance_minor() == 3000
+
+
+def test_batch_orders_commands_per_shard(mgr):
+    src, dst = _cross_shard_pair(3)
+    results = mgr.execute(
+        [
+            ("create", src, "", 10),
+            ("create", dst, "", 0),
+            ("transfer", src, dst, 4),
+            ("withdraw", src, 7),  # runs after the reserve on the source shard
+            ("transfer_minor", dst, src, 100),  # dst is credited only when the batch commits
+            ("bogus", src),
+        ]
+    )
+    assert results[2] is None
+    assert isinstance(results[3], exc.InsufficientFundsError)
+    assert isinstance(results[4], exc.InsufficientFundsError)
+    assert isinstance(results[5], ValueError)
+    assert mgr.get(dst).balance_minor == 400
+
+
+def test_random_workload_conserves_money(mgr):
+    ids = [f"ACC{i}" for i in range(60)]
+    mgr.execute([("create", a, "", 100) for a in ids])
+    rng = random.Random(5)
+    for _ in range(5):
+        postings = [(rng.choice(ids), rng.choice(ids), rng.randint(1, 20_000)) for _ in range(500)]
+        results = mgr.apply_batch(postings, minor_units=True)
+        assert any(r is None for r in results)
+    assert mgr.total_balance_minor() == 600_000
+    assert sum(a.balance_minor for a in mgr.list_accounts()) == 600_000
+    assert all(a.balance_minor >= 0 for a in mgr.list_accounts())
+
+
+def test_atomic_batch_is_all_or_nothing(mgr):
+    src, dst = _cross_shard_pair(3)
+    mgr.execute([("create", src, "", 10), ("create", dst, "", 10), ("create", "S", "", 10)])
+    assert mgr.apply_batch([(src, dst, 4), (dst, src, 1), ("S", "S", 2)], atomic=True) == [None] * 3
+    balances = {a.name: a.balance_minor for a in mgr.list_accounts()}
+    assert balances == {src: 700, dst: 1300, "S": 1000}
+
+    with pytest.raises(exc.BatchError) as info:
+        mgr.apply_batch([(src, dst, 500), ("S", dst, 1), (dst, "missing", 100)], atomic=True, minor_units=True)
+    assert info.value.index == 2 and isinstance(info.value.error, exc.AccountNotFoundError)
+    with pytest.raises(exc.BatchError) as info:
+        mgr.apply_batch([(src, dst, 5), (src, dst, 5)], atomic=True)  # the first one reserved the funds
+    assert info.value.index == 1 and isinstance(info.value.error, exc.InsufficientFundsError)
+    with pytest.raises(exc.BatchError) as info:
+        mgr.apply_batch([(src, dst, 1), (src, dst, "x")], atomic=True)
+    assert info.value.index == 1
+    assert {a.name: a.balance_minor for a in mgr.list_accounts()} == balances
+    assert mgr.total_balance_minor() == 3000
@@ -0,0 +1,95 @@
+"""Cold-start budget for one-shot CLI runs, measured with ``python -X importtime``."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+CLI = ROOT / "src" / "cli.py"
+
+# total import time of a one-shot batch run, excluding interpreter startup (site)
+STARTUP_BUDGET_MS = 40
+# optional features a one-shot batch must not load
+HEAVY_MODULES = [
+    "asyncio",
+    "bank.accrual",
+    "bank.aggregates",
+    "bank.ledger",
+    "bank.limits",
+    "bank.reporting",
+    "bank.sharded",
+    "bank.sqlite_storage",
+    "cProfile",
+    "multiprocessing",
+    "pandas",
+    "pstats",
+    "sqlite3",
+    "tempfile",
+]
+
+
+def _importtime(args: List[str], cwd: Path) -> Dict[str, int]:
+    """Self import time (µs) of each module the program imports after ``site``."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PYTHON")}
+    cmd = [sys.executable, "-X", "importtime", *args]
+    # compile to __pycache__ first: a deployed CLI does not recompile on every start
+    subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, check=True)
+    err = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, check=True).stderr
+    modules: Dict[str, int] = {}
+    after_site = False
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if after_site and self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+        elif name.strip() == "site":
+            after_site = True
+    return modules
+
+
+def test_one_shot_batch_skips_optional_features(tmp_path):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,10\ntransfer,A1,A1,1\n")
+    modules = _importtime([str(CLI), "--batch", str(commands)], tmp_path)
+    assert "bank.manager" in modules
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+
+
+def test_one_shot_batch_import_budget(tmp_path):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,10\n")
+    # best of three: the least disturbed by the rest of the machine
+    best = min(
+        sum(_importtime([str(CLI), "--batch", str(commands)], tmp_path).values()) for _ in range(3)
+    )
+    assert best / 1000 < STARTUP_BUDGET_MS, f"imports took {best / 1000:.1f}ms"
+
+
+def test_bank_package_loads_exports_lazily():
+    code = (
+        "import sys, bank\n"
+        "assert [m for m in sys.modules if m.startswith('bank.')] == [], sys.modules\n"
+        "from bank.manager import AccountManager\n"
+        "assert bank.AccountManager is AccountManager\n"
+        "assert bank.exceptions.BankingError.__module__ == 'bank.exceptions'\n"
+        "assert 'bank.metrics' not in sys.modules\n"
+        "try:\n"
+        "    bank.missing\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise SystemExit('expected AttributeError')\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_cli_runs_as_module_from_repo_root():
+    out = subprocess.run(
+        [sys.executable, "-m", "src.cli", "--help"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert "--batch" in out
@@ -0,0 +1,217 @@
+import threading
+
+import pytest
+
+try:
+    import cli  # type: ignore
+except Exception:  # pragma: no cover
+    from src import cli  # type: ignore
+
+try:
+    from bank import exceptions as exc  # type: ignore
+    from bank.accrual import Schedule, Tier  # type: ignore
+    from bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from bank.limits import Limit, VelocityLimits  # type: ignore
+    from bank.manager import AccountManager  # type: ignore
+    from bank.sqlite_storage import SQLiteStorage  # type: ignore
+except Exception:  # pragma: no cover
+    from src.bank import exceptions as exc  # type: ignore
+    from src.bank.accrual import Schedule, Tier  # type: ignore
+    from src.bank.concurrent import ConcurrentAccountManager  # type: ignore
+    from src.bank.limits import Limit, VelocityLimits  # type: ignore
+    from src.bank.manager import AccountManager  # type: ignore
+    from src.bank.sqlite_storage import SQLiteStorage  # type: ignore
+
+
+@pytest.fixture()
+def db(tmp_path):
+    return tmp_path / "bank.db"
+
+
+def balances(mgr: AccountManager):
+    return {a.name: a.balance_minor for a in mgr.list_accounts()}
+
+
+def test_book_is_durable_and_shared(db):
+    with AccountManager(storage=SQLiteStorage(db)) as one, AccountManager(storage=SQLiteStorage(db)) as two:
+        one.create_many([("A1", "Alice", 100), ("A2", "Bob", 0)])
+        cached = one.get("A1")
+        two.transfer("A1", "A2", 30)
+        # the other connection committed, so the cached account is re-read
+        assert one.get("A1").balance_minor == 7000
+        assert cached is not one.get("A2")
+        two.delete("A2")
+        assert one.get("A2") is None
+    with AccountManager(storage=SQLiteStorage(db)) as mgr:
+        assert balances(mgr) == {"A1": 7000}
+        assert mgr.get("A1").owner == "Alice"
+
+
+def test_conditional_updates_refuse_stale_views(db):
+    one = AccountManager(storage=SQLiteStorage(db), limits=VelocityLimits([Limit(60, max_count=10)]))
+    two = AccountManager(storage=SQLiteStorage(db))
+    one.create("A1", "", 10)
+    one.create("A2", "", 0)
+    src, dst = one.get("A1"), one.get("A2")
+    two.withdraw("A1", 8)
+    # ``one`` still holds a balance of 10.00; the database has 2.00
+    with pytest.raises(exc.InsufficientFundsError):
+        one.storage.withdraw(src, 500)
+    assert src.balance_minor == 200  # refreshed from the database
+    src.balance_minor = 1000
+    with pytest.raises(exc.InsufficientFundsError):
+        one.storage.transfer(src, dst, 500)
+    two.delete("A2")
+    with pytest.raises(exc.AccountNotFoundError):
+        one.storage.transfer(src, dst, 100)
+    assert balances(two) == {"A1": 200}  # neither row changed
+    # a refused withdrawal does not use up a velocity-limit slot
+    one.storage._cache["A1"].balance_minor = 1000
+    with pytest.raises(exc.InsufficientFundsError):
+        one.withdraw("A1", 5)
+    assert [(count, outflow) for _, count, outflow in one.limits.usage("A1")] == [(0, 0)]
+    one.close()
+    two.close()
+
+
+def test_batches_and_end_of_day_are_transactions(db):
+    mgr = AccountManager(storage=SQLiteStorage(db))
+    other = AccountManager(storage=SQLiteStorage(db))
+    mgr.create_many([("A1", "", 100), ("A2", "", 0)])
+    with pytest.raises(exc.BatchError):
+        mgr.apply_batch([("A1", "A2", 60), ("A1", "A2", 60)], atomic=True)
+    assert balances(other) == {"A1": 10_000, "A2": 0}
+    results = mgr.apply_batch([("A1", "A2", 60), ("A1", "A2", 60), ("A2", "A1", 10)])
+    assert results[0] is None and isinstance(results[1], exc.InsufficientFundsError)
+    assert balances(other) == {"A1": 5000, "A2": 5000}
+    mgr.end_of_day(Schedule(tiers=[Tier(0, "0.0365")]), days=10)
+    assert balances(other) == {"A1": 5005, "A2": 5005}
+    mgr.close()
+    other.close()
+
+
+def test_threads_share_one_sqlite_book(db):
+    mgr = ConcurrentAccountManager(storage=SQLiteStorage(db), stripes=4)
+    mgr.create_many([(f"A{i}", "", 100) for i in range(8)])
+    errors = []
+
+    def worker(seed: int) -> None:
+        try:
+            for n in range(100):
+                mgr.transfer(f"A{(seed + n) % 8}", f"A{(seed * 3 + n + 1) % 8}", 1)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert mgr.total_balance_minor() == 8 * 10_000
+    assert len(mgr.storage._connections) == 5  # the main thread's and one per worker
+    mgr.close()
+    with pytest.raises(exc.StorageError):
+        mgr.get("A1")
+
+
+def test_cli_db(db, tmp_path, capsys):
+    commands = tmp_path / "cmds.csv"
+    commands.write_text("create,A1,Alice,10\ncreate,A2,Bob,0\ntransfer,A1,A2,2.50\n")
+    assert cli.main(["--db", str(db), "--batch", str(commands)]) == 0
+    commands.write_text("withdraw,A2,1\n")
+    assert cli.main(["--db", str(db), "--batch", str(commands)]) == 0
+    assert "1 commands: 1 ok" in capsys.readouterr().out
+    with AccountManager(storage=SQLiteStorage(db)) as mgr:
+        assert balances(mgr) == {"A1": 750, "A2": 150}
+
+
+def test_sqlite_pages_match_the_in_memory_book(db):
+    ids = ["A", "A1", "A10", "A2", "AB", "a1", "B1", "A%", "A_", "A\U0010ffff", "A\U0010ffffx", "\U0010ffff"]
+    sqlite = AccountManager(storage=SQLiteStorage(db))
+    memory = AccountManager()
+    for mgr in (sqlite, memory):
+        mgr.create_many([(account_id, "", i * 37 % 11) for i, account_id in enumerate(ids)])
+    for prefix in ("", "A", "A1", "a", "A%", "A_", "A\U0010ffff", "\U0010ffff", "Z"):
+        for sort in ("id", "balance"):
+            for descending in (False, True):
+                for offset, limit in ((0, 3), (2, 5), (0, 100), (50, 5)):
+                    total, page = sqlite.page_accounts(offset, limit, prefix, sort, descending)
+                    expected_total, expected = memory.page_accounts(offset, limit, prefix, sort, descending)
+                    assert total == expected_total
+                    if sort == "id":
+                        assert [a.name for a in page] == [a.name for a in expected]
+                    else:  # equal balances may tie-break differently
+                        assert [a.balance_minor for a in page] == [a.balance_minor for a in expected]
+                        assert all(a.name.startswith(prefix) for a in page)
+    with pytest.raises(ValueError):
+        sqlite.page_accounts(sort="owner")
+    sqlite.close()
+
+
+def test_sqlite_cache_check_runs_once_per_read_group(db):
+    mgr = AccountManager(storage=SQLiteStorage(db))
+    mgr.create_many([("A1", "", 100), ("A2", "", 0)])
+    mgr.get("A1"), mgr.get("A2")  # both cached
+    statements = []
+    mgr.storage._conn().set_trace_callback(statements.append)
+    mgr.transfer("A1", "A2", 1)
+    assert [s for s in statements if "data_version" in s] == ["PRAGMA data_version"]
+    statements.clear()
+    mgr.end_of_day(Schedule(tiers=[Tier(0, "0.0365")]))
+    assert not any("data_version" in s for s in statements)
+    mgr.close()
+
+
+def test_sqlite_transaction_flushes_in_chunks_and_rolls_back_whole(db):
+    storage = SQLiteStorage(db)
+    mgr = AccountManager(storage=storage)
+    other = AccountManager(storage=SQLiteStorage(db))
+    mgr.create_many([(f"A{i}", "", 100) for i in range(5)])
+    mgr.end_of_day(Schedule(tiers=[Tier(0, "0.365")]), chunk_size=2)
+    assert balances(other) == {f"A{i}": 10_010 for i in range(5)}
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            for n, acct in enumerate(storage.accounts(), 1):
+                acct.balance_minor += 1
+                if n % 2 == 0:
+                    storage.flush()
+                    assert storage._local.touched == {}
+            raise RuntimeError("abort the run")
+    assert balances(other) == balances(mgr) == {f"A{i}": 10_010 for i in range(5)}
+    mgr.close()
+    other.close()
+
+
+def test_sqlite_transaction_changes_stay_private_until_commit(db):
+    storage = SQLiteStorage(db)
+    mgr = AccountManager(storage=storage)
+    mgr.create("A1", "", 100)
+    assert mgr.get("A1").balance_minor == 10_000  # cached for every thread
+    seen = []
+
+    def read():
+        seen.append(storage.get("A1").balance_minor)
+
+    def run(commit: bool, flush: bool) -> None:
+        with storage.transaction():
+            storage.get("A1").balance_minor += 1
+            if flush:
+                storage.flush()
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join()
+            if not commit:
+                raise RuntimeError("abort")
+
+    with pytest.raises(RuntimeError):
+        run(commit=False, flush=False)
+    with pytest.raises(RuntimeError):
+        run(commit=False, flush=True)
+    assert seen == [10_000, 10_000] and storage.get("A1").balance_minor == 10_000
+    run(commit=True, flush=False)
+    assert storage.get("A1").balance_minor == 10_001
+    run(commit=True, flush=True)
+    assert storage.get("A1").balance_minor == 10_002
+    assert seen == [10_000] * 2 + [10_000, 10_001]
+    mgr.close()